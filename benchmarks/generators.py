@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Tipos de coluna disponíveis para os dados sintéticos
+COLUMN_KINDS = ('int', 'float', 'str', 'category', 'date', 'bool', 'json')
+
+DEFAULT_COLUMNS = 'int:2,float:2,str:2,category:2,date:1,bool:1'
+
+CATEGORIES = ('ativo', 'inativo', 'pendente', 'cancelado', 'arquivado')
+
+
+# Converte 'int:2,str:3' em [('int', 2), ('str', 3)]
+def parse_column_mix(spec):
+    mix = []
+    for item in spec.split(','):
+        kind, _, count = item.strip().partition(':')
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f'Tipo de coluna desconhecido: {kind}')
+        mix.append((kind, int(count or 1)))
+    return mix
+
+
+def _column(kind, rows, rng):
+    if kind == 'int':
+        return rng.integers(0, 1_000_000, rows)
+    if kind == 'float':
+        return rng.random(rows) * 1000
+    if kind == 'str':
+        return pd.Series(rng.integers(0, 10**9, rows)).map(
+            'texto-{:09d}'.format
+        )
+    if kind == 'category':
+        return rng.choice(CATEGORIES, rows)
+    if kind == 'date':
+        start = np.datetime64('2020-01-01')
+        return start + rng.integers(0, 1500, rows).astype('timedelta64[D]')
+    if kind == 'bool':
+        return rng.random(rows) < 0.5
+    return [json.dumps({'n': int(n)}) for n in rng.integers(0, 100, rows)]
+
+
+# Gera um DataFrame reprodutível com a mistura de colunas pedida
+def generate_frame(rows, columns=DEFAULT_COLUMNS, seed=42):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for kind, count in parse_column_mix(columns):
+        for i in range(count):
+            data[f'{kind}_{i}'] = _column(kind, rows, rng)
+    return pd.DataFrame(data)
+
+
+def write_csv(data, path):
+    data.to_csv(path, index=False)
+
+
+def write_json(data, path):
+    data.to_json(path, orient='records', date_format='iso')
+
+
+def write_ndjson(data, path):
+    data.to_json(path, orient='records', lines=True, date_format='iso')
+
+
+def write_xlsx(data, path):
+    data.to_excel(path, index=False)
+
+
+def write_ods(data, path):
+    data.to_excel(path, index=False, engine='odf')
+
+
+def write_parquet(data, path):
+    data.to_parquet(path, index=False)
+
+
+WRITERS = {
+    'csv': write_csv,
+    'json': write_json,
+    'ndjson': write_ndjson,
+    'xlsx': write_xlsx,
+    'ods': write_ods,
+    'parquet': write_parquet,
+}
+
+
+# Gera o arquivo sintético no formato indicado e devolve o caminho
+def generate_file(fmt, path, rows, columns=DEFAULT_COLUMNS, seed=42):
+    WRITERS[fmt](generate_frame(rows, columns, seed), path)
+    return path
@@ -0,0 +1,362 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from benchmarks.generators import DEFAULT_COLUMNS, generate_file
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+FORMATS = ('csv', 'json', 'ndjson', 'xlsx', 'ods', 'parquet')
+
+# Parquet depende do pyarrow, que é opcional
+DEFAULT_FORMATS = [
+    fmt
+    for fmt in FORMATS
+    if fmt != 'parquet' or importlib.util.find_spec('pyarrow')
+]
+
+EXTENSIONS = {'ndjson': 'jsonl'}
+
+BENCH_TABLE = 'inject_db_bench'
+
+# Montagem dos parâmetros do INSERT: por coluna (tuplas) ou um dict por linha
+BINDINGS = ('columns', 'records')
+
+NO_BINDING = ('copy', 'pipeline', 'pipeline_upsert')
+
+
+# Função para obter o leitor de cada importador
+def reader_for(fmt):
+    if fmt == 'csv':
+        from inject_db.modules.csv_process import CSVReader
+
+        return CSVReader
+    if fmt in ('json', 'ndjson'):
+        from inject_db.modules.json_process import JSONReader
+
+        return JSONReader
+    if fmt == 'xlsx':
+        from inject_db.modules.xlsx_process import ExcelReader
+
+        return ExcelReader
+    if fmt == 'ods':
+        from inject_db.modules.ods_process import ODSReader
+
+        return ODSReader
+    if fmt == 'parquet':
+        from inject_db.modules.parquet_process import ParquetReader
+
+        return ParquetReader
+    raise ValueError(f'Formato desconhecido: {fmt}')
+
+
+# Pico de memória residente do processo atual em MB
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage / divisor
+
+
+def _rate(rows, seconds):
+    return rows / seconds if seconds else 0.0
+
+
+# Executa um caso (leitura + escrita) dentro de um processo filho
+def run_case(fmt, path, db_url, writer='insert', binding='columns'):
+    from inject_db.core.metrics import JobMetrics
+    from inject_db.core.pipeline import Pipeline, TableLoad, create_writer
+
+    engine = create_engine(db_url)
+    metrics = JobMetrics(fmt)
+    with open(path, 'rb') as file:
+        reader = reader_for(fmt)(file)
+        columns = reader.columns()
+        schema = reader.preview().head(0).assign(id=pd.Series(dtype=str))
+        schema.to_sql(BENCH_TABLE, engine, if_exists='replace', index=False)
+
+        loads = [
+            TableLoad(BENCH_TABLE, {column: column for column in columns})
+        ]
+        # O COPY não monta parâmetros e o pipeline sempre usa tuplas; a
+        # opção vale só para os demais INSERTs
+        options = {} if writer in NO_BINDING else {'binding': binding}
+        start = time.perf_counter()
+        result = Pipeline(
+            reader,
+            create_writer(writer, engine, **options),
+            loads,
+            metrics=metrics,
+        ).run()
+        total_seconds = time.perf_counter() - start
+    engine.dispose()
+
+    stages = metrics.summary().set_index('stage')['seconds']
+    load_seconds = float(stages.get('read', 0.0))
+    write_seconds = float(stages.get('write', 0.0))
+    rows = result[BENCH_TABLE]
+    return {
+        'rows': rows,
+        'writer': writer,
+        'binding': binding,
+        'load_seconds': round(load_seconds, 4),
+        'load_rows_per_sec': round(_rate(rows, load_seconds), 1),
+        'write_seconds': round(write_seconds, 4),
+        'write_rows_per_sec': round(_rate(rows, write_seconds), 1),
+        'total_seconds': round(total_seconds, 4),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+# Cada caso roda em um processo novo para medir o pico de RSS isolado
+def run_isolated(fmt, path, db_url, writer, binding='columns'):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (fmt, str(path), db_url, writer, binding))
+
+
+def ensure_file(workdir, fmt, rows, columns, seed):
+    key = zlib.crc32(columns.encode())
+    extension = EXTENSIONS.get(fmt, fmt)
+    path = Path(workdir) / f'{fmt}_{rows}_{key:08x}_{seed}.{extension}'
+    if not path.exists():
+        generate_file(fmt, path, rows, columns, seed)
+    return path
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+
+        return version('inject_db')
+    except Exception:
+        return 'unknown'
+
+
+# Oculta a senha das URLs gravadas nos resultados
+def _target_name(db_url):
+    from sqlalchemy.engine import make_url
+
+    return make_url(db_url).render_as_string(hide_password=True)
+
+
+def _postgres_available(db_url):
+    try:
+        engine = create_engine(db_url)
+        with engine.connect():
+            pass
+        engine.dispose()
+        return True
+    except Exception:
+        return False
+
+
+def run_suite(
+    formats,
+    sizes,
+    columns,
+    seed,
+    targets,
+    workdir,
+    writer,
+    bindings=('columns',),
+):
+    results = []
+    for rows in sizes:
+        for fmt in formats:
+            path = ensure_file(workdir, fmt, rows, columns, seed)
+            for db_url in targets:
+                for binding in bindings:
+                    result = run_isolated(fmt, path, db_url, writer, binding)
+                    result.update(
+                        {
+                            'format': fmt,
+                            'target': _target_name(db_url),
+                            'columns': columns,
+                            'file_bytes': path.stat().st_size,
+                        }
+                    )
+                    results.append(result)
+                    print(
+                        f"{fmt:>6} {rows:>9} linhas -> {result['target']} "
+                        f'({binding}): '
+                        f"leitura {result['load_rows_per_sec']:.0f} linhas/s, "
+                        f"escrita {result['write_rows_per_sec']:.0f} linhas/s, "
+                        f"pico {result['peak_rss_mb']:.0f} MB",
+                        flush=True,
+                    )
+    return results
+
+
+def _case_key(result):
+    return (
+        result['format'],
+        result['target'].split('://')[0],
+        result.get('writer', 'insert'),
+        # Resultados anteriores à montagem por coluna usavam um dict por linha
+        result.get('binding', 'records'),
+        result['rows'],
+        result['columns'],
+    )
+
+
+# Compara com uma execução anterior e lista as regressões encontradas
+def compare(results, baseline, tolerance):
+    previous = {_case_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        for metric in ('load_rows_per_sec', 'write_rows_per_sec'):
+            if result[metric] < before[metric] * (1 - tolerance):
+                regressions.append(
+                    (_case_key(result), metric, before[metric], result[metric])
+                )
+        if result['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(
+                (
+                    _case_key(result),
+                    'peak_rss_mb',
+                    before['peak_rss_mb'],
+                    result['peak_rss_mb'],
+                )
+            )
+    return regressions
+
+
+def save_results(results, output_dir, label, metadata):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f'{label}.json'
+    path.write_text(
+        json.dumps({**metadata, 'results': results}, indent=2),
+        encoding='utf-8',
+    )
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark de ingestão dos importadores do inject_db'
+    )
+    parser.add_argument(
+        '--formats', nargs='+', choices=FORMATS, default=DEFAULT_FORMATS
+    )
+    parser.add_argument('--rows', nargs='+', type=int, default=[10000])
+    parser.add_argument('--columns', default=DEFAULT_COLUMNS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--writer',
+        choices=(
+            'insert',
+            'copy',
+            'upsert',
+            'quarantine',
+            'pipeline',
+            'pipeline_upsert',
+        ),
+        default='insert',
+    )
+    parser.add_argument(
+        '--binding',
+        nargs='+',
+        choices=BINDINGS,
+        default=['columns'],
+        help='Use "columns records" para comparar os dois caminhos',
+    )
+    parser.add_argument(
+        '--db-url', help='Banco de destino (padrão: arquivo SQLite)'
+    )
+    parser.add_argument(
+        '--postgres-url',
+        default=os.environ.get('INJECT_DB_BENCH_POSTGRES_URL'),
+        help='PostgreSQL local usado também como destino, se disponível',
+    )
+    parser.add_argument(
+        '--workdir',
+        default=os.path.join(tempfile.gettempdir(), 'inject_db_bench'),
+    )
+    parser.add_argument('--output-dir', default=str(RESULTS_DIR))
+    parser.add_argument('--label')
+    parser.add_argument('--compare', help='Arquivo de resultados anterior')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.workdir, exist_ok=True)
+
+    targets = [
+        args.db_url or f"sqlite:///{os.path.join(args.workdir, 'bench.db')}"
+    ]
+    if args.postgres_url:
+        if _postgres_available(args.postgres_url):
+            targets.append(args.postgres_url)
+        else:
+            print('PostgreSQL indisponível; usando apenas', targets[0])
+
+    results = run_suite(
+        args.formats,
+        args.rows,
+        args.columns,
+        args.seed,
+        targets,
+        args.workdir,
+        args.writer,
+        args.binding,
+    )
+
+    created_at = datetime.now(timezone.utc)
+    commit = _git_commit()
+    label = args.label or f'{created_at:%Y%m%dT%H%M%S}-{commit}'
+    metadata = {
+        'version': _version(),
+        'commit': commit,
+        'created_at': created_at.isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+    }
+    path = save_results(results, args.output_dir, label, metadata)
+    print(f'Resultados salvos em {path}')
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance)
+        for key, metric, before, after in regressions:
+            print(f'REGRESSÃO {key} {metric}: {before} -> {after}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
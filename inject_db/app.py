@@ -1,9 +1,15 @@
 import streamlit as st
 
+from inject_db.core.metrics import configure_logging
+from inject_db.core.ui import jobs_panel
+
+configure_logging()
+
 # Seleção do tipo de arquivo
 st.title('Escolha o tipo de arquivo para processar')
 file_type = st.selectbox(
-    'Selecione o tipo de arquivo:', ['CSV', 'XLSX', 'JSON', 'ODS', 'POSTGRES']
+    'Selecione o tipo de arquivo:',
+    ['CSV', 'XLSX', 'JSON', 'ODS', 'PARQUET', 'POSTGRES'],
 )
 
 # Execução com base na seleção
@@ -23,7 +29,14 @@ elif file_type == 'ODS':
     import inject_db.modules.ods_process as ods_module
 
     ods_module.run()
+elif file_type == 'PARQUET':
+    import inject_db.modules.parquet_process as parquet_module
+
+    parquet_module.run()
 elif file_type == 'POSTGRES':
     import inject_db.modules.postgres_process as postgres_module
 
     postgres_module.run()
+
+# Jobs em segundo plano continuam visíveis em qualquer página
+jobs_panel()
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+from inject_db.core.memory import DEFAULT_BATCH_SIZE, MB, MIN_BATCH_SIZE
+from inject_db.core.metrics import frame_bytes
+
+logger = logging.getLogger('inject_db.batching')
+
+# Limites do tamanho dos lotes de escrita, em linhas
+MIN_BATCH_ROWS = int(os.environ.get('INJECT_DB_BATCH_MIN', MIN_BATCH_SIZE))
+MAX_BATCH_ROWS = int(os.environ.get('INJECT_DB_BATCH_MAX', 100000))
+
+# Duração desejada de cada lote: curta o bastante para não segurar locks,
+# longa o bastante para diluir a ida e volta ao servidor
+TARGET_BATCH_SECONDS = (
+    float(os.environ.get('INJECT_DB_BATCH_TARGET_MS', 500)) / 1000
+)
+
+# Memória máxima de um lote (linhas x largura média da linha)
+MAX_BATCH_BYTES = int(os.environ.get('INJECT_DB_BATCH_MAX_MB', 64)) * MB
+
+# Quanto o tamanho pode crescer ou encolher de um lote para o outro
+MAX_STEP = 2.0
+
+
+# Ajusta o tamanho dos lotes de escrita pela latência medida de cada lote e
+# pela largura das linhas; com min_rows == max_rows o tamanho fica fixo
+class AdaptiveBatchSize:
+    def __init__(
+        self,
+        initial=DEFAULT_BATCH_SIZE,
+        min_rows=MIN_BATCH_ROWS,
+        max_rows=MAX_BATCH_ROWS,
+        target_seconds=TARGET_BATCH_SECONDS,
+        max_bytes=MAX_BATCH_BYTES,
+        name=None,
+    ):
+        self.min_rows = min_rows
+        self.max_rows = max(max_rows, min_rows)
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.name = name
+        self.rows = self._clamp(initial)
+        self.sizes = [self.rows]
+
+    def _clamp(self, rows):
+        return int(min(max(rows, self.min_rows), self.max_rows))
+
+    # Linhas do próximo lote para linhas de `row_bytes` bytes
+    def next_size(self, row_bytes=None):
+        if not row_bytes:
+            return self.rows
+        return self._clamp(min(self.rows, self.max_bytes // row_bytes))
+
+    # Registra a duração de um lote e recalcula o tamanho do próximo
+    def record(self, rows, seconds):
+        if rows <= 0 or seconds <= 0:
+            return
+        # Um lote bem menor que o atual (fim do bloco) e dentro da meta é
+        # dominado pela ida e volta: não diz nada sobre lotes cheios
+        if rows < self.rows / MAX_STEP and seconds <= self.target_seconds:
+            return
+        ideal = self.target_seconds * rows / seconds
+        # Passo limitado: um lote lento isolado não derruba o tamanho
+        ideal = min(max(ideal, self.rows / MAX_STEP), self.rows * MAX_STEP)
+        size = self._clamp(ideal)
+        if size == self.rows:
+            return
+        logger.info(
+            json.dumps(
+                {
+                    'event': 'batch_size',
+                    'name': self.name,
+                    'rows': size,
+                    'previous_rows': self.rows,
+                    'last_batch_rows': rows,
+                    'last_batch_seconds': round(seconds, 6),
+                }
+            )
+        )
+        self.rows = size
+        self.sizes.append(size)
+
+    # Fatias do bloco no tamanho atual; quem consome deve chamar `record`
+    # entre um lote e outro para que o tamanho acompanhe a latência
+    def batches(self, data, fit=None):
+        if not len(data):
+            return
+        if len(data) <= self.min_rows:
+            yield data
+            return
+        row_bytes = frame_bytes(data) / len(data)
+        start = 0
+        while start < len(data):
+            size = self.next_size(row_bytes)
+            if fit is not None:
+                size = fit(size, row_bytes)
+            if start == 0 and size >= len(data):
+                yield data
+                return
+            yield data.iloc[start : start + size]
+            start += size
+
+    def summary(self):
+        if len(self.sizes) < 2:
+            return None
+        return (
+            f'lotes ajustados entre {min(self.sizes)} e {max(self.sizes)} '
+            f'linhas (último: {self.rows})'
+        )
+
+
+# Junta blocos da leitura até `rows(row_bytes)` linhas, para que os lotes
+# possam crescer além do bloco lido; blocos maiores seguem como vieram
+def gather(chunks, rows):
+    pending, count, target = [], 0, None
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        if target is None:
+            target = rows(frame_bytes(chunk) / len(chunk))
+        pending.append(chunk)
+        count += len(chunk)
+        if count >= target:
+            yield _concat(pending)
+            pending, count, target = [], 0, None
+    if pending:
+        yield _concat(pending)
+
+
+# Concatena mantendo as colunas categóricas, mesmo com dicionários
+# diferentes em cada bloco
+def _concat(frames):
+    if len(frames) == 1:
+        return frames[0]
+    data = pd.concat(frames)
+    if not data.index.is_unique:
+        data = data.reset_index(drop=True)
+    for column in data.columns:
+        values = [frame[column] for frame in frames]
+        if not isinstance(data[column].dtype, pd.CategoricalDtype) and all(
+            isinstance(value.dtype, pd.CategoricalDtype) for value in values
+        ):
+            data[column] = pd.Series(
+                pd.api.types.union_categoricals(values), index=data.index
+            )
+    return data
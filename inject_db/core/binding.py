@@ -0,0 +1,108 @@
+import numpy as np
+
+# Linhas enviadas por ida ao servidor no psycopg2 (execute_batch)
+PAGE_SIZE = 1000
+
+
+def _floats(series):
+    values = series.to_numpy()
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result.tolist()
+
+
+def _datetimes(series):
+    result = np.array(series.dt.to_pydatetime(), dtype=object)
+    result[series.isna().to_numpy()] = None
+    return result.tolist()
+
+
+def _timedeltas(series):
+    result = np.array(series.dt.to_pytimedelta(), dtype=object)
+    result[series.isna().to_numpy()] = None
+    return result.tolist()
+
+
+def _objects(series):
+    return series.to_numpy(dtype=object, na_value=None).tolist()
+
+
+# Conversor de cada tipo numpy para valores Python nativos, com NULL no lugar
+# de NaN/NaT; escolhido uma vez por coluna
+CONVERTERS = {
+    'b': lambda series: series.tolist(),
+    'i': lambda series: series.tolist(),
+    'u': lambda series: series.tolist(),
+    'f': _floats,
+    'M': _datetimes,
+    'm': _timedeltas,
+}
+
+
+def python_values(series):
+    if isinstance(series.dtype, np.dtype):
+        converter = CONVERTERS.get(series.dtype.kind, _objects)
+    else:
+        # Tipos de extensão (Int64, string, category...) aceitam NA
+        converter = _objects
+    return converter(series)
+
+
+# Compila a instrução com parâmetros posicionais, para receber tuplas; retorna
+# o SQL e a ordem das colunas, ou None se o driver só aceitar nomes
+def positional_statement(dialect, stmt, columns):
+    if not dialect.positional:
+        if dialect.paramstyle != 'pyformat':
+            return None
+        dialect = type(dialect)(paramstyle='format')
+    compiled = stmt.compile(dialect=dialect, column_keys=list(columns))
+    order = list(compiled.positiontup)
+    if set(order) - set(columns):
+        return None
+    return str(compiled), order
+
+
+# Monta as linhas coluna a coluna: cada coluna é convertida uma única vez,
+# pelo tipo do pandas e depois pelo conversor do tipo da coluna no banco
+def bind_rows(dialect, table, data, order):
+    columns = []
+    for name in order:
+        values = python_values(data[name])
+        column_type = table.c[name].type.dialect_impl(dialect)
+        process = column_type.bind_processor(dialect)
+        if process is not None:
+            values = [process(value) for value in values]
+        columns.append(values)
+    return list(zip(*columns))
+
+
+# executemany do driver com as tuplas; no psycopg2 agrupa as linhas em
+# páginas, já que o executemany dele faz uma ida ao servidor por linha
+def executemany(conn, sql, rows):
+    if not conn.in_transaction():
+        conn.begin()
+    if conn.dialect.driver == 'psycopg2':
+        from psycopg2.extras import execute_batch
+
+        cursor = conn.connection.cursor()
+        try:
+            execute_batch(cursor, sql, rows, page_size=PAGE_SIZE)
+        finally:
+            cursor.close()
+    else:
+        conn.exec_driver_sql(sql, rows)
+
+
+# psycopg 3 em modo pipeline: as linhas seguem sem esperar a resposta de
+# cada uma, e a instrução é preparada no servidor já na primeira execução
+def pipeline_executemany(conn, sql, rows):
+    if not conn.in_transaction():
+        conn.begin()
+    driver = conn.connection.driver_connection
+    threshold = driver.prepare_threshold
+    driver.prepare_threshold = 0
+    try:
+        with driver.pipeline(), driver.cursor() as cursor:
+            cursor.executemany(sql, rows)
+    finally:
+        driver.prepare_threshold = threshold
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Uma coluna de texto vira categórica se tiver no máximo este número de
+# valores distintos na amostra (0 desliga a detecção)...
+MAX_CATEGORIES = int(os.environ.get('INJECT_DB_MAX_CATEGORIES', 1000))
+
+# ...e se cada valor se repetir, em média, ao menos 1 / MAX_DISTINCT_RATIO
+# vezes
+MAX_DISTINCT_RATIO = 0.5
+
+
+def is_text(values):
+    return values.dtype == object or pd.api.types.is_string_dtype(values)
+
+
+# Colunas de texto com poucos valores distintos na amostra: guardadas como
+# categóricas, cada valor fica uma vez no dicionário e as linhas só levam o
+# código
+def categorical_columns(
+    sample, max_categories=MAX_CATEGORIES, max_ratio=MAX_DISTINCT_RATIO
+):
+    columns = []
+    for column in sample.columns:
+        values = sample[column].dropna()
+        if values.empty or not is_text(values):
+            continue
+        distinct = values.nunique()
+        if distinct <= max_categories and distinct <= len(values) * max_ratio:
+            columns.append(column)
+    return columns
+
+
+# Aplica `func` uma vez por valor distinto e espalha o resultado pelas
+# linhas. `func` recebe os valores distintos (sem nulos) e devolve um
+# resultado para cada; nulos e valores sem resultado ficam None. Colunas
+# categóricas usam o próprio dicionário, as demais são fatoradas antes
+def map_distinct(values, func):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        distinct = pd.Series(values.cat.categories, dtype=object)
+    else:
+        codes, distinct = pd.factorize(values)
+        distinct = pd.Series(distinct, dtype=object)
+    mapped = np.asarray(func(distinct), dtype=object)
+    result = np.full(len(values), None, dtype=object)
+    present = codes >= 0
+    result[present] = mapped[codes[present]]
+    return pd.Series(result, index=values.index)
@@ -0,0 +1,122 @@
+import bz2
+import gzip
+import io
+import zipfile
+
+# Extensões aceitas pelos importadores além do formato do arquivo
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.zst': 'zstd', '.zip': 'zip'}
+
+UPLOAD_TYPES = ['gz', 'bz2', 'zst', 'zip']
+
+# Assinaturas do início de cada formato, para arquivos sem extensão
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+
+class CompressionError(ValueError):
+    pass
+
+
+def _name(file):
+    return str(getattr(file, 'name', '') or '')
+
+
+# Formato de compressão do arquivo (None quando não está comprimido)
+def detect(file):
+    name = _name(file).lower()
+    for extension, codec in EXTENSIONS.items():
+        if name.endswith(extension):
+            return codec
+    if not hasattr(file, 'seek'):
+        return None
+    file.seek(0)
+    head = file.read(4)
+    file.seek(0)
+    for magic, codec in MAGIC:
+        if isinstance(head, bytes) and head.startswith(magic):
+            return codec
+    return None
+
+
+# Nome do conteúdo descomprimido: 'dados.csv.gz' -> 'dados.csv'
+def inner_name(file, member=None):
+    if member:
+        return member
+    name = _name(file)
+    for extension in EXTENSIONS:
+        if name.lower().endswith(extension):
+            return name[: -len(extension)]
+    return name
+
+
+def zip_members(file):
+    file.seek(0)
+    with zipfile.ZipFile(file) as archive:
+        return [
+            info.filename for info in archive.infolist() if not info.is_dir()
+        ]
+
+
+def _zstd_stream(file):
+    try:
+        # Python 3.14+ traz o zstd na biblioteca padrão
+        from compression import zstd
+
+        return zstd.ZstdFile(file)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError as e:
+        raise CompressionError(
+            'Arquivos .zst precisam do pacote zstandard '
+            '(pip install zstandard).'
+        ) from e
+    return zstandard.ZstdDecompressor().stream_reader(
+        file, read_across_frames=True
+    )
+
+
+# Abre o conteúdo como fluxo: os blocos são descomprimidos à medida que o
+# leitor consome, sem materializar o arquivo inteiro em memória
+def open_stream(file, codec, member=None):
+    file.seek(0)
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=file, mode='rb')
+    if codec == 'bz2':
+        return bz2.BZ2File(file, mode='rb')
+    if codec == 'zstd':
+        return _zstd_stream(file)
+    if codec == 'zip':
+        archive = zipfile.ZipFile(file)
+        members = [i.filename for i in archive.infolist() if not i.is_dir()]
+        if member is None:
+            if len(members) != 1:
+                raise CompressionError(
+                    'O arquivo zip tem mais de um arquivo; escolha qual importar.'
+                )
+            member = members[0]
+        return archive.open(member)
+    raise CompressionError(f'Compressão não suportada: {codec}')
+
+
+# Tamanho descomprimido, quando o formato o registra (None se desconhecido)
+def uncompressed_size(file, codec, member=None):
+    if codec == 'zip':
+        member = member or zip_members(file)[0]
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive:
+            return archive.getinfo(member).file_size
+    if codec == 'gzip':
+        # Os últimos 4 bytes guardam o tamanho módulo 2**32: acima de 4 GB
+        # o valor não é confiável e fica menor que o arquivo comprimido
+        compressed = file.seek(0, io.SEEK_END)
+        file.seek(-4, io.SEEK_END)
+        size = int.from_bytes(file.read(4), 'little')
+        file.seek(0)
+        return size if size >= compressed else None
+    return None
@@ -0,0 +1,58 @@
+import time
+import uuid
+
+from sqlalchemy import MetaData, Table, create_engine, inspect
+
+from inject_db.core.batching import AdaptiveBatchSize
+
+
+# Função para se conectar ao banco de dados
+def connect_to_database(connection_string):
+    engine = create_engine(connection_string)
+    return engine
+
+
+# Função para listar as tabelas no banco de dados
+def list_tables(engine):
+    inspector = inspect(engine)
+    return inspector.get_table_names()
+
+
+# Função para listar colunas de uma tabela específica
+def list_columns(engine, table_name):
+    inspector = inspect(engine)
+    return [col['name'] for col in inspector.get_columns(table_name)]
+
+
+# Função para carregar a definição de uma tabela do banco
+def reflect_table(engine, table_name):
+    metadata = MetaData()
+    return Table(table_name, metadata, autoload_with=engine)
+
+
+# Função para gerar um UUID4 para cada linha
+def add_uuids(data, id_column='id'):
+    data[id_column] = [str(uuid.uuid4()) for _ in range(len(data))]
+    return data
+
+
+# Função para inserir dados na tabela em lotes; sem `batch_size`, o tamanho
+# dos lotes se ajusta à latência medida de cada um
+def insert_data(engine, table_name, data, batch_size=None):
+    table = reflect_table(engine, table_name)
+    if batch_size:
+        sizer = AdaptiveBatchSize(batch_size, batch_size, batch_size)
+    else:
+        sizer = AdaptiveBatchSize(name=table_name)
+    with engine.connect() as conn:
+        for batch in sizer.batches(data):
+            start = time.perf_counter()
+            conn.execute(table.insert(), batch.to_dict(orient='records'))
+            sizer.record(len(batch), time.perf_counter() - start)
+        conn.commit()
+
+
+# Função para inserir dados na tabela com UUID4
+def insert_data_with_uuid(engine, table_name, data, batch_size=None):
+    add_uuids(data)
+    insert_data(engine, table_name, data, batch_size)
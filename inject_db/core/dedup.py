@@ -0,0 +1,202 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    func,
+    select,
+)
+
+# Tabela do banco de destino que guarda o hash das linhas já carregadas
+HASH_TABLE = 'inject_db_row_hashes'
+
+# Capacidade mínima do filtro de Bloom e taxa de falso positivo desejada
+MIN_CAPACITY = 100000
+ERROR_RATE = 0.01
+
+# Hashes consultados por vez no índice persistido
+LOOKUP_BATCH = 1000
+
+# Hashes lidos do índice por vez ao montar o filtro
+LOAD_BATCH = 100000
+
+# Texto único para os nulos: conforme o leitor eles chegam como NaN, None,
+# pd.NA ou NaT, e astype(str) daria 'nan', 'None' ou '<NA>'
+NULL_TEXT = '\x00'
+
+# Filtros já montados neste processo, por banco e tabela de destino
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+# Hash de conteúdo de cada linha, calculado de forma vetorizada; os valores
+# viram texto antes para que 5 e '5' lidos de arquivos diferentes coincidam
+def row_hashes(data, columns):
+    frame = data[list(columns)]
+    frame = frame.astype(str).mask(frame.isna(), NULL_TEXT)
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    # BIGINT é com sinal: reinterpreta os 64 bits sem perder informação
+    return hashes.view(np.int64)
+
+
+# Filtro de Bloom sobre hashes de 64 bits, com bits em um array numpy;
+# `count` é quantos hashes distintos do índice o filtro já recebeu
+class BloomFilter:
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.count = 0
+        self._lock = threading.Lock()
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(int(math.ceil(bits)), 8)
+        self.hash_count = max(
+            int(round(self.size / capacity * math.log(2))), 1
+        )
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    # Posições por hash duplo: h1 + i * h2, com as duas metades dos 64 bits
+    def _positions(self, hashes):
+        values = np.asarray(hashes).view(np.uint64)
+        low = values & np.uint64(0xFFFFFFFF)
+        high = (values >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (low[:, None] + steps * high[:, None]) % np.uint64(self.size)
+
+    # Jobs simultâneos do mesmo processo compartilham o filtro
+    def add(self, hashes):
+        positions = self._positions(hashes).ravel()
+        with self._lock:
+            np.bitwise_or.at(
+                self.bits,
+                positions >> np.uint64(3),
+                np.left_shift(1, positions & np.uint64(7)).astype(np.uint8),
+            )
+            self.count += len(hashes)
+
+    # True quando o hash talvez exista; False é garantia de que não existe
+    def might_contain(self, hashes):
+        positions = self._positions(hashes)
+        if not positions.size:
+            return np.zeros(len(positions), dtype=bool)
+        found = self.bits[positions >> np.uint64(3)] >> (
+            positions & np.uint64(7)
+        ).astype(np.uint8)
+        return (found & 1).astype(bool).all(axis=1)
+
+
+# Índice persistido dos hashes de cada tabela de destino
+class HashIndex:
+    def __init__(self, engine):
+        self.engine = engine
+        self.table = Table(
+            HASH_TABLE,
+            MetaData(),
+            Column('table_name', String(255), primary_key=True),
+            Column('row_hash', BigInteger, primary_key=True),
+        )
+        self.table.create(engine, checkfirst=True)
+
+    def count(self, table_name):
+        query = select(func.count()).where(
+            self.table.c.table_name == table_name
+        )
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    # Bancos em memória são distintos a cada engine e não entram no cache
+    def _cache_key(self, table_name):
+        url = self.engine.url
+        if url.get_backend_name() == 'sqlite' and url.database in (
+            None,
+            '',
+            ':memory:',
+        ):
+            return None
+        return url.render_as_string(hide_password=False), table_name
+
+    # Filtro da tabela: reaproveita o do job anterior deste processo quando
+    # o índice tem exatamente os hashes que ele recebeu e ainda há folga
+    # para as linhas esperadas; senão, remonta a partir do índice
+    def bloom_filter(self, table_name, expected_rows=0):
+        key = self._cache_key(table_name)
+        count = self.count(table_name)
+        with _filters_lock:
+            bloom = _filters.get(key)
+        if (
+            bloom is not None
+            and bloom.count == count
+            and (count + expected_rows) * 2 <= bloom.capacity
+        ):
+            return bloom
+        bloom = self._load_filter(table_name, count, expected_rows)
+        if key is not None:
+            with _filters_lock:
+                _filters[key] = bloom
+        return bloom
+
+    # Monta o filtro com todos os hashes já gravados, lidos em blocos
+    def _load_filter(self, table_name, count, expected_rows):
+        bloom = BloomFilter(max((count + expected_rows) * 2, MIN_CAPACITY))
+        query = select(self.table.c.row_hash).where(
+            self.table.c.table_name == table_name
+        )
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(query)
+            while rows := result.fetchmany(LOAD_BATCH):
+                bloom.add(np.fromiter((row[0] for row in rows), np.int64))
+        return bloom
+
+    # Quais dos hashes informados já estão no índice
+    def existing(self, table_name, hashes):
+        query = select(self.table.c.row_hash).where(
+            self.table.c.table_name == table_name,
+            self.table.c.row_hash.in_(bindparam('hashes', expanding=True)),
+        )
+        found = set()
+        values = [int(value) for value in np.unique(hashes)]
+        with self.engine.connect() as conn:
+            for start in range(0, len(values), LOOKUP_BATCH):
+                batch = values[start : start + LOOKUP_BATCH]
+                found.update(conn.execute(query, {'hashes': batch}).scalars())
+        return found
+
+    # INSERT que ignora hashes já presentes, gravados por outro job ao
+    # mesmo tempo
+    def insert_ignore(self):
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect in ('mysql', 'mariadb'):
+            return self.table.insert().prefix_with('IGNORE')
+        else:
+            return None
+        return insert(self.table).on_conflict_do_nothing()
+
+    def add(self, table_name, hashes):
+        if not len(hashes):
+            return
+        stmt = self.insert_ignore()
+        if stmt is None:
+            # Sem INSERT que ignore conflitos, grava só os que ainda faltam
+            existing = self.existing(table_name, hashes)
+            hashes = [value for value in hashes if value not in existing]
+            stmt = self.table.insert()
+        if not len(hashes):
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                stmt,
+                [
+                    {'table_name': table_name, 'row_hash': int(value)}
+                    for value in hashes
+                ],
+            )
@@ -0,0 +1,288 @@
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('inject_db.jobs')
+
+# Jobs executados ao mesmo tempo pelo processo
+MAX_WORKERS = int(os.environ.get('INJECT_DB_MAX_JOBS', 4))
+
+# Limites por banco de destino, para não saturar um mesmo servidor
+MAX_JOBS_PER_TARGET = int(os.environ.get('INJECT_DB_MAX_JOBS_PER_TARGET', 2))
+MAX_CONNECTIONS_PER_TARGET = int(
+    os.environ.get('INJECT_DB_MAX_CONNECTIONS_PER_TARGET', 4)
+)
+
+# Prioridades da fila: menor valor sai primeiro; empate segue a ordem de chegada
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+PRIORITIES = {'Alta': HIGH, 'Normal': NORMAL, 'Baixa': LOW}
+
+# Jobs concluídos mantidos para consulta
+MAX_FINISHED_JOBS = 50
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Identifica o destino de um job pela URL do engine, sem a senha
+def target_key(engine):
+    url = getattr(engine, 'url', engine)
+    if hasattr(url, 'render_as_string'):
+        return url.render_as_string(hide_password=True)
+    return str(url) if url is not None else None
+
+
+class Job:
+    def __init__(
+        self,
+        name,
+        func,
+        rows_total=None,
+        metrics=None,
+        target=None,
+        priority=NORMAL,
+        connections=1,
+    ):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.func = func
+        self.rows_total = rows_total
+        self.metrics = metrics
+        self.target = target
+        self.priority = priority
+        self.connections = connections
+        self.status = 'queued'
+        self.rows_done = 0
+        self.result = None
+        self.error = None
+        self.exception = None
+        # Observações do job exibidas ao final (linhas ignoradas etc.)
+        self.messages = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def cancel(self):
+        self._cancel.set()
+
+    # Aguarda o fim do job; retorna False se o tempo acabar antes
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f'Job {self.id} cancelado.')
+
+    # Chamado a cada bloco gravado, possivelmente por várias threads do job;
+    # é também o ponto de cancelamento
+    def advance(self, rows):
+        with self._lock:
+            self.rows_done += rows
+        self.check_cancelled()
+
+    def progress(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        rate = self.rows_done / elapsed if elapsed else 0.0
+        fraction = eta = None
+        if self.rows_total:
+            fraction = min(self.rows_done / self.rows_total, 1.0)
+            if rate and self.active:
+                eta = max(self.rows_total - self.rows_done, 0) / rate
+        return {
+            'rows_done': self.rows_done,
+            'rows_total': self.rows_total,
+            'fraction': fraction,
+            'rows_per_sec': rate,
+            'eta_seconds': eta,
+            'elapsed_seconds': elapsed,
+        }
+
+    def run(self):
+        if self._cancel.is_set():
+            self.status = 'cancelled'
+            self.finished_at = time.time()
+            self._finished.set()
+            return
+        self.status = 'running'
+        self.started_at = time.time()
+        try:
+            self.result = self.func(self)
+            self.status = 'done'
+        except JobCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+            self.exception = e
+            logger.exception('Job %s (%s) falhou', self.id, self.name)
+        finally:
+            self.finished_at = time.time()
+            self._finished.set()
+
+
+# Agenda os jobs do processo todo: uma fila por prioridade e ordem de
+# chegada, liberada conforme os limites globais e de cada destino
+class JobManager:
+    def __init__(
+        self,
+        max_workers=MAX_WORKERS,
+        max_jobs_per_target=MAX_JOBS_PER_TARGET,
+        max_connections_per_target=MAX_CONNECTIONS_PER_TARGET,
+    ):
+        self.max_workers = max_workers
+        self.max_jobs_per_target = max_jobs_per_target
+        self.max_connections_per_target = max_connections_per_target
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='inject-db-job'
+        )
+        self._jobs = {}
+        self._queue = []
+        self._running = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        name,
+        func,
+        rows_total=None,
+        metrics=None,
+        target=None,
+        priority=NORMAL,
+        connections=1,
+    ):
+        # Um job que pede mais conexões que o limite nunca seria liberado
+        connections = max(1, min(connections, self.max_connections_per_target))
+        job = Job(
+            name, func, rows_total, metrics, target, priority, connections
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            heapq.heappush(
+                self._queue, (job.priority, next(self._sequence), job)
+            )
+            self._prune()
+            self._dispatch()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    # Jobs do mais recente para o mais antigo
+    def jobs(self):
+        with self._lock:
+            return sorted(
+                self._jobs.values(),
+                key=lambda job: job.created_at,
+                reverse=True,
+            )
+
+    # Jobs aguardando, na ordem em que serão considerados
+    def queued(self):
+        with self._lock:
+            return [job for _, _, job in sorted(self._queue)]
+
+    # Posição do job na fila (1 = próximo), ou None se já saiu dela
+    def queue_position(self, job_id):
+        for position, job in enumerate(self.queued(), start=1):
+            if job.id == job_id:
+                return position
+        return None
+
+    def running(self, target=None):
+        with self._lock:
+            return [
+                job
+                for job in self._running
+                if target is None or job.target == target
+            ]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel()
+        with self._lock:
+            entries = [entry for entry in self._queue if entry[2] is not job]
+            if len(entries) != len(self._queue):
+                # Ainda na fila: sai dela sem ocupar uma thread
+                self._queue = entries
+                heapq.heapify(self._queue)
+                job.run()
+        return job
+
+    def _fits(self, job):
+        if len(self._running) >= self.max_workers:
+            return False
+        if job.target is None:
+            return True
+        same_target = [
+            other for other in self._running if other.target == job.target
+        ]
+        connections = sum(other.connections for other in same_target)
+        return (
+            len(same_target) < self.max_jobs_per_target
+            and connections + job.connections
+            <= self.max_connections_per_target
+        )
+
+    # Inicia, na ordem da fila, todo job que couber nos limites; um destino
+    # ocupado não impede que jobs de outros destinos avancem
+    def _dispatch(self):
+        waiting = []
+        while self._queue and len(self._running) < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if self._fits(job):
+                self._running.append(job)
+                self._executor.submit(self._execute, job)
+            else:
+                waiting.append(entry)
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+
+    def _execute(self, job):
+        try:
+            job.run()
+        finally:
+            with self._lock:
+                self._running.remove(job)
+                self._dispatch()
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if not job.active]
+        finished.sort(key=lambda job: job.created_at)
+        for job in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+# Gerenciador único do processo, compartilhado por todas as sessões
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
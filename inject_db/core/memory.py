@@ -0,0 +1,244 @@
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+MB = 1024 * 1024
+
+# Quantas vezes o DataFrame costuma ocupar em relação ao arquivo lido
+READ_EXPANSION = {'csv': 4, 'json': 6, 'xlsx': 10, 'ods': 15, 'parquet': 3}
+
+# Razão típica de compressão, usada quando o formato não informa o tamanho
+# descomprimido (bz2, zstd)
+COMPRESSED_EXPANSION = 10
+
+# Memória extra usada pela conversão dos lotes durante a escrita
+WRITE_OVERHEAD = 4
+
+MIN_BATCH_SIZE = 500
+
+DEFAULT_BATCH_SIZE = 10000
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+# Etapas medidas em andamento em todo o processo: o pico do tracemalloc é
+# global e só pode ser zerado quando nenhuma outra etapa está aberta
+_traced_stages = 0
+
+
+class MemoryBudgetExceeded(Exception):
+    pass
+
+
+# Memória residente atual do processo em bytes
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # Sem /proc, usa o pico informado pelo sistema operacional
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+# Abre uma etapa no tracemalloc e devolve as alocações atuais (None sem
+# rastreamento). Com etapas simultâneas (ex.: faixas em threads), o pico de
+# cada uma inclui as alocações das outras
+def _enter_traced_stage():
+    global _traced_stages
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            return None
+        if _traced_stages == 0:
+            tracemalloc.reset_peak()
+        _traced_stages += 1
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _exit_traced_stage(start):
+    global _traced_stages
+    with _tracing_lock:
+        _traced_stages -= 1
+        if not tracemalloc.is_tracing():
+            return 0
+        return max(tracemalloc.get_traced_memory()[1] - start, 0)
+
+
+class MemoryTracker:
+    def __init__(self, trace=True, sample_interval=0.05):
+        self.trace = trace
+        self.sample_interval = sample_interval
+        self.stages = {}
+        self.peak_rss = 0
+        self.peak_stage = None
+        # Etapas abertas, de qualquer thread: {chave: [nome, pico de RSS]}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.trace:
+            _start_tracing()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name='inject-db-rss-sampler', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.trace:
+            _stop_tracing()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _observe(self, rss):
+        with self._lock:
+            for stage in self._active.values():
+                stage[1] = max(stage[1], rss)
+            if rss > self.peak_rss:
+                self.peak_rss = rss
+                names = dict.fromkeys(
+                    name for name, _ in self._active.values()
+                )
+                self.peak_stage = ', '.join(names) or None
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            self._observe(current_rss())
+
+    # Mede o pico de RSS e de alocações Python durante uma etapa; pode ser
+    # usada ao mesmo tempo por várias threads
+    @contextmanager
+    def stage(self, name):
+        token = object()
+        with self._lock:
+            self._active[token] = [name, 0]
+        self._observe(current_rss())
+        traced_start = _enter_traced_stage() if self.trace else None
+        peak = {'peak_rss_bytes': 0, 'peak_traced_bytes': 0}
+        try:
+            yield peak
+        finally:
+            if traced_start is not None:
+                peak['peak_traced_bytes'] = _exit_traced_stage(traced_start)
+            self._observe(current_rss())
+            with self._lock:
+                peak['peak_rss_bytes'] = self._active.pop(token)[1]
+                stage = self.stages.setdefault(
+                    name, {'peak_rss_bytes': 0, 'peak_traced_bytes': 0}
+                )
+                for key, value in peak.items():
+                    stage[key] = max(stage[key], value)
+
+    def report(self):
+        stages = pd.DataFrame(
+            [{'stage': name, **peaks} for name, peaks in self.stages.items()],
+            columns=['stage', 'peak_rss_bytes', 'peak_traced_bytes'],
+        )
+        return {
+            'peak_rss_bytes': self.peak_rss,
+            'peak_stage': self.peak_stage,
+            'stages': stages,
+        }
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes, min_batch_size=MIN_BATCH_SIZE):
+        self.limit_bytes = limit_bytes
+        self.min_batch_size = min_batch_size
+
+    def headroom(self):
+        return self.limit_bytes - current_rss()
+
+    # Recusa o início do job se a estimativa não couber no orçamento
+    def check_start(self, estimated_bytes):
+        headroom = self.headroom()
+        if estimated_bytes > headroom:
+            raise MemoryBudgetExceeded(
+                f'O job precisa de cerca de {estimated_bytes / MB:.0f} MB, '
+                f'mas restam {max(headroom, 0) / MB:.0f} MB do orçamento '
+                f'de {self.limit_bytes / MB:.0f} MB.'
+            )
+
+    # Reduz o lote para que caiba na memória ainda disponível
+    def fit_batch_size(self, batch_size, row_bytes, overhead=WRITE_OVERHEAD):
+        headroom = self.headroom()
+        if headroom <= 0:
+            raise MemoryBudgetExceeded(
+                f'O orçamento de {self.limit_bytes / MB:.0f} MB foi esgotado.'
+            )
+        if row_bytes <= 0:
+            return batch_size
+        max_rows = int(headroom / (row_bytes * overhead))
+        if max_rows < self.min_batch_size:
+            raise MemoryBudgetExceeded(
+                f'Restam {headroom / MB:.0f} MB do orçamento, insuficientes '
+                f'para um lote de {self.min_batch_size} linhas.'
+            )
+        return min(batch_size, max_rows)
+
+
+# Estima a memória necessária para carregar um arquivo enviado
+def estimate_read_bytes(file, fmt):
+    size = getattr(file, 'size', None) or 0
+    return size * READ_EXPANSION.get(fmt, 4)
+
+
+# Campo para o usuário definir o orçamento de memória do job
+def budget_input(key='memory_budget_mb'):
+    default = int(os.environ.get('INJECT_DB_MEMORY_BUDGET_MB', 0))
+    limit_mb = st.number_input(
+        'Orçamento de memória do job em MB (0 = sem limite)',
+        min_value=0,
+        value=default,
+        step=256,
+        key=key,
+    )
+    return MemoryBudget(limit_mb * MB) if limit_mb else None
+
+
+# Exibe o relatório de memória ao final do job
+def memory_report(tracker):
+    report = tracker.report()
+    st.subheader('Uso de Memória')
+    st.metric(
+        'Pico de memória (RSS)',
+        f"{report['peak_rss_bytes'] / MB:.0f} MB",
+        help=f"Etapa responsável: {report['peak_stage'] or '-'}",
+    )
+    st.caption(f"Etapa responsável pelo pico: {report['peak_stage'] or '-'}")
+    st.dataframe(report['stages'])
+    return report
@@ -0,0 +1,180 @@
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+logger = logging.getLogger('inject_db.metrics')
+
+# Registros por lote guardados para o detalhamento; os totais por etapa
+# são acumulados à parte e valem para o job inteiro
+RECENT_RECORDS = 500
+
+SUMMARY_COLUMNS = [
+    'stage',
+    'batches',
+    'rows',
+    'bytes',
+    'seconds',
+    'peak_rss_bytes',
+    'peak_traced_bytes',
+]
+
+
+# Função para emitir as métricas como linhas JSON na saída padrão; o
+# handler fica no logger do pacote, e assim vale também para os tamanhos de
+# lote (inject_db.batching) e os jobs (inject_db.jobs)
+def configure_logging(stream=None):
+    package = logging.getLogger('inject_db')
+    if package.handlers:
+        return
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    package.addHandler(handler)
+    package.setLevel(logging.INFO)
+    package.propagate = False
+
+
+# Função para estimar o tamanho em bytes de um DataFrame
+def frame_bytes(data):
+    return int(data.memory_usage(index=False, deep=True).sum())
+
+
+class StageRecord:
+    def __init__(self, job, stage, batch=None, rows=0, nbytes=0):
+        self.job = job
+        self.stage = stage
+        self.batch = batch
+        self.rows = rows
+        self.bytes = nbytes
+        self.seconds = 0.0
+        self.status = 'ok'
+        self.peak_rss_bytes = 0
+        self.peak_traced_bytes = 0
+
+    # Registra linhas e bytes a partir do DataFrame processado
+    def measure(self, data):
+        self.rows = len(data)
+        self.bytes = frame_bytes(data)
+        return data
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'job': self.job,
+            'stage': self.stage,
+            'batch': self.batch,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'seconds': round(self.seconds, 6),
+            'rows_per_sec': round(self.rows_per_sec, 2),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_traced_bytes': self.peak_traced_bytes,
+            'status': self.status,
+        }
+
+
+# Métricas de um job: totais por etapa acumulados a cada registro e só os
+# registros mais recentes, para a memória não crescer com a duração do job
+class JobMetrics:
+    def __init__(self, job, memory=None, recent=RECENT_RECORDS):
+        self.job = job
+        self.records = deque(maxlen=recent)
+        self.stages = {}
+        self.memory = memory
+        # Faixas de uma transferência registram de várias threads
+        self._lock = threading.Lock()
+
+    # Mede a memória da etapa quando há um MemoryTracker associado
+    def _memory_stage(self, name):
+        if self.memory is None:
+            return nullcontext({})
+        return self.memory.stage(name)
+
+    @staticmethod
+    def _apply_peaks(record, peaks):
+        record.peak_rss_bytes = peaks.get('peak_rss_bytes', 0)
+        record.peak_traced_bytes = peaks.get('peak_traced_bytes', 0)
+
+    def _finish(self, record):
+        with self._lock:
+            self.records.append(record)
+            totals = self.stages.get(record.stage)
+            if totals is None:
+                totals = self.stages[record.stage] = dict.fromkeys(
+                    SUMMARY_COLUMNS[1:], 0
+                )
+            totals['batches'] += 1
+            totals['rows'] += record.rows
+            totals['bytes'] += record.bytes
+            totals['seconds'] += record.seconds
+            for key in ('peak_rss_bytes', 'peak_traced_bytes'):
+                totals[key] = max(totals[key], getattr(record, key))
+        logger.info(json.dumps(record.as_dict()))
+
+    # Mede o tempo de uma etapa; linhas e bytes são informados no registro
+    @contextmanager
+    def stage(self, name, batch=None, rows=0, nbytes=0):
+        record = StageRecord(self.job, name, batch, rows, nbytes)
+        peaks = {}
+        try:
+            with self._memory_stage(name) as peaks:
+                start = time.perf_counter()
+                try:
+                    yield record
+                except Exception:
+                    record.status = 'error'
+                    raise
+                finally:
+                    record.seconds = time.perf_counter() - start
+        finally:
+            self._apply_peaks(record, peaks)
+            self._finish(record)
+
+    # Mede a leitura de cada bloco produzido por um iterador
+    def iter_stage(self, name, iterable):
+        iterator = iter(iterable)
+        batch = 0
+        while True:
+            record = StageRecord(self.job, name, batch)
+            with self._memory_stage(name) as peaks:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                record.seconds = time.perf_counter() - start
+            self._apply_peaks(record, peaks)
+            if isinstance(item, pd.DataFrame):
+                record.measure(item)
+            self._finish(record)
+            yield item
+            batch += 1
+
+    # Registros mais recentes, um por etapa de cada lote
+    def batches(self):
+        with self._lock:
+            records = [record.as_dict() for record in self.records]
+        return pd.DataFrame(
+            records, columns=list(StageRecord(self.job, None).as_dict())
+        )
+
+    # Totais por etapa de todo o job
+    def summary(self):
+        with self._lock:
+            rows = [
+                {'stage': stage, **totals}
+                for stage, totals in self.stages.items()
+            ]
+        summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+        summary['rows_per_sec'] = (
+            summary['rows'] / summary['seconds'].where(summary['seconds'] > 0)
+        ).fillna(0.0)
+        return summary
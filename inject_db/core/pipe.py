@@ -0,0 +1,96 @@
+import queue
+import threading
+
+# Bytes acumulados antes de passar um bloco ao leitor
+PIPE_CHUNK_BYTES = 256 * 1024
+
+# Blocos em trânsito: limita a memória a PIPE_SLOTS * PIPE_CHUNK_BYTES
+PIPE_SLOTS = 16
+
+# Intervalo, em segundos, para conferir se o outro lado desistiu
+POLL_SECONDS = 0.1
+
+
+class PipeClosed(Exception):
+    pass
+
+
+# Canal de bytes entre duas threads com buffer limitado: quem escreve
+# espera quando o buffer enche, quem lê espera quando esvazia. Um erro de
+# qualquer lado é repassado ao outro em vez de deixá-lo bloqueado
+class BoundedPipe:
+    def __init__(
+        self, chunk_bytes=PIPE_CHUNK_BYTES, slots=PIPE_SLOTS, on_chunk=None
+    ):
+        self.chunk_bytes = chunk_bytes
+        # Chamado pelo leitor a cada bloco recebido; pode interromper a leitura
+        self.on_chunk = on_chunk
+        self._queue = queue.Queue(slots)
+        self._pending = bytearray()
+        self._leftover = memoryview(b'')
+        self._eof = False
+        self._error = None
+        self._closed = threading.Event()
+        self.bytes_written = 0
+
+    def _put(self, item):
+        while True:
+            if self._closed.is_set():
+                raise PipeClosed('O leitor encerrou o canal.')
+            try:
+                self._queue.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    # Lado de escrita (ex.: copy_expert do COPY TO STDOUT)
+    def write(self, data):
+        self._pending += data
+        self.bytes_written += len(data)
+        if len(self._pending) >= self.chunk_bytes:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        return len(data)
+
+    def finish(self):
+        if self._pending:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        self._put(None)
+
+    # Interrompe o leitor com o erro de quem escreve
+    def fail(self, error):
+        self._error = error
+        self._closed.set()
+
+    # Lado de leitura (ex.: copy_expert do COPY FROM STDIN)
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunk_bytes
+        while not self._leftover:
+            if self._eof:
+                return b''
+            item = self._get()
+            if item is None:
+                self._eof = True
+                return b''
+            self._leftover = memoryview(item)
+            if self.on_chunk is not None:
+                self.on_chunk(len(item))
+        data = bytes(self._leftover[:size])
+        self._leftover = self._leftover[size:]
+        return data
+
+    def _get(self):
+        while True:
+            if self._error is not None:
+                raise PipeClosed('Falha na origem do canal.') from self._error
+            try:
+                return self._queue.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    # Chamado pelo leitor ao desistir: libera quem está esperando para
+    # escrever
+    def close(self):
+        self._closed.set()
@@ -0,0 +1,1054 @@
+import copy
+import csv
+import io
+import os
+import tempfile
+import uuid
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import types as sqltypes
+from sqlalchemy.exc import DBAPIError, StatementError
+
+from inject_db.core.batching import AdaptiveBatchSize, gather
+from inject_db.core.binding import (
+    bind_rows,
+    executemany,
+    pipeline_executemany,
+    positional_statement,
+)
+from inject_db.core.compression import (
+    detect,
+    inner_name,
+    open_stream,
+    uncompressed_size,
+)
+from inject_db.core.database import add_uuids, reflect_table
+from inject_db.core.dedup import HashIndex, row_hashes
+from inject_db.core.memory import (
+    COMPRESSED_EXPANSION,
+    DEFAULT_BATCH_SIZE,
+    estimate_read_bytes,
+)
+from inject_db.core.metrics import JobMetrics, frame_bytes
+from inject_db.core.quarantine import (
+    QuarantineFile,
+    QuarantineTable,
+    error_message,
+)
+from inject_db.core.relationships import UNMATCHED_SAMPLES, KeyIndex
+from inject_db.core.schema import infer_schema
+from inject_db.core.validation import ValidationError, find_violations
+
+# Quantidade de linhas lidas do arquivo por vez
+DEFAULT_CHUNKSIZE = 10000
+
+PREVIEW_ROWS = 5
+
+# Linhas lidas do início do arquivo para inferir os tipos das colunas
+SAMPLE_ROWS = 10000
+
+# Linhas rejeitadas aceitas antes de interromper uma carga em quarentena
+MAX_REJECTS = 10000
+
+# Bytes lidos do início do arquivo para estimar o número de linhas
+ROW_SAMPLE_BYTES = 64 * 1024
+
+
+def file_size(file):
+    size = getattr(file, 'size', None)
+    if size is None and hasattr(file, 'seek'):
+        size = file.seek(0, io.SEEK_END)
+        file.seek(0)
+    return size or 0
+
+
+# Estima as linhas de um arquivo texto pela média de uma amostra
+def estimate_lines(file, sample_bytes=ROW_SAMPLE_BYTES):
+    size = file_size(file)
+    file.seek(0)
+    sample = file.read(sample_bytes)
+    file.seek(0)
+    return scale_lines(sample, size)
+
+
+# Extrapola as linhas da amostra inicial para o tamanho total
+def scale_lines(sample, size):
+    if isinstance(sample, str):
+        sample = sample.encode()
+    lines = sample.count(b'\n')
+    if not sample or not lines:
+        return None
+    if len(sample) >= size:
+        return lines
+    return int(size * lines / len(sample))
+
+
+# Leitores: produzem o arquivo em blocos de DataFrame
+# Arquivos comprimidos (gz, bz2, zst, zip) são lidos descomprimindo em
+# fluxo; `member` escolhe o arquivo dentro de um zip
+class Reader:
+    format = None
+    compressible = True
+
+    def __init__(self, file, chunksize=DEFAULT_CHUNKSIZE, member=None):
+        self.file = file
+        self.chunksize = chunksize
+        self.member = member
+        self.compression = detect(file) if self.compressible else None
+        self._preview = None
+
+    # Nome do conteúdo, sem a extensão da compressão
+    @property
+    def name(self):
+        return inner_name(self.file, self.member)
+
+    def _rewind(self):
+        if hasattr(self.file, 'seek'):
+            self.file.seek(0)
+        if self.compression is None:
+            return self.file
+        return open_stream(self.file, self.compression, self.member)
+
+    # Linhas estimadas do conteúdo descomprimido (None se incerto)
+    def estimated_lines(self):
+        if self.compression is None:
+            return estimate_lines(self.file)
+        size = uncompressed_size(self.file, self.compression, self.member)
+        if not size:
+            return None
+        return scale_lines(self._rewind().read(ROW_SAMPLE_BYTES), size)
+
+    # Primeiras linhas do arquivo, sem ler o conteúdo inteiro
+    def preview(self, rows=PREVIEW_ROWS):
+        if self._preview is None:
+            self._preview = self._read_preview(rows)
+        return self._preview
+
+    def columns(self):
+        return list(self.preview().columns)
+
+    # Amostra usada para inferir os tipos; formatos que só são lidos por
+    # inteiro usam a pré-visualização
+    def sample(self):
+        return self.preview()
+
+    # Memória estimada para ler o arquivo
+    def estimated_bytes(self):
+        estimate = estimate_read_bytes(self.file, self.format)
+        if self.compression is None:
+            return estimate
+        size = uncompressed_size(self.file, self.compression, self.member)
+        compressed = file_size(self.file)
+        if size and compressed:
+            return int(estimate * size / compressed)
+        return estimate * COMPRESSED_EXPANSION
+
+    # Total de linhas esperado, usado para progresso e ETA (None se incerto)
+    def estimated_rows(self):
+        return None
+
+    # Cópia do leitor com cursor próprio, para ser usada por outra thread;
+    # arquivos mapeados do disco compartilham o mapeamento em vez de copiar
+    def detached(self):
+        clone = copy.copy(self)
+        if hasattr(self.file, 'reopen'):
+            clone.file = self.file.reopen()
+        elif hasattr(self.file, 'getvalue'):
+            clone.file = io.BytesIO(self.file.getvalue())
+            clone.file.name = getattr(self.file, 'name', None)
+            clone.file.size = file_size(self.file)
+        return clone
+
+    # Divide os mapeamentos entre as fontes do arquivo: [(leitor, mapeamentos)]
+    def split_mappings(self, mappings):
+        return [(self, mappings)]
+
+    # Leitura antecipada das partes [(leitor, colunas, tipos)] antes da carga
+    def prefetch(self, parts):
+        pass
+
+    def _read_preview(self, rows):
+        return next(iter(self.read_chunks()), pd.DataFrame()).head(rows)
+
+    # `dtype` traz os tipos de leitura por coluna ({coluna: tipo}); formatos
+    # que guardam os tipos no arquivo (JSON, Parquet) podem ignorá-lo
+    def read_chunks(self, columns=None, dtype=None):
+        raise NotImplementedError
+
+
+# Leitor para formatos que o pandas só lê por inteiro
+class FrameReader(Reader):
+    # Planilhas já são pacotes zip: não passam pela descompressão
+    compressible = False
+
+    def read_frame(self, columns=None, dtype=None):
+        raise NotImplementedError
+
+    def read_chunks(self, columns=None, dtype=None):
+        data = self.read_frame(columns, dtype)
+        for start in range(0, len(data), self.chunksize):
+            yield data.iloc[start : start + self.chunksize]
+
+
+# Transformações: aplicadas a cada bloco antes da escrita
+class Transform:
+    stage = 'transform'
+
+    # Chamado uma vez por job, com a tabela de destino já refletida
+    def prepare(self, engine, table):
+        pass
+
+    def __call__(self, data):
+        raise NotImplementedError
+
+    # Chamado depois que as linhas do bloco foram gravadas com sucesso
+    def committed(self, data):
+        pass
+
+    # Resumo exibido ao final do job (None quando não há o que relatar)
+    def summary(self):
+        return None
+
+
+# Monta o bloco da tabela a partir do mapa {coluna do banco: coluna de origem}
+class SelectColumns(Transform):
+    def __init__(self, column_map):
+        self.column_map = column_map
+
+    def __call__(self, data):
+        selected = data[list(self.column_map.values())]
+        return selected.set_axis(list(self.column_map), axis=1)
+
+
+# Resolve chaves naturais em ids: a coluna de origem chega com a chave da
+# tabela de destino (ex.: nome da cidade) e sai com o id da linha encontrada
+class LookupRelationships(Transform):
+    stage = 'relationships'
+
+    def __init__(self, relationships):
+        self.relationships = relationships
+        self.unmatched = {}
+        self.samples = {}
+
+    def prepare(self, engine, table):
+        self.indexes = [
+            (
+                relationship['column_origin'],
+                f"{relationship['table_dest']}.{relationship['column_dest']}",
+                KeyIndex(
+                    engine,
+                    relationship['table_dest'],
+                    relationship['column_dest'],
+                ),
+            )
+            for relationship in self.relationships
+        ]
+
+    def __call__(self, data):
+        for column, reference, index in self.indexes:
+            if column not in data.columns:
+                continue
+            ids, missing = index.lookup(data[column])
+            if missing.any():
+                self.unmatched[reference] = self.unmatched.get(
+                    reference, 0
+                ) + int(missing.sum())
+                samples = self.samples.setdefault(reference, [])
+                for key in data[column][missing].unique():
+                    if len(samples) >= UNMATCHED_SAMPLES:
+                        break
+                    if key not in samples:
+                        samples.append(key)
+            data[column] = ids
+        return data
+
+    def summary(self):
+        if not self.unmatched:
+            return None
+        return '; '.join(
+            f'{count} chaves sem correspondência em {reference} '
+            f"(ex.: {', '.join(map(str, self.samples[reference]))})"
+            for reference, count in self.unmatched.items()
+        )
+
+
+# Descarta linhas cujo hash de conteúdo já foi carregado na tabela. O filtro
+# de Bloom responde "com certeza nova" sem ir ao banco; só os possíveis
+# repetidos são confirmados no índice persistido
+class Deduplicate(Transform):
+    stage = 'dedup'
+
+    def __init__(self, columns, expected_rows=0):
+        self.columns = list(columns)
+        self.expected_rows = expected_rows or 0
+        self.skipped = 0
+        self._pending = pd.Series(dtype='int64')
+
+    def prepare(self, engine, table):
+        missing = set(self.columns) - set(table.c.keys())
+        if missing:
+            raise ValueError(
+                f'Colunas de deduplicação ausentes na tabela {table.name}: '
+                f'{sorted(missing)}'
+            )
+        self.table_name = table.name
+        self.index = HashIndex(engine)
+        self.bloom = self.index.bloom_filter(table.name, self.expected_rows)
+
+    def __call__(self, data):
+        hashes = row_hashes(data, self.columns)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        maybe = keep & self.bloom.might_contain(hashes)
+        if maybe.any():
+            existing = self.index.existing(self.table_name, hashes[maybe])
+            keep &= ~pd.Series(hashes).isin(existing).to_numpy()
+        self.skipped += len(data) - int(keep.sum())
+        data = data[keep]
+        self._pending = pd.Series(hashes[keep], index=data.index)
+        return data
+
+    # O hash só entra no índice depois que a linha foi gravada
+    def committed(self, data):
+        hashes = self._pending.loc[data.index].to_numpy()
+        self.index.add(self.table_name, hashes)
+        self.bloom.add(hashes)
+
+    def summary(self):
+        if self.skipped:
+            return f'{self.skipped} linhas já carregadas foram ignoradas'
+        return None
+
+
+# Gera UUID4 quando a tabela tem uma coluna id textual não mapeada
+class AddUUIDs(Transform):
+    stage = 'ids'
+
+    def __init__(self, id_column='id'):
+        self.id_column = id_column
+        self.enabled = False
+
+    def prepare(self, engine, table):
+        column = table.c.get(self.id_column)
+        self.enabled = (
+            column is not None
+            and column.server_default is None
+            and not isinstance(column.type, sqltypes.Integer)
+        )
+
+    def __call__(self, data):
+        if self.enabled and self.id_column not in data.columns:
+            data = add_uuids(data, self.id_column)
+        return data
+
+
+# Confere o bloco contra a tabela refletida antes de gravar: uma carga
+# condenada falha no primeiro bloco, e não no meio da escrita
+class Validate(Transform):
+    stage = 'validate'
+
+    def prepare(self, engine, table):
+        self.table = table
+
+    def __call__(self, data):
+        violations = find_violations(data, self.table)
+        if not violations.empty:
+            raise ValidationError(self.table.name, violations)
+        return data
+
+
+# Escritores: gravam os blocos na tabela de destino
+class Writer:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def open(self):
+        pass
+
+    # Pode retornar só as linhas efetivamente gravadas (None = todas)
+    def write(self, table, data):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    # Resumo exibido ao final do job (None quando não há o que relatar)
+    def summary(self):
+        return None
+
+
+# INSERT em lotes; por padrão os parâmetros são montados coluna a coluna e
+# enviados como tuplas, sem um dicionário por linha ('records' mantém o
+# caminho antigo, usado para comparação nos benchmarks)
+class InsertWriter(Writer):
+    def __init__(self, engine, binding='columns'):
+        super().__init__(engine)
+        self.binding = binding
+        self._statements = {}
+
+    def open(self):
+        self.conn = self.engine.connect()
+
+    def statement(self, table, columns):
+        return table.insert()
+
+    def _positional(self, table, columns):
+        key = (table.name, tuple(columns))
+        if key not in self._statements:
+            self._statements[key] = positional_statement(
+                self.engine.dialect, self.statement(table, columns), columns
+            )
+        return self._statements[key]
+
+    def write(self, table, data):
+        columns = list(data.columns)
+        positional = None
+        if self.binding == 'columns':
+            positional = self._positional(table, columns)
+        try:
+            if positional is None:
+                self.conn.execute(
+                    self.statement(table, columns),
+                    data.to_dict(orient='records'),
+                )
+            else:
+                sql, order = positional
+                rows = bind_rows(self.engine.dialect, table, data, order)
+                self._executemany(sql, rows)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _executemany(self, sql, rows):
+        executemany(self.conn, sql, rows)
+
+    def close(self):
+        self.conn.close()
+
+
+# INSERT que, quando um lote falha, o divide ao meio até isolar as linhas
+# ruins: as boas são gravadas e as rejeitadas vão para a quarentena com a
+# mensagem de erro. Sem erros, o custo é o mesmo do InsertWriter
+class QuarantineWriter(InsertWriter):
+    def __init__(
+        self,
+        engine,
+        binding='columns',
+        quarantine='table',
+        max_rejects=MAX_REJECTS,
+    ):
+        super().__init__(engine, binding)
+        self.quarantine = quarantine
+        self.max_rejects = max_rejects
+        self.rejected = 0
+        # Erros do driver que não passam pelo SQLAlchemy (ex.: execute_batch)
+        dbapi = engine.dialect.loaded_dbapi
+        self._errors = (StatementError, TypeError, ValueError) + (
+            (dbapi.Error,) if dbapi is not None else ()
+        )
+
+    def open(self):
+        super().open()
+        if isinstance(self.quarantine, str):
+            run_id = uuid.uuid4().hex[:8]
+            if self.quarantine == 'table':
+                self.quarantine = QuarantineTable(self.engine, run_id)
+            else:
+                self.quarantine = QuarantineFile(run_id)
+
+    def write(self, table, data):
+        try:
+            super().write(table, data)
+            return data
+        except self._errors as e:
+            # Queda de conexão não é culpa das linhas: dividir não adianta
+            if self._disconnected(e):
+                raise
+            error = e
+        if len(data) == 1:
+            self._reject(table, data, error)
+            return data.iloc[:0]
+        middle = len(data) // 2
+        return pd.concat(
+            [
+                self.write(table, data.iloc[:middle]),
+                self.write(table, data.iloc[middle:]),
+            ]
+        )
+
+    # Erros crus do driver (ex.: execute_batch) não passam pelo SQLAlchemy,
+    # que então não marca a conexão como perdida: o dialeto decide e a
+    # conexão é invalidada aqui
+    def _disconnected(self, error):
+        if self.conn.invalidated:
+            return True
+        if isinstance(error, DBAPIError):
+            return error.connection_invalidated
+        dbapi = self.engine.dialect.loaded_dbapi
+        if dbapi is None or not isinstance(error, dbapi.Error):
+            return False
+        if not self.engine.dialect.is_disconnect(
+            error, self.conn.connection.dbapi_connection, None
+        ):
+            return False
+        self.conn.invalidate(error)
+        return True
+
+    def _reject(self, table, data, error):
+        self.rejected += len(data)
+        if self.max_rejects is not None and self.rejected > self.max_rejects:
+            raise RuntimeError(
+                f'Mais de {self.max_rejects} linhas rejeitadas; carga '
+                f'interrompida. Último erro: {error_message(error)}'
+            )
+        self.quarantine.add(table.name, data, error_message(error))
+
+    def summary(self):
+        if not self.rejected:
+            return None
+        return (
+            f'{self.rejected} linhas rejeitadas pelo banco foram enviadas '
+            f'para a quarentena ({self.quarantine.location})'
+        )
+
+
+# COPY FROM STDIN do PostgreSQL a partir de um CSV em memória
+class CopyWriter(Writer):
+    def open(self):
+        if self.engine.dialect.name != 'postgresql':
+            raise ValueError(
+                'O modo COPY está disponível apenas no PostgreSQL.'
+            )
+        self.conn = self.engine.raw_connection()
+
+    def write(self, table, data):
+        preparer = self.engine.dialect.identifier_preparer
+        columns = ', '.join(preparer.quote(column) for column in data.columns)
+        buffer = io.StringIO()
+        data.to_csv(buffer, index=False, header=False, na_rep='\\N')
+        buffer.seek(0)
+        cursor = self.conn.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY {preparer.format_table(table)} ({columns}) '
+                "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.conn.close()
+
+
+# INSERT que atualiza a linha existente quando a chave primária já existe
+class UpsertWriter(InsertWriter):
+    def statement(self, table, columns):
+        keys = [column.name for column in table.primary_key.columns]
+        if not keys:
+            raise ValueError(
+                f'A tabela {table.name} não tem chave primária para o upsert.'
+            )
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect in ('mysql', 'mariadb'):
+            from sqlalchemy.dialects.mysql import insert
+
+            stmt = insert(table)
+            return stmt.on_duplicate_key_update(
+                {c: stmt.inserted[c] for c in columns if c not in keys}
+            )
+        else:
+            raise ValueError(f'Upsert não suportado para {dialect}.')
+
+        stmt = insert(table)
+        update = {c: stmt.excluded[c] for c in columns if c not in keys}
+        if not update:
+            return stmt.on_conflict_do_nothing(index_elements=keys)
+        return stmt.on_conflict_do_update(index_elements=keys, set_=update)
+
+
+# INSERT pelo psycopg 3 em modo pipeline com instruções preparadas no
+# servidor: para upsert e cargas com relacionamentos, onde o COPY não serve,
+# sem pagar uma ida e volta por lote em links com latência alta
+class PipelineWriter(InsertWriter):
+    def __init__(self, engine):
+        super().__init__(engine, binding='columns')
+
+    def open(self):
+        dialect = self.engine.dialect
+        if dialect.name != 'postgresql' or dialect.driver != 'psycopg':
+            raise ValueError(
+                'O modo pipeline precisa do PostgreSQL com o driver psycopg 3 '
+                '(URL postgresql+psycopg://).'
+            )
+        super().open()
+
+    def _executemany(self, sql, rows):
+        pipeline_executemany(self.conn, sql, rows)
+
+
+class PipelineUpsertWriter(PipelineWriter, UpsertWriter):
+    pass
+
+
+# SQLite: pragmas de carga em massa na conexão do escritor, restaurados ao
+# fechar. Cada lote continua em uma transação própria: uma transação única
+# prenderia o arquivo e bloquearia as gravações da deduplicação e da
+# quarentena, que usam outras conexões; sem fsync, o commit sai barato
+class SQLiteWriter(InsertWriter):
+    PRAGMAS = {
+        'synchronous': 'OFF',
+        'temp_store': 'MEMORY',
+        'cache_size': '-65536',
+    }
+
+    def open(self):
+        super().open()
+        self._previous = {}
+        for name, value in self.PRAGMAS.items():
+            self._previous[name] = self.conn.exec_driver_sql(
+                f'PRAGMA {name}'
+            ).scalar()
+            self.conn.exec_driver_sql(f'PRAGMA {name} = {value}')
+        self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.rollback()
+            for name, value in self._previous.items():
+                self.conn.exec_driver_sql(f'PRAGMA {name} = {value}')
+            self.conn.commit()
+        finally:
+            super().close()
+
+
+# Erros do MySQL para LOAD DATA LOCAL recusado pelo servidor ou pelo driver
+LOCAL_INFILE_ERRORS = (1148, 2068, 3948)
+
+
+def local_infile_refused(error):
+    args = getattr(getattr(error, 'orig', None), 'args', ())
+    return bool(args) and args[0] in LOCAL_INFILE_ERRORS
+
+
+# Escapes do formato padrão do LOAD DATA (a barra invertida vem primeiro)
+MYSQL_ESCAPES = (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'))
+
+
+def _mysql_escape(value):
+    # Booleanos numa coluna object (ex.: True/vazio/False do CSV) viram 1/0,
+    # como no INSERT; o LOAD DATA gravaria 'True' como 0 só com um aviso
+    if isinstance(value, (bool, np.bool_)):
+        return '1' if value else '0'
+    if not isinstance(value, str):
+        return value
+    for char, escaped in MYSQL_ESCAPES:
+        value = value.replace(char, escaped)
+    return value
+
+
+# Texto no formato padrão do LOAD DATA: campos separados por tabulação, sem
+# aspas, NULL como \N, caracteres especiais escapados e booleanos como 0/1
+def mysql_tsv(data, file):
+    data = data.copy()
+    for column in data.columns:
+        values = data[column]
+        if pd.api.types.is_bool_dtype(values):
+            data[column] = values.astype('Int8')
+        elif isinstance(values.dtype, pd.StringDtype):
+            for char, escaped in MYSQL_ESCAPES:
+                values = values.str.replace(char, escaped, regex=False)
+            data[column] = values
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            # O escape não junta valores distintos: basta escapar o dicionário
+            data[column] = values.cat.rename_categories(_mysql_escape)
+        elif values.dtype == object:
+            data[column] = values.map(_mysql_escape)
+    data.to_csv(
+        file,
+        sep='\t',
+        index=False,
+        header=False,
+        na_rep='\\N',
+        quoting=csv.QUOTE_NONE,
+        lineterminator='\n',
+    )
+
+
+# MySQL/MariaDB: LOAD DATA LOCAL INFILE por lote, a partir de um arquivo
+# temporário (os drivers pedem um caminho de arquivo). Se o servidor ou o
+# driver recusarem arquivos locais (local_infile), volta ao INSERT
+class MySQLWriter(InsertWriter):
+    def __init__(self, engine, binding='columns'):
+        super().__init__(engine, binding)
+        self.local_infile = True
+        self.refused = None
+        self.warned = 0
+
+    # LOAD DATA LOCAL age como IGNORE: chave duplicada e valor fora do tipo
+    # viram avisos e a linha é pulada ou convertida. Um lote com avisos é
+    # desfeito e o retorno False pede que seja refeito com INSERT
+    def _load(self, table, data):
+        preparer = self.engine.dialect.identifier_preparer
+        columns = ', '.join(preparer.quote(column) for column in data.columns)
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.tsv', encoding='utf-8', newline='', delete=False
+        ) as file:
+            mysql_tsv(data, file)
+        path = file.name.replace('\\', '/')
+        try:
+            self.conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{path}' "
+                f'INTO TABLE {preparer.format_table(table)} '
+                f'CHARACTER SET utf8mb4 ({columns})'
+            )
+            warnings = self.conn.exec_driver_sql(
+                'SHOW COUNT(*) WARNINGS'
+            ).scalar()
+            if warnings:
+                self.conn.rollback()
+                return False
+            self.conn.commit()
+            return True
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            os.unlink(file.name)
+
+    def write(self, table, data):
+        if self.local_infile:
+            try:
+                if self._load(table, data):
+                    return None
+                # O INSERT grava o lote ou acusa o erro que o LOAD escondeu
+                self.warned += 1
+            except DBAPIError as e:
+                if not local_infile_refused(e):
+                    raise
+                self.local_infile = False
+                self.refused = error_message(e)
+        return super().write(table, data)
+
+    def summary(self):
+        messages = []
+        if self.refused is not None:
+            messages.append(
+                'LOAD DATA LOCAL recusado; a carga seguiu com INSERT. Para '
+                'habilitar, acrescente local_infile=1 à URL e ative '
+                f'local_infile no servidor ({self.refused})'
+            )
+        if self.warned:
+            messages.append(
+                f'{self.warned} lotes com avisos no LOAD DATA foram refeitos '
+                'com INSERT'
+            )
+        return '; '.join(messages) or None
+
+
+# Escritor rápido de cada banco para o modo INSERT; os demais usam o genérico
+DIALECT_WRITERS = {
+    'sqlite': SQLiteWriter,
+    'mysql': MySQLWriter,
+    'mariadb': MySQLWriter,
+}
+
+
+WRITERS = {
+    'insert': InsertWriter,
+    'copy': CopyWriter,
+    'upsert': UpsertWriter,
+    'quarantine': QuarantineWriter,
+    'pipeline': PipelineWriter,
+    'pipeline_upsert': PipelineUpsertWriter,
+}
+
+
+# O escritor do banco independe do `binding`: assim a comparação entre os
+# dois nos benchmarks mede só a montagem dos parâmetros
+def create_writer(mode, engine, **options):
+    writer_class = WRITERS[mode]
+    if mode == 'insert':
+        writer_class = DIALECT_WRITERS.get(engine.dialect.name, writer_class)
+    return writer_class(engine, **options)
+
+
+# Carga de uma tabela de destino: colunas mapeadas e relacionamentos.
+# `dedup_keys` ativa a deduplicação: None desliga, lista vazia usa todas as
+# colunas mapeadas; `validate` confere cada bloco antes da escrita
+class TableLoad:
+    def __init__(
+        self,
+        table_name,
+        column_map,
+        relationships=(),
+        dedup_keys=None,
+        validate=True,
+    ):
+        self.table_name = table_name
+        self.column_map = column_map
+        self.relationships = list(relationships)
+        self.dedup_keys = dedup_keys
+        self.validate = validate
+        self.rows = 0
+
+    def transforms(self, expected_rows=None):
+        transforms = [
+            SelectColumns(self.column_map),
+            LookupRelationships(self.relationships),
+        ]
+        # Antes dos UUIDs, que mudariam o hash a cada carga
+        if self.dedup_keys is not None:
+            transforms.append(
+                Deduplicate(
+                    self.dedup_keys or list(self.column_map), expected_rows
+                )
+            )
+        transforms.append(AddUUIDs())
+        if self.validate:
+            transforms.append(Validate())
+        return transforms
+
+
+# Agrupa os mapeamentos coluna a coluna por tabela de destino; `dedup_keys`
+# é {tabela: colunas} para as tabelas com deduplicação
+def build_loads(mappings, relationships=(), dedup_keys=None, validate=True):
+    dedup_keys = dedup_keys or {}
+    loads = {}
+    for mapping in mappings:
+        table_name = mapping['db_table']
+        load = loads.get(table_name)
+        if load is None:
+            load = loads[table_name] = TableLoad(
+                table_name,
+                {},
+                [r for r in relationships if r['table_origin'] == table_name],
+                dedup_keys.get(table_name),
+                validate,
+            )
+        load.column_map[mapping['db_column']] = mapping['source_column']
+    return list(loads.values())
+
+
+class Pipeline:
+    def __init__(
+        self,
+        reader,
+        writer,
+        loads,
+        metrics=None,
+        budget=None,
+        batch_size=DEFAULT_BATCH_SIZE,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.loads = loads
+        self.metrics = metrics or JobMetrics(reader.format or 'pipeline')
+        self.budget = budget
+        self.batch_size = batch_size
+        self._prepared = []
+        self._schema = None
+        self._tables = {}
+
+    def _table(self, table_name):
+        if table_name not in self._tables:
+            self._tables[table_name] = reflect_table(
+                self.writer.engine, table_name
+            )
+        return self._tables[table_name]
+
+    def source_columns(self):
+        columns = []
+        for load in self.loads:
+            for column in load.column_map.values():
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    # Tipos da fonte, decididos uma vez por job pela amostra do arquivo e
+    # pelos tipos das colunas de destino. Colunas trocadas por id num
+    # relacionamento ficam com o tipo da amostra
+    def schema(self):
+        if self._schema is None:
+            targets = {}
+            for load in self.loads:
+                table = self._table(load.table_name)
+                lookups = {r['column_origin'] for r in load.relationships}
+                for db_column, source in load.column_map.items():
+                    column_type = None
+                    if db_column in table.c and db_column not in lookups:
+                        column_type = table.c[db_column].type
+                    targets.setdefault(source, []).append(column_type)
+            self._schema = infer_schema(self.reader.sample(), targets)
+        return self._schema
+
+    def _prepare(self):
+        engine = self.writer.engine
+        prepared = []
+        expected_rows = self.reader.estimated_rows()
+        for load in self.loads:
+            table = self._table(load.table_name)
+            transforms = load.transforms(expected_rows)
+            for transform in transforms:
+                transform.prepare(engine, table)
+            # O tamanho dos lotes de cada tabela segue a latência medida
+            sizer = AdaptiveBatchSize(self.batch_size, name=load.table_name)
+            prepared.append((load, table, transforms, sizer))
+        return prepared
+
+    # Com orçamento de memória, o bloco lido também precisa caber nele: o
+    # tamanho da leitura é reduzido pela largura das linhas da amostra
+    def _fit_reader(self):
+        if self.budget is None:
+            return
+        sample = self.reader.sample()
+        if len(sample):
+            self.reader.chunksize = self.budget.fit_batch_size(
+                self.reader.chunksize, frame_bytes(sample) / len(sample)
+            )
+
+    # Linhas reunidas por bloco: o maior lote pedido pelas tabelas, limitado
+    # pelo orçamento de memória
+    def _gather_rows(self, row_bytes):
+        rows = max(
+            sizer.next_size(row_bytes) for _, _, _, sizer in self._prepared
+        )
+        if self.budget is not None:
+            rows = self.budget.fit_batch_size(rows, row_bytes)
+        return rows
+
+    # Lê o arquivo uma única vez e grava cada bloco em todas as tabelas;
+    # `progress` recebe as linhas de cada bloco e pode interromper o job
+    def run(self, progress=None):
+        prepared = self._prepared = self._prepare()
+        schema = self.schema()
+        self._fit_reader()
+        # Todo bloco sai da leitura com os mesmos tipos
+        chunks = map(
+            schema.apply,
+            self.reader.read_chunks(
+                self.source_columns(), schema.parse or None
+            ),
+        )
+        # Os blocos lidos são reunidos até o tamanho dos lotes, que assim
+        # podem crescer além do bloco da leitura
+        chunks = gather(
+            self.metrics.iter_stage('read', chunks), self._gather_rows
+        )
+        # O orçamento de memória pode reduzir ainda mais cada lote
+        fit = self.budget.fit_batch_size if self.budget is not None else None
+        self.writer.open()
+        try:
+            for batch, chunk in enumerate(chunks):
+                for load, table, transforms, sizer in prepared:
+                    data = chunk
+                    for transform in transforms:
+                        with self.metrics.stage(
+                            transform.stage, batch, len(data)
+                        ):
+                            data = transform(data)
+                    for part in sizer.batches(data, fit):
+                        with self.metrics.stage('write', batch) as record:
+                            written = self.writer.write(
+                                table, record.measure(part)
+                            )
+                        sizer.record(len(part), record.seconds)
+                        if written is None:
+                            written = part
+                        for transform in transforms:
+                            transform.committed(written)
+                        load.rows += len(written)
+                if progress is not None:
+                    progress(len(chunk))
+        finally:
+            self.writer.close()
+        return {load.table_name: load.rows for load in self.loads}
+
+    # Observações das transformações e do escritor sobre a última execução
+    def messages(self):
+        summary = self.writer.summary()
+        return ([summary] if summary else []) + self.transform_messages()
+
+    def transform_messages(self):
+        messages = []
+        if self._schema is not None and self._schema.summary():
+            messages.append(self._schema.summary())
+        for load, _, transforms, sizer in self._prepared:
+            summaries = [t.summary() for t in transforms] + [sizer.summary()]
+            for summary in summaries:
+                if summary:
+                    messages.append(f'{load.table_name}: {summary}')
+        return messages
+
+
+# Várias fontes do mesmo arquivo (ex.: abas de uma planilha) em um só job,
+# cada uma com o próprio leitor e as próprias cargas, gravadas em sequência
+# pelo mesmo escritor depois da leitura antecipada pelo `reader`
+class MultiPipeline:
+    def __init__(self, reader, pipelines):
+        self.reader = reader
+        self.pipelines = pipelines
+
+    @classmethod
+    def from_mappings(
+        cls,
+        reader,
+        writer,
+        mappings,
+        relationships=(),
+        dedup_keys=None,
+        validate=True,
+        **options,
+    ):
+        pipelines = [
+            Pipeline(
+                part,
+                writer,
+                build_loads(
+                    part_mappings, relationships, dedup_keys, validate
+                ),
+                **options,
+            )
+            for part, part_mappings in reader.split_mappings(mappings)
+        ]
+        return cls(reader, pipelines)
+
+    @property
+    def loads(self):
+        return [load for pipeline in self.pipelines for load in pipeline.loads]
+
+    def run(self, progress=None):
+        self.reader.prefetch(
+            [
+                (
+                    pipeline.reader,
+                    pipeline.source_columns(),
+                    pipeline.schema().parse or None,
+                )
+                for pipeline in self.pipelines
+            ]
+        )
+        rows = {}
+        for pipeline in self.pipelines:
+            for table_name, count in pipeline.run(progress).items():
+                rows[table_name] = rows.get(table_name, 0) + count
+        return rows
+
+    def messages(self):
+        messages = []
+        if self.pipelines:
+            summary = self.pipelines[0].writer.summary()
+            if summary:
+                messages.append(summary)
+        for pipeline in self.pipelines:
+            messages.extend(pipeline.transform_messages())
+        return messages
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text
+
+# Tabela do banco de destino que recebe as linhas rejeitadas
+QUARANTINE_TABLE = 'inject_db_quarantine'
+
+# Pasta dos arquivos de quarentena quando o destino é um CSV
+QUARANTINE_DIR = os.environ.get(
+    'INJECT_DB_QUARANTINE_DIR',
+    os.path.join(tempfile.gettempdir(), 'inject_db_quarantine'),
+)
+
+# Tamanho máximo da mensagem de erro guardada por linha
+MAX_ERROR_LENGTH = 1000
+
+
+def error_message(error):
+    message = str(getattr(error, 'orig', None) or error)
+    return message.strip()[:MAX_ERROR_LENGTH]
+
+
+def _rows_as_json(data):
+    text = data.to_json(
+        orient='records', lines=True, date_format='iso', force_ascii=False
+    )
+    return text.splitlines()
+
+
+# Quarentena em tabela: uma linha por rejeitada, com o conteúdo em JSON
+class QuarantineTable:
+    def __init__(self, engine, job):
+        self.engine = engine
+        self.job = job
+        self.table = Table(
+            QUARANTINE_TABLE,
+            MetaData(),
+            Column('id', Integer, primary_key=True, autoincrement=True),
+            Column('job', String(64)),
+            Column('table_name', String(255)),
+            Column('row_data', Text),
+            Column('error', Text),
+            Column('created_at', DateTime),
+        )
+        self.table.create(engine, checkfirst=True)
+
+    @property
+    def location(self):
+        return f'tabela {QUARANTINE_TABLE}'
+
+    def add(self, table_name, data, error):
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        with self.engine.begin() as conn:
+            conn.execute(
+                self.table.insert(),
+                [
+                    {
+                        'job': self.job,
+                        'table_name': table_name,
+                        'row_data': row,
+                        'error': error,
+                        'created_at': created_at,
+                    }
+                    for row in _rows_as_json(data)
+                ],
+            )
+
+
+# Quarentena em CSV: as colunas originais mais a coluna _erro, um arquivo
+# por tabela e job
+class QuarantineFile:
+    def __init__(self, job, directory=QUARANTINE_DIR):
+        self.job = job
+        self.directory = Path(directory)
+        self.paths = {}
+
+    @property
+    def location(self):
+        return ', '.join(str(path) for path in self.paths.values()) or str(
+            self.directory
+        )
+
+    def add(self, table_name, data, error):
+        path = self.paths.get(table_name)
+        if path is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.paths[table_name] = (
+                self.directory / f'{table_name}_{self.job}.csv'
+            )
+        data.assign(_erro=error).to_csv(
+            path, mode='a', index=False, header=not path.exists()
+        )
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, func, select
+from sqlalchemy import types as sqltypes
+
+from inject_db.core.categorical import map_distinct
+from inject_db.core.database import reflect_table
+
+# Acima desse número de linhas a tabela referenciada não é carregada em
+# memória: as chaves de cada bloco são resolvidas por consulta no banco
+MAX_INDEX_ROWS = 2000000
+
+# Linhas lidas por vez ao montar o índice e chaves por consulta no banco
+FETCH_BATCH = 100000
+LOOKUP_BATCH = 1000
+
+# Exemplos de chaves sem correspondência guardados para o relatório
+UNMATCHED_SAMPLES = 5
+
+
+# Coluna de id da tabela referenciada: a chave primária simples ou 'id'
+def id_column(table):
+    keys = list(table.primary_key.columns)
+    if len(keys) == 1:
+        return keys[0]
+    if 'id' in table.c:
+        return table.c['id']
+    raise ValueError(
+        f'A tabela {table.name} não tem uma chave primária simples nem coluna id.'
+    )
+
+
+# Texto de uma chave. Coluna de origem com células vazias é lida como float:
+# 12345 chega como 12345.0 e precisa voltar a ser '12345'
+def key_text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Índice chave natural -> id de uma tabela referenciada
+class KeyIndex:
+    def __init__(
+        self, engine, table_name, key_column, max_rows=MAX_INDEX_ROWS
+    ):
+        self.engine = engine
+        self.table = reflect_table(engine, table_name)
+        if key_column not in self.table.c:
+            raise ValueError(
+                f'Coluna {key_column} ausente na tabela {table_name}.'
+            )
+        self.key = self.table.c[key_column]
+        self.id = id_column(self.table)
+        self.numeric = isinstance(
+            self.key.type, (sqltypes.Integer, sqltypes.Numeric)
+        )
+        self.in_memory = self._count() <= max_rows
+        self.index = self.ids = None
+        if self.in_memory:
+            self.index, self.ids = self._load()
+
+    def _count(self):
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(func.count()).select_from(self.table)
+            ).scalar()
+
+    # Lê os pares (chave, id): todos, uma vez por job, ou só os das chaves
+    # informadas quando a tabela é grande demais para a memória
+    def _load(self, keys=None):
+        query = select(self.key, self.id).where(self.key.is_not(None))
+        if keys is None:
+            batches = [{}]
+        else:
+            query = query.where(
+                self.key.in_(bindparam('keys', expanding=True))
+            )
+            batches = [
+                {'keys': keys[start : start + LOOKUP_BATCH]}
+                for start in range(0, len(keys), LOOKUP_BATCH)
+            ]
+        rows = []
+        with self.engine.connect() as conn:
+            for params in batches:
+                result = conn.execution_options(stream_results=True).execute(
+                    query, params
+                )
+                while batch := result.fetchmany(FETCH_BATCH):
+                    rows.extend(batch)
+        pairs = pd.DataFrame.from_records(rows, columns=['key', 'id'])
+        pairs['key'] = self.normalize(pairs['key'].astype(object))
+        # Chaves repetidas na tabela referenciada: vale a primeira
+        pairs = pairs.drop_duplicates('key')
+        return pd.Index(pairs['key']), pairs['id'].to_numpy(dtype=object)
+
+    # Chaves comparadas como número ou texto, conforme a coluna referenciada
+    def normalize(self, keys):
+        if self.numeric:
+            return pd.to_numeric(keys, errors='coerce')
+        return keys.where(keys.isna(), keys.map(key_text))
+
+    # Ids de chaves distintas (None quando não encontrada)
+    def _ids(self, keys):
+        keys = self.normalize(keys)
+        index, ids = self.index, self.ids
+        if not self.in_memory:
+            index, ids = self._load(keys.dropna().unique().tolist())
+        positions = index.get_indexer(keys)
+        found = positions >= 0
+        result = np.full(len(keys), None, dtype=object)
+        result[found] = ids[positions[found]]
+        return result
+
+    # Troca cada chave pelo id; retorna os ids e a máscara das não
+    # encontradas. Normalização e busca rodam uma vez por chave distinta
+    # (o dicionário de uma coluna categórica), não uma vez por linha
+    def lookup(self, keys):
+        present = keys.notna().to_numpy()
+        ids = map_distinct(keys, self._ids)
+        return ids, present & ids.isna().to_numpy()
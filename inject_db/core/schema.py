@@ -0,0 +1,125 @@
+import pandas as pd
+from sqlalchemy import types as sqltypes
+
+from inject_db.core.categorical import categorical_columns, is_text
+
+TEXT = 'str'
+DATETIME = 'datetime64[ns]'
+BOOLEAN = 'boolean'
+
+# Textos aceitos numa coluna booleana, comparados em minúsculas
+BOOLEAN_TEXT = {
+    'true': True,
+    'false': False,
+    't': True,
+    'f': False,
+    '1': True,
+    '0': False,
+    'sim': True,
+    'não': False,
+    'nao': False,
+    'yes': True,
+    'no': False,
+}
+
+
+# Tipo do pandas para os valores de uma coluna de destino; None deixa a
+# inferência do pandas (decimais, horas...)
+def target_dtype(column_type):
+    if isinstance(column_type, sqltypes.Boolean):
+        return BOOLEAN
+    if isinstance(column_type, (sqltypes.Date, sqltypes.DateTime)):
+        return DATETIME
+    if isinstance(column_type, sqltypes.Integer):
+        return 'Int64'
+    if isinstance(column_type, sqltypes.Float):
+        return 'float64'
+    if isinstance(column_type, sqltypes.String):
+        return TEXT
+    return None
+
+
+def to_boolean(values):
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype(BOOLEAN)
+    if pd.api.types.is_numeric_dtype(values):
+        if not values.dropna().isin([0, 1]).all():
+            raise ValueError('Valores fora de 0/1 numa coluna booleana')
+        return values.astype(BOOLEAN)
+    text = values.astype('string').str.strip().str.lower()
+    flags = text.map(BOOLEAN_TEXT)
+    if (flags.isna() & text.notna()).any():
+        raise ValueError('Texto não reconhecido numa coluna booleana')
+    return flags.astype(BOOLEAN)
+
+
+# Converte os valores de uma coluna para o tipo do destino; levanta
+# ValueError/TypeError quando algum valor não converte
+def convert_values(values, dtype):
+    if dtype == DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        return pd.to_datetime(values)
+    if dtype == BOOLEAN:
+        return to_boolean(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values)
+    return values.astype(dtype)
+
+
+# Tipos de uma fonte, decididos uma vez por job:
+# - `parse`: tipos passados à leitura. Só texto e categorias, que nunca
+#   falham ao interpretar: a leitura não infere essas colunas e um valor
+#   como '00123' chega inteiro à coluna de texto
+# - `convert`: tipos numéricos, datas e booleanos aplicados a cada bloco
+#   lido. Um bloco que não converte (ex.: 'abc' numa coluna inteira) segue
+#   como foi lido, para a validação ou a quarentena apontarem as linhas
+class SourceSchema:
+    def __init__(self, parse=None, convert=None):
+        self.parse = parse or {}
+        self.convert = convert or {}
+        self.mismatched = {}
+
+    def apply(self, data):
+        for column, dtype in self.convert.items():
+            if column not in data.columns or data[column].dtype == dtype:
+                continue
+            try:
+                data[column] = convert_values(data[column], dtype)
+            except (TypeError, ValueError):
+                self.mismatched[column] = self.mismatched.get(column, 0) + 1
+        return data
+
+    def summary(self):
+        if not self.mismatched:
+            return None
+        return '; '.join(
+            f'{column}: {count} blocos com valores fora do tipo '
+            f'{self.convert[column]}, gravados como lidos'
+            for column, count in self.mismatched.items()
+        )
+
+
+# Combina a amostra do arquivo com os tipos das colunas de destino.
+# `targets` é {coluna de origem: [tipos das colunas de destino]}; None
+# marca um destino sem tipo útil (ex.: coluna trocada por id num
+# relacionamento). Sem um tipo único de destino, a amostra decide: texto
+# na amostra é lido como texto. Texto repetitivo vira categoria
+def infer_schema(sample, targets):
+    categorical = set(categorical_columns(sample))
+    parse, convert = {}, {}
+    for column, column_types in targets.items():
+        dtypes = {target_dtype(column_type) for column_type in column_types}
+        dtype = dtypes.pop() if len(dtypes) == 1 else None
+        if (
+            dtype is None
+            and column in sample.columns
+            and is_text(sample[column].dropna())
+            and sample[column].notna().any()
+        ):
+            dtype = TEXT
+        if dtype == TEXT:
+            parse[column] = 'category' if column in categorical else TEXT
+        elif dtype is not None:
+            convert[column] = dtype
+    return SourceSchema(parse, convert)
@@ -0,0 +1,161 @@
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import weakref
+
+from inject_db.core.memory import MB
+
+# Uploads maiores que isto são copiados para o disco e lidos por mmap
+SPOOL_THRESHOLD_BYTES = int(os.environ.get('INJECT_DB_SPOOL_MB', 64)) * MB
+
+# Pasta dos uploads copiados (padrão: pasta temporária do sistema)
+SPOOL_DIR = os.environ.get('INJECT_DB_SPOOL_DIR') or None
+
+# Pasta do servidor de onde arquivos podem ser importados pelo caminho;
+# sem ela a opção fica desligada
+SERVER_FILES_ROOT = os.environ.get('INJECT_DB_SERVER_FILES') or None
+
+# Tamanho de cada cópia ao gravar o upload no disco
+COPY_BUFFER_BYTES = MB
+
+
+class ServerFileError(ValueError):
+    pass
+
+
+# Mapeamento de um arquivo inteiro, compartilhado pelos cursores; é fechado
+# (e o arquivo temporário apagado) quando o último cursor é descartado
+class _Mapping:
+    def __init__(self, path, temporary=False):
+        self.path = path
+        self.size = os.path.getsize(path)
+        with open(path, 'rb') as file:
+            # Arquivo vazio não pode ser mapeado
+            self.data = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.size
+                else b''
+            )
+        weakref.finalize(self, _release, self.data, path, temporary)
+
+
+def _release(data, path, temporary):
+    if isinstance(data, mmap.mmap):
+        data.close()
+    if temporary:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# Arquivo binário lido direto do mmap: as páginas vêm do disco sob demanda
+# e ficam no cache do sistema, fora da memória do Python. Cada cursor tem a
+# própria posição; `reopen` cria outro sobre o mesmo mapeamento
+class MappedFile(io.BufferedIOBase):
+    def __init__(self, mapping, name=None, file_id=None):
+        super().__init__()
+        self._mapping = mapping
+        self._data = mapping.data
+        self._position = 0
+        self.name = name or os.path.basename(mapping.path)
+        self.file_id = file_id
+
+    @classmethod
+    def open(cls, path, name=None, temporary=False, file_id=None):
+        return cls(_Mapping(path, temporary), name, file_id)
+
+    # Caminho no disco, para bibliotecas que leem melhor por caminho
+    @property
+    def path(self):
+        return self._mapping.path
+
+    @property
+    def size(self):
+        return self._mapping.size
+
+    def reopen(self):
+        return MappedFile(self._mapping, self.name, self.file_id)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f'Posição negativa: {offset}')
+        self._position = offset
+        return offset
+
+    def read(self, size=-1):
+        start = self._position
+        end = self.size if size is None or size < 0 else start + size
+        data = self._data[start:end]
+        self._position = start + len(data)
+        return data
+
+    read1 = read
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readline(self, size=-1):
+        end = self._data.find(b'\n', self._position) + 1 or self.size
+        if size is not None and size >= 0:
+            end = min(end, self._position + size)
+        return self.read(end - self._position)
+
+
+# Copia um upload grande para o disco e devolve o arquivo mapeado; uploads
+# pequenos seguem em memória
+def spool_upload(file, threshold=SPOOL_THRESHOLD_BYTES, directory=SPOOL_DIR):
+    size = getattr(file, 'size', None)
+    if size is None or size <= threshold:
+        return file
+    name = getattr(file, 'name', None)
+    suffix = os.path.splitext(name or '')[1]
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(
+        prefix='inject_db_', suffix=suffix, dir=directory, delete=False
+    ) as spooled:
+        shutil.copyfileobj(file, spooled, COPY_BUFFER_BYTES)
+    file.seek(0)
+    return MappedFile.open(
+        spooled.name,
+        name=name,
+        temporary=True,
+        file_id=getattr(file, 'file_id', None),
+    )
+
+
+# Abre um arquivo da pasta do servidor sem passar pelo upload; caminhos
+# fora da pasta configurada são recusados
+def open_server_file(path, root=SERVER_FILES_ROOT):
+    if not root:
+        raise ServerFileError(
+            'A importação pelo caminho está desligada; defina '
+            'INJECT_DB_SERVER_FILES com a pasta permitida.'
+        )
+    root = os.path.realpath(root)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full_path]) != root:
+        raise ServerFileError(f'O caminho {path} está fora de {root}.')
+    if not os.path.isfile(full_path):
+        raise ServerFileError(f'Arquivo não encontrado: {path}')
+    stat = os.stat(full_path)
+    return MappedFile.open(
+        full_path, file_id=(full_path, stat.st_mtime_ns, stat.st_size)
+    )
@@ -0,0 +1,141 @@
+import pandas as pd
+from sqlalchemy import types as sqltypes
+
+# Exemplos de valores inválidos guardados por coluna e problema
+SAMPLES = 3
+
+NULL = 'nulo em coluna NOT NULL'
+MISSING = 'coluna NOT NULL sem mapeamento nem valor padrão'
+TOO_LONG = 'texto maior que o limite'
+NOT_INTEGER = 'não é um número inteiro'
+NOT_NUMBER = 'não é um número'
+NOT_DATE = 'não é uma data'
+NOT_BOOLEAN = 'não é um booleano'
+
+BOOLEAN_VALUES = {'true', 'false', 't', 'f', '1', '0', '1.0', '0.0'}
+
+
+class ValidationError(ValueError):
+    def __init__(self, table_name, violations):
+        self.table_name = table_name
+        self.violations = violations
+        lines = [
+            f'{row.coluna}: {row.linhas} linhas - {row.problema}'
+            + (
+                f" (ex.: {', '.join(map(str, row.exemplos))})"
+                if row.exemplos
+                else ''
+            )
+            for row in violations.itertuples()
+        ]
+        super().__init__(
+            f'Dados inválidos para a tabela {table_name}:\n' + '\n'.join(lines)
+        )
+
+
+# Coluna que o banco preenche sozinho quando não recebe valor
+def has_default(column):
+    return (
+        column.default is not None
+        or column.server_default is not None
+        or column.nullable
+        or (
+            column.primary_key
+            and isinstance(column.type, sqltypes.Integer)
+            and column.autoincrement in ('auto', True)
+        )
+    )
+
+
+def _integers(values):
+    numbers = pd.to_numeric(values, errors='coerce')
+    return numbers.isna() | (numbers % 1 != 0)
+
+
+def _numbers(values):
+    return pd.to_numeric(values, errors='coerce').isna()
+
+
+# O formato é inferido do primeiro valor e aplicado ao bloco todo; só o que
+# falhar é tentado de novo valor a valor, para aceitar formatos misturados
+def _dates(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Series(False, index=values.index)
+    invalid = pd.to_datetime(values, errors='coerce').isna()
+    if invalid.any():
+        retry = pd.to_datetime(
+            values[invalid], errors='coerce', format='mixed'
+        )
+        invalid[invalid] = retry.isna()
+    return invalid
+
+
+def _booleans(values):
+    if pd.api.types.is_bool_dtype(values):
+        return pd.Series(False, index=values.index)
+    return ~values.astype(str).str.lower().isin(BOOLEAN_VALUES)
+
+
+# Verificação de conteúdo por tipo refletido; recebe só os valores não nulos
+# e devolve a máscara dos inválidos
+TYPE_CHECKS = (
+    (sqltypes.Integer, NOT_INTEGER, _integers),
+    (sqltypes.Numeric, NOT_NUMBER, _numbers),
+    (sqltypes.DateTime, NOT_DATE, _dates),
+    (sqltypes.Date, NOT_DATE, _dates),
+    (sqltypes.Boolean, NOT_BOOLEAN, _booleans),
+)
+
+
+def _type_check(column_type):
+    for type_class, problem, check in TYPE_CHECKS:
+        if isinstance(column_type, type_class):
+            return problem, check
+    return None
+
+
+# Confere um bloco contra tipos, tamanhos e nulidade da tabela refletida;
+# retorna um DataFrame com uma linha por coluna e problema encontrado
+def find_violations(data, table):
+    found = []
+
+    def add(column, problem, invalid, values):
+        count = int(invalid.sum())
+        if count:
+            examples = []
+            if problem != NULL:
+                examples = values[invalid].drop_duplicates().head(SAMPLES)
+                examples = examples.tolist()
+            found.append((column, problem, count, examples))
+
+    for column in table.columns:
+        if column.name not in data.columns:
+            if not has_default(column):
+                found.append((column.name, MISSING, len(data), []))
+            continue
+
+        values = data[column.name]
+        present = values.notna()
+        if not column.nullable:
+            add(column.name, NULL, ~present, values)
+
+        values = values[present]
+        if values.empty:
+            continue
+        check = _type_check(column.type)
+        if check is not None:
+            problem, check_values = check
+            add(column.name, problem, check_values(values), values)
+
+        length = getattr(column.type, 'length', None)
+        if isinstance(column.type, sqltypes.String) and length:
+            add(
+                column.name,
+                TOO_LONG,
+                values.astype(str).str.len() > length,
+                values,
+            )
+
+    return pd.DataFrame(
+        found, columns=['coluna', 'problema', 'linhas', 'exemplos']
+    )
@@ -0,0 +1,139 @@
+import importlib.util
+
+import pandas as pd
+import streamlit as st
+
+from inject_db.core.memory import READ_EXPANSION
+from inject_db.core.pipeline import Reader
+from inject_db.core.ui import run_importer
+
+# Assinaturas do início de cada formato colunar
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc', '.arrows')
+
+FILE_TYPES = ['parquet', 'arrow', 'feather', 'ipc', 'arrows']
+
+
+def pyarrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+# Leitor de Parquet e Arrow IPC (Feather v2): lê só as colunas mapeadas, um
+# row group (ou record batch) por vez, e tira colunas e total de linhas dos
+# metadados, sem ler os dados
+class ParquetReader(Reader):
+    format = 'parquet'
+    # A compressão fica dentro do arquivo, por coluna
+    compressible = False
+
+    def kind(self):
+        name = self.name.lower()
+        if name.endswith('.parquet'):
+            return 'parquet'
+        if name.endswith(ARROW_EXTENSIONS):
+            return 'arrow'
+        head = self._rewind().read(len(ARROW_FILE_MAGIC))
+        return 'parquet' if head.startswith(PARQUET_MAGIC) else 'arrow'
+
+    # Arquivos no disco são mapeados pelo próprio Arrow; uploads em memória
+    # são lidos pelo objeto de arquivo
+    def _source(self):
+        path = getattr(self.file, 'path', None)
+        if path is None:
+            return self._rewind()
+        import pyarrow as pa
+
+        return pa.memory_map(path)
+
+    def _parquet_file(self):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(self._source())
+
+    # Arquivo IPC com índice de batches, ou fluxo IPC lido em sequência
+    def _arrow_batches(self):
+        import pyarrow as pa
+
+        try:
+            reader = pa.ipc.open_file(self._source())
+        except pa.ArrowInvalid:
+            yield from pa.ipc.open_stream(self._source())
+            return
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+    def _arrow_schema(self):
+        import pyarrow as pa
+
+        try:
+            return pa.ipc.open_file(self._source()).schema
+        except pa.ArrowInvalid:
+            return pa.ipc.open_stream(self._source()).schema
+
+    def columns(self):
+        if self.kind() == 'parquet':
+            return list(self._parquet_file().schema_arrow.names)
+        return list(self._arrow_schema().names)
+
+    def estimated_rows(self):
+        if self.kind() == 'parquet':
+            return self._parquet_file().metadata.num_rows
+        return None
+
+    # Só um row group descomprimido fica em memória por vez
+    def estimated_bytes(self):
+        if self.kind() != 'parquet':
+            return super().estimated_bytes()
+        metadata = self._parquet_file().metadata
+        largest = max(
+            (
+                metadata.row_group(i).total_byte_size
+                for i in range(metadata.num_row_groups)
+            ),
+            default=0,
+        )
+        return largest * READ_EXPANSION['parquet']
+
+    def _read_preview(self, rows):
+        return next(iter(self._batches(rows)), pd.DataFrame())
+
+    def _batches(self, size, columns=None):
+        if self.kind() == 'parquet':
+            batches = self._parquet_file().iter_batches(
+                batch_size=size, columns=columns
+            )
+        else:
+            batches = (
+                batch.select(columns) if columns else batch
+                for batch in self._arrow_batches()
+            )
+        for batch in batches:
+            # Batches do IPC têm o tamanho gravado: são fatiados no tamanho
+            # do bloco; as fatias não copiam os dados
+            for start in range(0, batch.num_rows, size):
+                yield batch.slice(start, size).to_pandas()
+
+    # Os tipos vêm do esquema do arquivo: `dtype` não é usado na leitura
+    def read_chunks(self, columns=None, dtype=None):
+        yield from self._batches(self.chunksize, columns or None)
+
+
+def run():
+    if not pyarrow_available():
+        st.error(
+            'A importação de Parquet e Arrow precisa do pacote pyarrow '
+            '(pip install pyarrow).'
+        )
+        return
+    run_importer(
+        ParquetReader,
+        prefix='parquet',
+        header='Processamento de Arquivo Parquet / Arrow com Seleção Dinâmica',
+        title='Inserção de Dados em Banco via Parquet com Seleção Dinâmica',
+        uploader_label='Faça upload do seu arquivo Parquet ou Arrow IPC',
+        file_types=FILE_TYPES,
+        field_label='Campo Parquet',
+        mapping_title='Mapeamento de Campos Parquet para o Banco de Dados',
+    )
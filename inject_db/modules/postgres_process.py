@@ -1,224 +1,932 @@
 import json
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine
-
-
-def run():
-    def connect_db(dbname, user, password, host, port):
-        conn_str = f'postgresql://{user}:{password}@{host}:{port}/{dbname}'
-        engine = create_engine(conn_str)
-        return engine
-
-    def get_tables(engine):
-        query = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
-        tables = pd.read_sql(query, engine)
-        return tables['table_name'].tolist()
-
-    def get_columns(engine, table_name):
-        query = f"SELECT column_name FROM information_schema.columns WHERE table_name = '{table_name}'"
-        columns = pd.read_sql(query, engine)
-        return columns['column_name'].tolist()
-
-    def generate_uuid():
-        return str(uuid.uuid4())
-
-    def fill_missing_uuids(data, id_column='id'):
-        if id_column not in data.columns:
-            data[id_column] = [generate_uuid() for _ in range(len(data))]
+from sqlalchemy import bindparam, create_engine, text
+
+from inject_db.core.batching import AdaptiveBatchSize
+from inject_db.core.categorical import map_distinct
+from inject_db.core.jobs import get_job_manager
+from inject_db.core.memory import (
+    MemoryBudgetExceeded,
+    MemoryTracker,
+    budget_input,
+)
+from inject_db.core.metrics import JobMetrics, frame_bytes
+from inject_db.core.pipe import BoundedPipe, PipeClosed
+from inject_db.core.ui import (
+    SCHEMA_CACHE_TTL,
+    job_submitted,
+    priority_input,
+    redraw_panel,
+    submit_job,
+    timed_fragment,
+    ui_metrics,
+)
+
+# Tipos do PostgreSQL tratados como colunas JSON
+JSON_TYPES = ('json', 'jsonb')
+
+# Quantidade de linhas lidas da origem por vez
+DEFAULT_CHUNKSIZE = 10000
+
+# Divisões da tabela de origem para a transferência em paralelo
+PARTITION_METHODS = {
+    'minmax': 'Faixas iguais entre o mínimo e o máximo da coluna',
+    'quantiles': 'Quantis de uma amostra da coluna (chaves desbalanceadas)',
+    'ctid': 'Faixas de páginas físicas (ctid, apenas PostgreSQL)',
+}
+
+DEFAULT_PARTITIONS = 4
+
+# Linhas amostradas (TABLESAMPLE) para calcular os quantis no PostgreSQL
+QUANTILE_SAMPLE_ROWS = 100000
+
+# Serializador reaproveitado para todas as linhas de um bloco
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def connect_db(dbname, user, password, host, port):
+    conn_str = f'postgresql://{user}:{password}@{host}:{port}/{dbname}'
+    engine = create_engine(conn_str)
+    return engine
+
+
+def get_tables(engine):
+    query = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+    tables = pd.read_sql(query, engine)
+    return tables['table_name'].tolist()
+
+
+def get_columns(engine, table_name):
+    query = f"SELECT column_name FROM information_schema.columns WHERE table_name = '{table_name}'"
+    columns = pd.read_sql(query, engine)
+    return columns['column_name'].tolist()
+
+
+# Função para obter o tipo de cada coluna de uma tabela
+def get_column_types(engine, table_name):
+    query = text(
+        'SELECT column_name, data_type FROM information_schema.columns '
+        'WHERE table_name = :table_name'
+    )
+    types = pd.read_sql(query, engine, params={'table_name': table_name})
+    return dict(zip(types['column_name'], types['data_type']))
+
+
+# Tipo de cada coluna pelo catálogo: (data_type, udt_name). O udt_name
+# distingue o elemento dos arrays (_int4, _text) e o nome dos tipos criados
+# pelo usuário, que no data_type aparecem só como ARRAY e USER-DEFINED
+def get_column_udts(engine, table_name):
+    query = text(
+        'SELECT column_name, data_type, udt_name FROM '
+        'information_schema.columns WHERE table_name = :table_name'
+    )
+    types = pd.read_sql(query, engine, params={'table_name': table_name})
+    return {
+        column: (data_type, udt_name)
+        for column, data_type, udt_name in types.itertuples(index=False)
+    }
+
+
+# Função para identificar as colunas JSON/JSONB pelo esquema da origem
+def get_json_columns(engine, table_name, columns):
+    types = get_column_types(engine, table_name)
+    return [column for column in columns if types.get(column) in JSON_TYPES]
+
+
+def is_postgres(engine):
+    return engine.dialect.name == 'postgresql'
+
+
+# Total aproximado de linhas pelas estatísticas do PostgreSQL, sem COUNT(*)
+def estimate_rows(engine, table_name):
+    if not is_postgres(engine):
+        return None
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                'SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)'
+            ),
+            {'table': table_name},
+        ).scalar()
+    if rows is None or rows < 0:
+        return None
+    return int(rows)
+
+
+# Monta a consulta da origem, lendo como texto as colunas indicadas
+def build_select_query(table_name, columns, text_columns=(), where=None):
+    fields = [
+        f'{column}::text AS {column}' if column in text_columns else column
+        for column in columns
+    ]
+    query = f"SELECT {', '.join(fields)} FROM {table_name}"
+    if where:
+        query += f' WHERE {where}'
+    return query
+
+
+# Função para ler a consulta em blocos; o tamanho pode mudar a cada bloco
+def read_chunks(engine, query, chunksize, params=None):
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(
+            text(query), params or {}
+        )
+        columns = list(result.keys())
+        while True:
+            size = chunksize() if callable(chunksize) else chunksize
+            rows = result.fetchmany(size)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+# Condições [(where, parâmetros)] que cobrem a tabela sem sobreposição:
+# uma faixa por limite, mais as linhas com a coluna nula
+def range_conditions(column, bounds):
+    conditions = []
+    for i in range(len(bounds) + 1):
+        parts, params = [], {}
+        if i > 0:
+            parts.append(f'{column} >= :low')
+            params['low'] = bounds[i - 1]
+        if i < len(bounds):
+            parts.append(f'{column} < :high')
+            params['high'] = bounds[i]
+        conditions.append(
+            (' AND '.join(parts) or f'{column} IS NOT NULL', params)
+        )
+    conditions.append((f'{column} IS NULL', {}))
+    return conditions
+
+
+# Limites em passos iguais entre o mínimo e o máximo (números e datas)
+def minmax_bounds(engine, table_name, column, count):
+    with engine.connect() as conn:
+        low, high = conn.execute(
+            text(f'SELECT MIN({column}), MAX({column}) FROM {table_name}')
+        ).one()
+    if low is None:
+        return []
+    try:
+        if isinstance(low, int) and isinstance(high, int):
+            step = -(-(high - low + 1) // count)
+            bounds = [low + step * i for i in range(1, count)]
         else:
-            data[id_column] = data[id_column].fillna(generate_uuid())
-        return data
-
-    def transfer_data(
-        source_engine, dest_engine, query, table_dest, selected_columns
-    ):
-        data = pd.read_sql(query, source_engine)
-
-        data = fill_missing_uuids(data, id_column='id')
-
-        for column in data.columns:
-            if isinstance(data[column].iloc[0], dict):
-                data[column] = data[column].apply(json.dumps)
+            bounds = [low + (high - low) / count * i for i in range(1, count)]
+    except TypeError as e:
+        raise ValueError(
+            f'A coluna {column} não é numérica nem data; '
+            'use a divisão por quantis.'
+        ) from e
+    return sorted({bound for bound in bounds if low < bound <= high})
+
+
+# Limites nos quantis da coluna; no PostgreSQL, sobre uma amostra da tabela
+def quantile_bounds(engine, table_name, column, count):
+    fractions = [i / count for i in range(1, count)]
+    with engine.connect() as conn:
+        if is_postgres(engine):
+            rows = estimate_rows(engine, table_name) or 0
+            sample = ''
+            if rows > QUANTILE_SAMPLE_ROWS:
+                percent = 100 * QUANTILE_SAMPLE_ROWS / rows
+                sample = f' TABLESAMPLE SYSTEM ({percent:.6f})'
+            bounds = conn.execute(
+                text(
+                    'SELECT percentile_disc(CAST(:fractions AS float8[])) '
+                    f'WITHIN GROUP (ORDER BY {column}) '
+                    f'FROM {table_name}{sample}'
+                ),
+                {'fractions': fractions},
+            ).scalar()
+        else:
+            # Sem amostragem no banco: o valor em cada posição da ordenação
+            total = conn.execute(
+                text(f'SELECT COUNT({column}) FROM {table_name}')
+            ).scalar()
+            query = text(
+                f'SELECT {column} FROM {table_name} '
+                f'WHERE {column} IS NOT NULL ORDER BY {column} '
+                'LIMIT 1 OFFSET :offset'
+            )
+            bounds = [
+                conn.execute(query, {'offset': int(total * f)}).scalar()
+                for f in fractions
+                if total
+            ]
+    return sorted({bound for bound in bounds or () if bound is not None})
+
+
+# Faixas de páginas físicas; a última fica aberta para as linhas que
+# chegarem durante a cópia (PostgreSQL 14+ lê cada faixa com TID Range Scan)
+def ctid_conditions(engine, table_name, count):
+    if not is_postgres(engine):
+        raise ValueError(
+            'A divisão por ctid está disponível apenas no PostgreSQL.'
+        )
+    with engine.connect() as conn:
+        pages = conn.execute(
+            text(
+                'SELECT pg_relation_size(to_regclass(:table)) '
+                "/ current_setting('block_size')::int"
+            ),
+            {'table': table_name},
+        ).scalar()
+    step = max(-(-(pages or 0) // count), 1)
+    conditions = []
+    for start in range(0, max(pages or 0, 1), step):
+        where = 'ctid >= CAST(:low AS tid)'
+        params = {'low': f'({start},0)'}
+        if start + step < pages:
+            where += ' AND ctid < CAST(:high AS tid)'
+            params['high'] = f'({start + step},0)'
+        conditions.append((where, params))
+    return conditions
+
+
+def partition_conditions(
+    engine, table_name, column, count=DEFAULT_PARTITIONS, method='minmax'
+):
+    if method == 'ctid':
+        return ctid_conditions(engine, table_name, count)
+    if method == 'quantiles':
+        bounds = quantile_bounds(engine, table_name, column, count)
+    elif method == 'minmax':
+        bounds = minmax_bounds(engine, table_name, column, count)
+    else:
+        raise ValueError(f'Divisão desconhecida: {method}')
+    return range_conditions(column, bounds)
+
+
+# Formato do COPY direto: binário quando os tipos das colunas coincidem na
+# origem e no destino, texto quando precisam de conversão pelo servidor.
+# Tipos criados pelo usuário (enums, compostos) podem ter o mesmo nome e
+# outra definição em cada banco: vão sempre como texto
+def direct_copy_format(
+    source_engine, dest_engine, table_src, table_dest, columns
+):
+    source_types = get_column_udts(source_engine, table_src)
+    dest_types = get_column_udts(dest_engine, table_dest)
+    for column in columns:
+        source_type = source_types.get(column)
+        if source_type is None or source_type != dest_types.get(column):
+            return 'text'
+        if source_type[0] == 'USER-DEFINED':
+            return 'text'
+    return 'binary'
+
+
+# Entre dois PostgreSQL e sem transformação, os bytes do COPY TO STDOUT da
+# origem seguem direto para o COPY FROM STDIN do destino por um buffer
+# limitado; as linhas nunca são decodificadas em Python. `progress` recebe 0
+# a cada bloco (ponto de cancelamento) e o total de linhas no fim
+def copy_pipe(
+    source_engine,
+    dest_engine,
+    table_src,
+    table_dest,
+    selected_columns,
+    progress=None,
+    where=None,
+    params=None,
+    copy_format=None,
+    metrics=None,
+):
+    if not (is_postgres(source_engine) and is_postgres(dest_engine)):
+        raise ValueError(
+            'A cópia direta está disponível apenas entre bancos PostgreSQL.'
+        )
+    if metrics is None:
+        metrics = JobMetrics('postgres')
+    if copy_format is None:
+        copy_format = direct_copy_format(
+            source_engine, dest_engine, table_src, table_dest, selected_columns
+        )
+    select = build_select_query(table_src, selected_columns, where=where)
+    if params:
+        # O COPY não aceita parâmetros: os limites entram como literais
+        select = str(
+            text(select)
+            .bindparams(**params)
+            .compile(
+                dialect=source_engine.dialect,
+                compile_kwargs={'literal_binds': True},
+            )
+        )
+    pipe = BoundedPipe(
+        on_chunk=(lambda size: progress(0)) if progress is not None else None
+    )
+    errors = []
 
-        missing_cols = set(selected_columns) - set(
-            get_columns(dest_engine, table_dest)
+    def produce():
+        conn = source_engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.copy_expert(
+                f'COPY ({select}) TO STDOUT (FORMAT {copy_format})', pipe
+            )
+            pipe.finish()
+        except PipeClosed:
+            # O destino desistiu do canal: o erro que vale é o dele
+            pass
+        except BaseException as e:
+            errors.append(e)
+            pipe.fail(e)
+        finally:
+            conn.close()
+
+    producer = threading.Thread(
+        target=produce, name='inject-db-copy-source', daemon=True
+    )
+    with metrics.stage('copy') as record:
+        conn = dest_engine.raw_connection()
+        producer.start()
+        try:
+            cursor = conn.cursor()
+            cursor.copy_expert(
+                f"COPY {table_dest} ({', '.join(selected_columns)}) "
+                f'FROM STDIN (FORMAT {copy_format})',
+                pipe,
+                size=pipe.chunk_bytes,
+            )
+            rows = cursor.rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            pipe.close()
+            producer.join()
+            # O erro da origem explica a falha melhor que o canal fechado
+            if errors:
+                raise errors[0]
+            raise
+        finally:
+            conn.close()
+        producer.join()
+        record.rows = rows
+        record.bytes = pipe.bytes_written
+    if progress is not None:
+        progress(rows)
+    return rows
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+def fill_missing_uuids(data, id_column='id'):
+    if id_column not in data.columns:
+        data[id_column] = [generate_uuid() for _ in range(len(data))]
+    else:
+        data[id_column] = data[id_column].fillna(generate_uuid())
+    return data
+
+
+# Serializa as colunas JSON de um bloco, ignorando nulos. Textos também são
+# serializados: um escalar JSON como "abc" chega do driver como abc
+def serialize_json_columns(data, json_columns):
+    for column in json_columns:
+        values = data[column]
+        mask = values.notna().to_numpy()
+        if not mask.any():
+            continue
+        encoded = values.to_numpy(dtype=object, copy=True)
+        encoded[mask] = [_json_encode(value) for value in encoded[mask]]
+        data[column] = encoded
+    return data
+
+
+# Ids da tabela de destino para valores distintos de uma coluna
+def relationship_ids(dest_engine, rel_dest_table, rel_dest_col, values):
+    if values.empty:
+        return []
+    rel_query = text(
+        f'SELECT {rel_dest_col}, id FROM {rel_dest_table} '
+        f'WHERE {rel_dest_col} IN :values'
+    ).bindparams(bindparam('values', expanding=True))
+    rel_data = pd.read_sql(
+        rel_query, dest_engine, params={'values': values.tolist()}
+    )
+    rel_map = dict(zip(rel_data[rel_dest_col], rel_data['id']))
+    return values.map(rel_map)
+
+
+# Substitui os valores das colunas relacionadas pelo id da tabela de destino;
+# a consulta e a troca são feitas uma vez por valor distinto, e o resultado
+# volta às linhas pelos códigos
+def apply_relationships(data, dest_engine, relationships):
+    for src_col, rel_dest_table, rel_dest_col in relationships:
+        data[src_col] = map_distinct(
+            data[src_col],
+            lambda values: relationship_ids(
+                dest_engine, rel_dest_table, rel_dest_col, values
+            ),
         )
-        if missing_cols:
+    return data
+
+
+def transfer_data(
+    source_engine,
+    dest_engine,
+    table_src,
+    table_dest,
+    selected_columns,
+    relationships=(),
+    chunksize=DEFAULT_CHUNKSIZE,
+    metrics=None,
+    budget=None,
+    progress=None,
+    where=None,
+    params=None,
+    direct=False,
+):
+    if metrics is None:
+        metrics = JobMetrics('postgres')
+    if budget is not None:
+        # Recusa o início se o processo já estiver acima do orçamento
+        budget.check_start(0)
+
+    missing_cols = set(selected_columns) - set(
+        get_columns(dest_engine, table_dest)
+    )
+    if missing_cols:
+        raise ValueError(
+            f'As colunas a seguir estão ausentes na tabela de destino: {missing_cols}'
+        )
+
+    if direct:
+        if relationships:
             raise ValueError(
-                f'As colunas a seguir estão ausentes na tabela de destino: {missing_cols}'
+                'A cópia direta não aplica relacionamentos; remova-os ou '
+                'desative a cópia direta.'
             )
+        return copy_pipe(
+            source_engine,
+            dest_engine,
+            table_src,
+            table_dest,
+            selected_columns,
+            progress=progress,
+            where=where,
+            params=params,
+            metrics=metrics,
+        )
 
-        if 'relationships' in st.session_state:
-            for src_col, rel_dest_table, rel_dest_col in st.session_state[
-                'relationships'
-            ]:
-                unique_values = data[src_col].unique()
+    json_columns = get_json_columns(source_engine, table_src, selected_columns)
+    # Com origem PostgreSQL o JSON é lido como texto e gravado sem conversão,
+    # qualquer que seja o destino
+    passthrough = is_postgres(source_engine)
+    query = build_select_query(
+        table_src, selected_columns, json_columns if passthrough else (), where
+    )
+
+    total_rows = 0
+    chunk_rows = chunksize
+    # Lotes de escrita ajustados pela latência de cada to_sql
+    sizer = AdaptiveBatchSize(chunksize, name=table_dest)
+    chunks = read_chunks(source_engine, query, lambda: chunk_rows, params)
+    for batch, data in enumerate(metrics.iter_stage('read', chunks)):
+        with metrics.stage('ids', batch, len(data)):
+            data = fill_missing_uuids(data, id_column='id')
+
+        if not passthrough:
+            with metrics.stage('transform', batch, len(data)):
+                data = serialize_json_columns(data, json_columns)
+
+        with metrics.stage('relationships', batch, len(data)):
+            data = apply_relationships(data, dest_engine, relationships)
+
+        for part in sizer.batches(data):
+            with metrics.stage('write', batch) as record:
+                record.measure(part)
+                part.to_sql(
+                    table_dest, dest_engine, if_exists='append', index=False
+                )
+            sizer.record(len(part), record.seconds)
+        total_rows += len(data)
+        if progress is not None:
+            progress(len(data))
+
+        # O próximo bloco lido já vem no tamanho dos lotes, que pode passar
+        # do `chunksize` inicial, e cabe no orçamento de memória
+        if len(data):
+            row_bytes = frame_bytes(data) / len(data)
+            chunk_rows = sizer.next_size(row_bytes)
+            if budget is not None:
+                chunk_rows = budget.fit_batch_size(chunk_rows, row_bytes)
+    return total_rows
+
+
+# Transferência de uma tabela grande dividida em faixas da origem; cada
+# faixa usa a própria thread e as próprias conexões, e o resultado de cada
+# uma entra no relatório do job
+class PartitionedTransfer:
+    def __init__(
+        self,
+        source_engine,
+        dest_engine,
+        table_src,
+        table_dest,
+        selected_columns,
+        relationships=(),
+        column=None,
+        partitions=DEFAULT_PARTITIONS,
+        method='minmax',
+        workers=None,
+        chunksize=DEFAULT_CHUNKSIZE,
+        metrics=None,
+        budget=None,
+        direct=False,
+    ):
+        self.source_engine = source_engine
+        self.dest_engine = dest_engine
+        self.table_src = table_src
+        self.table_dest = table_dest
+        self.selected_columns = selected_columns
+        self.relationships = relationships
+        self.column = column
+        self.partitions = partitions
+        self.method = method
+        self.workers = workers or partitions
+        self.chunksize = chunksize
+        self.metrics = metrics or JobMetrics('postgres')
+        self.budget = budget
+        self.direct = direct
+        self.results = []
+
+    def _transfer(self, result, where, params, progress):
+        def advance(rows):
+            result['rows'] += rows
+            if progress is not None:
+                progress(rows)
+
+        result['status'] = 'running'
+        start = time.perf_counter()
+        try:
+            transfer_data(
+                self.source_engine,
+                self.dest_engine,
+                self.table_src,
+                self.table_dest,
+                self.selected_columns,
+                self.relationships,
+                chunksize=self.chunksize,
+                metrics=self.metrics,
+                budget=self.budget,
+                progress=advance,
+                where=where,
+                params=params,
+                direct=self.direct,
+            )
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+            raise
+        else:
+            result['status'] = 'done'
+        finally:
+            result['seconds'] = time.perf_counter() - start
+
+    # Uma falha não interrompe as outras faixas: o relatório aponta quais
+    # refazer, e o primeiro erro é repassado ao job
+    def run(self, progress=None):
+        conditions = partition_conditions(
+            self.source_engine,
+            self.table_src,
+            self.column,
+            self.partitions,
+            self.method,
+        )
+        self.results = [
+            {
+                'partition': where,
+                'params': params,
+                'rows': 0,
+                'seconds': 0.0,
+                'status': 'queued',
+                'error': None,
+            }
+            for where, params in conditions
+        ]
+        with ThreadPoolExecutor(
+            min(self.workers, len(conditions)),
+            thread_name_prefix='inject-db-partition',
+        ) as pool:
+            futures = [
+                pool.submit(
+                    self._transfer,
+                    result,
+                    result['partition'],
+                    result['params'],
+                    progress,
+                )
+                for result in self.results
+            ]
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+        return sum(result['rows'] for result in self.results)
+
+    def report(self):
+        return pd.DataFrame(
+            self.results,
+            columns=[
+                'partition',
+                'params',
+                'rows',
+                'seconds',
+                'status',
+                'error',
+            ],
+        )
 
-                if len(unique_values) > 0:
-                    rel_query = f"SELECT {rel_dest_col}, id FROM {rel_dest_table} WHERE {rel_dest_col} IN ({', '.join(map(str, unique_values))})"
-                    rel_data = pd.read_sql(rel_query, dest_engine)
+    def messages(self):
+        messages = []
+        for i, result in enumerate(self.results, 1):
+            line = (
+                f"Partição {i} ({result['partition']} {result['params']}): "
+                f"{result['rows']} linhas em {result['seconds']:.1f}s"
+            )
+            if result['error']:
+                line += f" · falhou: {result['error']}"
+            messages.append(line)
+        return messages
 
-                    rel_map = dict(zip(rel_data[rel_dest_col], rel_data['id']))
 
-                    data[src_col] = data[src_col].map(rel_map)
+@st.cache_data(ttl=SCHEMA_CACHE_TTL, show_spinner=False)
+def cached_tables(db_url, _engine):
+    return get_tables(_engine)
 
-        data.to_sql(table_dest, dest_engine, if_exists='append', index=False)
-        return data
 
-    st.title('Transferência de Dados entre Bancos de Dados PostgreSQL')
+@st.cache_data(ttl=SCHEMA_CACHE_TTL, show_spinner=False)
+def cached_columns(db_url, table_name, _engine):
+    return get_columns(_engine, table_name)
 
-    st.header('Conexão com o Banco de Dados de Origem')
-    dbname_src = st.text_input('Nome do banco de dados (Origem)')
-    user_src = st.text_input('Usuário (Origem)')
-    password_src = st.text_input('Senha (Origem)', type='password')
-    host_src = st.text_input('Host (Origem)', value='localhost')
-    port_src = st.text_input('Porta (Origem)', value='5432')
 
-    if st.button('Conectar ao Banco de Origem'):
-        try:
-            source_engine = connect_db(
-                dbname_src, user_src, password_src, host_src, port_src
-            )
-            st.session_state.source_engine = source_engine
-            st.success(
-                'Conexão com o banco de dados de origem estabelecida com sucesso!'
-            )
-        except Exception as e:
-            st.error(f'Erro ao conectar ao banco de origem: {e}')
+def engine_key(engine):
+    return engine.url.render_as_string(hide_password=False)
 
-    st.header('Conexão com o Banco de Dados de Destino')
-    dbname_dest = st.text_input('Nome do banco de dados (Destino)')
-    user_dest = st.text_input('Usuário (Destino)')
-    password_dest = st.text_input('Senha (Destino)', type='password')
-    host_dest = st.text_input('Host (Destino)', value='localhost')
-    port_dest = st.text_input('Porta (Destino)', value='5432')
 
-    if st.button('Conectar ao Banco de Destino'):
+# Formulário de conexão; digitar nos campos redesenha apenas este painel
+@timed_fragment('connection')
+def connection_panel(role, label):
+    st.header(f'Conexão com o Banco de Dados de {label}')
+    dbname = st.text_input(f'Nome do banco de dados ({label})')
+    user = st.text_input(f'Usuário ({label})')
+    password = st.text_input(f'Senha ({label})', type='password')
+    host = st.text_input(f'Host ({label})', value='localhost')
+    port = st.text_input(f'Porta ({label})', value='5432')
+
+    if st.button(f'Conectar ao Banco de {label}'):
         try:
-            dest_engine = connect_db(
-                dbname_dest, user_dest, password_dest, host_dest, port_dest
-            )
-            st.session_state.dest_engine = dest_engine
-            st.success(
-                'Conexão com o banco de dados de destino estabelecida com sucesso!'
+            st.session_state[f'{role}_engine'] = connect_db(
+                dbname, user, password, host, port
             )
         except Exception as e:
-            st.error(f'Erro ao conectar ao banco de dados de destino: {e}')
-
-    if (
-        'source_engine' in st.session_state
-        and 'dest_engine' in st.session_state
-    ):
-        st.header('Seleção de Tabelas e Colunas')
+            st.error(f'Erro ao conectar ao banco de {label.lower()}: {e}')
+        else:
+            # A seleção de tabelas depende da conexão: redesenha a página
+            st.rerun()
 
-        tables_src = get_tables(st.session_state.source_engine)
-        table_src = st.selectbox(
-            'Selecione a tabela de origem', tables_src, key='source_table'
+    if f'{role}_engine' in st.session_state:
+        st.success(
+            f'Conexão com o banco de dados de {label.lower()} estabelecida com sucesso!'
         )
 
-        columns_src = get_columns(st.session_state.source_engine, table_src)
-        selected_columns = st.multiselect(
-            'Selecione as colunas de origem',
-            columns_src,
-            default=columns_src,
-            key='source_columns',
+
+@timed_fragment('relationship_editor')
+def relationship_editor(dest_engine, columns_src, tables_dest):
+    st.header('Definir Relacionamentos')
+    activate_relationships = st.checkbox(
+        'Ativar configuração de relacionamentos', value=False
+    )
+
+    if not activate_relationships:
+        return
+
+    rel_source_col = st.selectbox(
+        'Selecione a coluna de origem para o relacionamento',
+        columns_src,
+        key='rel_source_col',
+    )
+
+    rel_dest_table = st.selectbox(
+        'Selecione a tabela de destino para o relacionamento',
+        tables_dest,
+        key='rel_dest_table',
+    )
+
+    if not rel_dest_table:
+        return
+
+    rel_dest_columns = cached_columns(
+        engine_key(dest_engine), rel_dest_table, dest_engine
+    )
+
+    rel_dest_col = st.selectbox(
+        'Selecione a coluna de destino para o relacionamento',
+        rel_dest_columns,
+        key='rel_dest_col',
+    )
+    st.write(f'Coluna de destino selecionada: {rel_dest_col}')
+
+    if st.button('Adicionar Relacionamento'):
+        if 'relationships' not in st.session_state:
+            st.session_state['relationships'] = []
+        st.session_state['relationships'].append(
+            (rel_source_col, rel_dest_table, rel_dest_col)
         )
+        st.success('Relacionamento adicionado com sucesso!')
+
+    if st.session_state.get('relationships'):
+        st.header('Relacionamentos Adicionados')
+
+        for i, (src_col, dest_table, dest_col) in enumerate(
+            st.session_state['relationships']
+        ):
+            st.write(f'Relacionamento {i + 1}:')
+            st.write(f'Coluna de origem: {src_col}')
+            st.write(f'Tabela de destino: {dest_table}')
+            st.write(f'Coluna de destino: {dest_col}')
+
+            if st.button(
+                f'Remover Relacionamento {i + 1}',
+                key=f'remove_relationship_{i}',
+            ):
+                st.session_state['relationships'].pop(i)
+                st.success(f'Relacionamento {i + 1} removido com sucesso!')
+                st.rerun(scope='fragment')
+    else:
+        st.write('Nenhum relacionamento adicionado.')
 
-        query = f"SELECT {', '.join(selected_columns)} FROM {table_src}"
 
-        tables_dest = get_tables(st.session_state.dest_engine)
-        dest_table = st.selectbox(
-            'Selecione a tabela de destino', tables_dest, key='dest_table'
-        )
+def run():
+    with ui_metrics().stage('page'):
+        transfer_page()
+    redraw_panel()
 
-        columns_dest = get_columns(st.session_state.dest_engine, dest_table)
-        dest_columns = st.multiselect(
-            'Selecione as colunas da tabela de destino',
-            columns_dest,
-            default=columns_dest,
-            key='dest_columns',
-        )
 
-        st.header('Definir Relacionamentos')
-        activate_relationships = st.checkbox(
-            'Ativar configuração de relacionamentos', value=False
-        )
+def transfer_page():
+    st.title('Transferência de Dados entre Bancos de Dados PostgreSQL')
 
-        if activate_relationships:
-            rel_source_col = st.selectbox(
-                'Selecione a coluna de origem para o relacionamento',
+    connection_panel('source', 'Origem')
+    connection_panel('dest', 'Destino')
+
+    if (
+        'source_engine' not in st.session_state
+        or 'dest_engine' not in st.session_state
+    ):
+        st.warning(
+            'Conecte-se aos bancos de dados de origem e destino antes de selecionar tabelas e colunas.'
+        )
+        return
+
+    source_engine = st.session_state.source_engine
+    dest_engine = st.session_state.dest_engine
+    source_key = engine_key(source_engine)
+    dest_key = engine_key(dest_engine)
+
+    st.header('Seleção de Tabelas e Colunas')
+
+    tables_src = cached_tables(source_key, source_engine)
+    table_src = st.selectbox(
+        'Selecione a tabela de origem', tables_src, key='source_table'
+    )
+
+    columns_src = cached_columns(source_key, table_src, source_engine)
+    selected_columns = st.multiselect(
+        'Selecione as colunas de origem',
+        columns_src,
+        default=columns_src,
+        key='source_columns',
+    )
+
+    tables_dest = cached_tables(dest_key, dest_engine)
+    dest_table = st.selectbox(
+        'Selecione a tabela de destino', tables_dest, key='dest_table'
+    )
+
+    columns_dest = cached_columns(dest_key, dest_table, dest_engine)
+    dest_columns = st.multiselect(
+        'Selecione as colunas da tabela de destino',
+        columns_dest,
+        default=columns_dest,
+        key='dest_columns',
+    )
+
+    relationship_editor(dest_engine, columns_src, tables_dest)
+
+    partitioned = st.checkbox(
+        'Transferir em paralelo, dividindo a tabela de origem em faixas',
+        key='partitioned',
+    )
+    if partitioned:
+        method = st.selectbox(
+            'Divisão da tabela',
+            list(PARTITION_METHODS),
+            format_func=PARTITION_METHODS.get,
+            key='partition_method',
+        )
+        partition_column = None
+        if method != 'ctid':
+            partition_column = st.selectbox(
+                'Coluna que define as faixas',
                 columns_src,
-                key='rel_source_col',
+                key='partition_column',
             )
+        partitions = int(
+            st.number_input(
+                'Número de partições',
+                min_value=2,
+                max_value=64,
+                value=DEFAULT_PARTITIONS,
+                key='partitions',
+            )
+        )
+
+    direct = st.checkbox(
+        'Cópia direta (COPY binário entre PostgreSQL, sem pandas)',
+        key='direct_copy',
+        help=(
+            'Os bytes do COPY da origem vão direto ao COPY do destino. '
+            'Não aplica relacionamentos nem gera ids para linhas sem id.'
+        ),
+    )
+
+    budget = budget_input()
+    priority = priority_input('postgres_priority')
 
-            rel_dest_table = st.selectbox(
-                'Selecione a tabela de destino para o relacionamento',
-                tables_dest,
-                key='rel_dest_table',
+    if st.button('Transferir Dados'):
+        try:
+            if budget is not None:
+                budget.check_start(0)
+        except MemoryBudgetExceeded as e:
+            st.error(f'Job interrompido pelo orçamento de memória: {e}')
+            return
+        tracker = MemoryTracker()
+        metrics = JobMetrics('postgres', memory=tracker)
+        relationships = list(st.session_state.get('relationships', []))
+        connections = 1
+
+        if partitioned:
+            # Cada partição ativa ocupa uma conexão do destino na fila
+            connections = min(
+                partitions, get_job_manager().max_connections_per_target
+            )
+            transfer = PartitionedTransfer(
+                source_engine,
+                dest_engine,
+                table_src,
+                dest_table,
+                selected_columns,
+                relationships,
+                column=partition_column,
+                partitions=partitions,
+                method=method,
+                workers=connections,
+                metrics=metrics,
+                budget=budget,
+                direct=direct,
             )
 
-            if rel_dest_table:
-                rel_dest_columns = get_columns(
-                    st.session_state.dest_engine, rel_dest_table
-                )
+            def run_job(job):
+                try:
+                    with tracker:
+                        rows = transfer.run(progress=job.advance)
+                    return {dest_table: rows}
+                finally:
+                    job.messages.extend(transfer.messages())
 
-                rel_dest_col = st.selectbox(
-                    'Selecione a coluna de destino para o relacionamento',
-                    rel_dest_columns,
-                    key='rel_dest_col',
-                )
-                st.write(f'Coluna de destino selecionada: {rel_dest_col}')
+        else:
 
-                if st.button('Adicionar Relacionamento'):
-                    if 'relationships' not in st.session_state:
-                        st.session_state['relationships'] = []
-                    st.session_state['relationships'].append(
-                        (rel_source_col, rel_dest_table, rel_dest_col)
+            def run_job(job):
+                with tracker:
+                    rows = transfer_data(
+                        source_engine,
+                        dest_engine,
+                        table_src,
+                        dest_table,
+                        selected_columns,
+                        relationships,
+                        metrics=metrics,
+                        budget=budget,
+                        progress=job.advance,
+                        direct=direct,
                     )
-                    st.success('Relacionamento adicionado com sucesso!')
-
-                if (
-                    'relationships' in st.session_state
-                    and st.session_state['relationships']
-                ):
-                    st.header('Relacionamentos Adicionados')
-
-                    for i, (src_col, dest_table, dest_col) in enumerate(
-                        st.session_state['relationships']
-                    ):
-                        st.write(f'Relacionamento {i + 1}:')
-                        st.write(f'Coluna de origem: {src_col}')
-                        st.write(f'Tabela de destino: {dest_table}')
-                        st.write(f'Coluna de destino: {dest_col}')
-
-                        if st.button(
-                            f'Remover Relacionamento {i + 1}',
-                            key=f'remove_relationship_{i}',
-                        ):
-                            st.session_state['relationships'].pop(i)
-                            st.success(
-                                f'Relacionamento {i + 1} removido com sucesso!'
-                            )
-                            st.experimental_rerun()
-                else:
-                    st.write('Nenhum relacionamento adicionado.')
-
-        if st.button('Transferir Dados'):
-            try:
-                transfer_data(
-                    st.session_state.source_engine,
-                    st.session_state.dest_engine,
-                    query,
-                    dest_table,
-                    selected_columns,
-                )
-                st.success('Dados transferidos com sucesso!')
-            except Exception as e:
-                st.error(f'Erro ao transferir dados: {e}')
-    else:
-        st.warning(
-            'Conecte-se aos bancos de dados de origem e destino antes de selecionar tabelas e colunas.'
+                return {dest_table: rows}
+
+        job = submit_job(
+            f'POSTGRES {table_src} -> {dest_table}',
+            run_job,
+            rows_total=estimate_rows(source_engine, table_src),
+            metrics=metrics,
+            engine=dest_engine,
+            priority=priority,
+            connections=connections,
         )
+        job_submitted(job)
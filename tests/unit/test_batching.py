@@ -0,0 +1,112 @@
+import unittest
+
+import pandas as pd
+
+from inject_db.core.batching import AdaptiveBatchSize, gather
+
+
+class TestAdaptiveBatchSize(unittest.TestCase):
+    def sizer(self, **options):
+        options = {
+            'initial': 1000,
+            'min_rows': 100,
+            'max_rows': 8000,
+            'target_seconds': 0.5,
+            **options,
+        }
+        return AdaptiveBatchSize(**options)
+
+    def test_fast_batches_grow_up_to_the_maximum(self):
+        sizer = self.sizer()
+
+        for _ in range(5):
+            sizer.record(sizer.rows, 0.01)
+
+        # Cresce no máximo o dobro por lote e para no limite
+        self.assertEqual(sizer.sizes, [1000, 2000, 4000, 8000])
+
+    def test_slow_batches_shrink_towards_the_target(self):
+        sizer = self.sizer()
+
+        sizer.record(1000, 0.8)
+        self.assertEqual(sizer.rows, 625)
+        sizer.record(625, 60)
+        self.assertEqual(sizer.rows, 312)
+        for _ in range(10):
+            sizer.record(sizer.rows, 60)
+        self.assertEqual(sizer.rows, 100)
+
+    def test_fast_partial_batch_does_not_shrink(self):
+        sizer = self.sizer()
+        sizer.record(10, 0.001)
+        self.assertEqual(sizer.rows, 1000)
+        self.assertIsNone(sizer.summary())
+
+    def test_wide_rows_are_capped_by_bytes(self):
+        sizer = self.sizer(max_bytes=100000)
+        self.assertEqual(sizer.next_size(50), 1000)
+        self.assertEqual(sizer.next_size(500), 200)
+        self.assertEqual(sizer.next_size(10**6), 100)
+
+    def test_fixed_size(self):
+        sizer = AdaptiveBatchSize(300, 300, 300)
+        sizer.record(300, 0.001)
+        data = pd.DataFrame({'n': range(1000)})
+        self.assertEqual(
+            [len(part) for part in sizer.batches(data)], [300, 300, 300, 100]
+        )
+
+    def test_batches_follow_recorded_latency(self):
+        sizer = self.sizer(initial=100)
+        data = pd.DataFrame({'n': range(3000)})
+        sizes = []
+        for part in sizer.batches(data):
+            sizes.append(len(part))
+            sizer.record(len(part), 0.01)
+
+        self.assertEqual(sizes[:4], [100, 200, 400, 800])
+        self.assertEqual(sum(sizes), 3000)
+        self.assertIn('lotes ajustados entre 100 e', sizer.summary())
+
+    def test_logs_each_change(self):
+        sizer = self.sizer(name='pessoas')
+        with self.assertLogs('inject_db.batching') as logs:
+            sizer.record(1000, 0.01)
+        self.assertIn('"rows": 2000', logs.output[0])
+        self.assertIn('"name": "pessoas"', logs.output[0])
+
+
+class TestGather(unittest.TestCase):
+    def test_chunks_are_joined_up_to_the_batch_size(self):
+        chunks = [
+            pd.DataFrame({'n': range(start, start + 10)}, index=range(10))
+            for start in range(0, 100, 10)
+        ]
+
+        gathered = list(gather(chunks, lambda row_bytes: 25))
+
+        # Verifica se os blocos crescem além do bloco lido, sem perder
+        # linhas e sem repetir o índice
+        self.assertEqual([len(data) for data in gathered], [30, 30, 30, 10])
+        self.assertEqual(list(pd.concat(gathered)['n']), list(range(100)))
+        self.assertTrue(gathered[0].index.is_unique)
+
+    def test_large_chunk_passes_through(self):
+        data = pd.DataFrame({'n': range(50)})
+        self.assertIs(next(gather([data], lambda row_bytes: 25)), data)
+
+    def test_categorical_columns_are_kept(self):
+        chunks = [
+            pd.DataFrame({'c': pd.Categorical(['a', 'b'])}),
+            pd.DataFrame({'c': pd.Categorical(['c', None])}),
+        ]
+
+        (data,) = gather(chunks, lambda row_bytes: 4)
+
+        self.assertIsInstance(data['c'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(data['c'][:3]), ['a', 'b', 'c'])
+        self.assertTrue(pd.isna(data['c'].iloc[3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from benchmarks.generators import (
+    generate_file,
+    generate_frame,
+    parse_column_mix,
+)
+from benchmarks.run import compare
+
+
+class TestBenchmarkGenerators(unittest.TestCase):
+    def test_parse_column_mix(self):
+        mix = parse_column_mix('int:2,str,date:1')
+
+        # Verifica se a quantidade padrão de cada tipo é 1
+        self.assertEqual(mix, [('int', 2), ('str', 1), ('date', 1)])
+
+    def test_parse_column_mix_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            parse_column_mix('blob:1')
+
+    def test_generate_frame_is_reproducible(self):
+        first = generate_frame(50, 'int:1,category:1,bool:1', seed=7)
+        second = generate_frame(50, 'int:1,category:1,bool:1', seed=7)
+
+        # Verifica se a mesma semente gera os mesmos dados
+        self.assertEqual(
+            list(first.columns), ['int_0', 'category_0', 'bool_0']
+        )
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_generate_file_formats(self):
+        readers = {
+            'csv': pd.read_csv,
+            'ndjson': lambda path: pd.read_json(path, lines=True),
+            'xlsx': pd.read_excel,
+        }
+        with tempfile.TemporaryDirectory() as workdir:
+            for fmt, reader in readers.items():
+                path = os.path.join(workdir, f'dados.{fmt}')
+                generate_file(fmt, path, 20, 'int:1,str:1')
+
+                # Verifica se o arquivo gerado pode ser lido novamente
+                self.assertEqual(len(reader(path)), 20)
+
+    def test_compare_detects_regressions(self):
+        case = {
+            'format': 'csv',
+            'target': 'sqlite:///bench.db',
+            'rows': 100,
+            'columns': 'int:1',
+            'load_rows_per_sec': 1000.0,
+            'write_rows_per_sec': 1000.0,
+            'peak_rss_mb': 100.0,
+        }
+        slower = dict(case, write_rows_per_sec=500.0, peak_rss_mb=105.0)
+
+        regressions = compare([slower], {'results': [case]}, 0.2)
+
+        # Verifica se apenas a queda de vazão na escrita é apontada
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0][1], 'write_rows_per_sec')
+
+
+if __name__ == '__main__':
+    unittest.main()
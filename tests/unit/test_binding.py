@@ -0,0 +1,134 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql.psycopg import PGDialect_psycopg
+
+from inject_db.core.binding import (
+    pipeline_executemany,
+    positional_statement,
+    python_values,
+)
+from inject_db.core.database import reflect_table
+from inject_db.core.pipeline import InsertWriter, PipelineWriter
+
+
+class TestPythonValues(unittest.TestCase):
+    def test_native_types_and_nulls(self):
+        self.assertEqual(python_values(pd.Series([1, 2])), [1, 2])
+        self.assertIs(type(python_values(pd.Series([1]))[0]), int)
+        self.assertEqual(python_values(pd.Series([1.5, np.nan])), [1.5, None])
+        self.assertEqual(
+            python_values(pd.Series([1, None], dtype='Int64')), [1, None]
+        )
+        self.assertEqual(
+            python_values(pd.Series(['a', None, np.nan], dtype=object)),
+            ['a', None, None],
+        )
+
+    def test_datetimes(self):
+        values = python_values(pd.Series(pd.to_datetime(['2024-01-02', None])))
+        self.assertEqual(values, [datetime.datetime(2024, 1, 2), None])
+        self.assertIs(type(values[0]), datetime.datetime)
+
+
+class TestColumnBinding(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE t (nome TEXT, valor FLOAT, dia TIMESTAMP)')
+            )
+        self.table = reflect_table(self.engine, 't')
+
+    def test_positional_statement(self):
+        sql, order = positional_statement(
+            self.engine.dialect, self.table.insert(), ['valor', 'nome']
+        )
+        # A ordem segue a tabela; as tuplas são montadas nessa ordem
+        self.assertEqual(order, ['nome', 'valor'])
+        self.assertIn('?', sql)
+
+    def write(self, data, binding):
+        writer = InsertWriter(self.engine, binding=binding)
+        writer.open()
+        writer.write(self.table, data)
+        writer.close()
+
+    def rows(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text('SELECT * FROM t')).fetchall()
+
+    def test_writers_produce_same_rows(self):
+        data = pd.DataFrame(
+            {
+                'nome': ['a', None],
+                'valor': [1.5, np.nan],
+                'dia': pd.to_datetime(['2024-01-02', '2024-01-03']),
+            }
+        )
+        self.write(data, 'columns')
+        self.write(data, 'records')
+        rows = self.rows()
+        self.assertEqual(rows[:2], rows[2:])
+
+    def test_missing_datetime_becomes_null(self):
+        data = pd.DataFrame(
+            {
+                'nome': ['a'],
+                'valor': [1.0],
+                'dia': pd.to_datetime([None]),
+            }
+        )
+        self.write(data, 'columns')
+        self.assertEqual(self.rows(), [('a', 1.0, None)])
+
+
+class TestPipelineMode(unittest.TestCase):
+    def test_psycopg_statement_is_positional(self):
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE t (nome TEXT, valor FLOAT)'))
+        table = reflect_table(engine, 't')
+
+        sql, order = positional_statement(
+            PGDialect_psycopg(), table.insert(), ['valor', 'nome']
+        )
+
+        # O dialeto do psycopg 3 pode acrescentar casts (%s::VARCHAR)
+        self.assertRegex(sql, r'^INSERT INTO t \(nome, valor\) VALUES \(%s')
+        self.assertEqual(sql.count('%s'), 2)
+        self.assertEqual(order, ['nome', 'valor'])
+
+    def test_rows_are_sent_in_a_prepared_pipeline(self):
+        conn = MagicMock()
+        conn.in_transaction.return_value = False
+        driver = conn.connection.driver_connection
+        driver.prepare_threshold = 5
+        cursor = driver.cursor.return_value.__enter__.return_value
+
+        def executemany(sql, rows):
+            # Dentro do pipeline as instruções são preparadas na hora
+            self.assertEqual(driver.prepare_threshold, 0)
+            driver.pipeline.return_value.__enter__.assert_called_once()
+
+        cursor.executemany.side_effect = executemany
+        rows = [('a', 1.0), ('b', 2.0)]
+
+        pipeline_executemany(conn, 'INSERT ...', rows)
+
+        cursor.executemany.assert_called_once_with('INSERT ...', rows)
+        driver.pipeline.return_value.__exit__.assert_called_once()
+        self.assertEqual(driver.prepare_threshold, 5)
+        conn.begin.assert_called_once()
+
+    def test_pipeline_writer_needs_psycopg(self):
+        with self.assertRaisesRegex(ValueError, 'psycopg 3'):
+            PipelineWriter(create_engine('sqlite://')).open()
+
+
+if __name__ == '__main__':
+    unittest.main()
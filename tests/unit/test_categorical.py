@@ -0,0 +1,72 @@
+import unittest
+from io import BytesIO
+
+import pandas as pd
+
+from inject_db.core.categorical import categorical_columns, map_distinct
+from inject_db.modules.csv_process import CSVReader
+
+DATA = pd.DataFrame(
+    {
+        'id': range(60),
+        'nome': [f'pessoa {i}' for i in range(60)],
+        'status': ['ativo', 'inativo', None] * 20,
+        'cidade': ['Recife', 'Natal', 'Olinda', 'Recife'] * 15,
+        'vazia': [None] * 60,
+    }
+)
+
+
+class TestCategorical(unittest.TestCase):
+    def test_detects_repeated_text_columns(self):
+        self.assertEqual(categorical_columns(DATA), ['status', 'cidade'])
+        self.assertEqual(
+            categorical_columns(DATA, max_categories=2), ['status']
+        )
+        self.assertEqual(categorical_columns(DATA, max_categories=0), [])
+
+    def test_map_distinct_runs_once_per_value(self):
+        calls = []
+
+        def lengths(values):
+            calls.append(values.tolist())
+            return [
+                None if value == 'Natal' else len(value) for value in values
+            ]
+
+        for values in (DATA['cidade'], DATA['cidade'].astype('category')):
+            calls.clear()
+            result = map_distinct(values, lengths)
+
+            # Verifica se cada valor distinto foi tratado uma vez só e se
+            # o resultado voltou às linhas certas
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(sorted(calls[0]), ['Natal', 'Olinda', 'Recife'])
+            self.assertEqual(result[:4].tolist(), [6, None, 6, 6])
+
+        self.assertEqual(
+            map_distinct(DATA['vazia'], lengths).tolist(), [None] * 60
+        )
+
+    def test_csv_reader_loads_categoricals(self):
+        reader = CSVReader(
+            BytesIO(DATA.to_csv(index=False).encode()), chunksize=25
+        )
+
+        chunks = list(reader.read_chunks(['id', 'cidade']))
+
+        # Verifica se só as colunas repetitivas lidas viram categóricas
+        self.assertEqual(
+            reader.categorical_dtypes(),
+            {'status': 'category', 'cidade': 'category'},
+        )
+        self.assertIsInstance(chunks[0]['cidade'].dtype, pd.CategoricalDtype)
+        self.assertEqual(chunks[0]['id'].dtype, 'int64')
+        self.assertEqual(
+            pd.concat(chunks)['cidade'].astype(object).tolist(),
+            DATA['cidade'].tolist(),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import bz2
+import gzip
+import importlib.util
+import io
+import unittest
+import zipfile
+
+import pandas as pd
+
+from inject_db.core.compression import (
+    CompressionError,
+    detect,
+    inner_name,
+    zip_members,
+)
+from inject_db.modules.csv_process import CSVReader
+from inject_db.modules.json_process import JSONReader
+
+DATA = pd.DataFrame({'nome': [f'p{i}' for i in range(30)], 'idade': range(30)})
+
+
+def named(content, name):
+    file = io.BytesIO(content)
+    file.name = name
+    return file
+
+
+def zipped(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.csv = DATA.to_csv(index=False).encode()
+
+    def read_all(self, reader):
+        return pd.concat(list(reader.read_chunks()), ignore_index=True)
+
+    def test_detect_by_extension_and_magic(self):
+        self.assertEqual(detect(named(b'', 'dados.csv.gz')), 'gzip')
+        self.assertEqual(detect(named(bz2.compress(self.csv), 'dados')), 'bz2')
+        self.assertIsNone(detect(named(self.csv, 'dados.csv')))
+        self.assertEqual(
+            inner_name(named(b'', 'dados.json.zst')), 'dados.json'
+        )
+
+    def test_gzip_csv_streams_in_chunks(self):
+        reader = CSVReader(
+            named(gzip.compress(self.csv), 'dados.csv.gz'), chunksize=10
+        )
+
+        chunks = list(reader.read_chunks())
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 10])
+        pd.testing.assert_frame_equal(self.read_all(reader), DATA)
+        self.assertEqual(reader.preview(2)['nome'].tolist(), ['p0', 'p1'])
+        self.assertEqual(reader.estimated_rows(), 30)
+
+    def test_bz2_ndjson(self):
+        lines = DATA.to_json(orient='records', lines=True).encode()
+        reader = JSONReader(named(bz2.compress(lines), 'dados.ndjson.bz2'))
+
+        self.assertTrue(reader.is_lines())
+        pd.testing.assert_frame_equal(self.read_all(reader), DATA)
+
+    def test_zip_member_choice(self):
+        content = zipped({'leia-me.txt': b'x', 'dados.csv': self.csv})
+        file = named(content, 'pacote.zip')
+
+        self.assertEqual(zip_members(file), ['leia-me.txt', 'dados.csv'])
+        reader = CSVReader(file, member='dados.csv')
+        pd.testing.assert_frame_equal(self.read_all(reader), DATA)
+        self.assertEqual(reader.estimated_rows(), 30)
+
+        with self.assertRaises(CompressionError):
+            CSVReader(file).preview()
+
+    def test_detached_reader_keeps_member(self):
+        file = named(zipped({'dados.csv': self.csv}), 'pacote.zip')
+        file.size = len(file.getvalue())
+        clone = CSVReader(file, member='dados.csv').detached()
+        self.assertEqual(clone.member, 'dados.csv')
+        self.assertEqual(len(self.read_all(clone)), 30)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec('zstandard'), 'zstandard não instalado'
+    )
+    def test_zstd_csv(self):
+        import zstandard
+
+        content = zstandard.ZstdCompressor().compress(self.csv)
+        reader = CSVReader(named(content, 'dados.csv.zst'))
+        pd.testing.assert_frame_equal(self.read_all(reader), DATA)
+
+
+if __name__ == '__main__':
+    unittest.main()
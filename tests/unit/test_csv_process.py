@@ -1,18 +1,33 @@
 import os
 import sys
+import tempfile
 import unittest
 import warnings
-from io import StringIO
+from io import BytesIO, StringIO
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 
+from inject_db.core.uploads import MappedFile
 from inject_db.modules.csv_process import (
+    CSVReader,
     connect_to_database,
     insert_data_with_uuid,
     list_columns,
     list_tables,
     load_csv,
+    record_ranges,
+)
+
+# Campos com vírgulas, aspas e quebras de linha entre aspas
+QUOTED = pd.DataFrame(
+    {
+        'id': range(40),
+        'texto': [
+            f'linha {i}\ncom "aspas", e vírgula' if i % 3 else f't{i}'
+            for i in range(40)
+        ],
+    }
 )
 
 
@@ -34,7 +49,7 @@ class TestCSVToDatabase(unittest.TestCase):
         sys.stderr.close()
         sys.stderr = cls.original_stderr
 
-    @patch('inject_db.modules.csv_process.create_engine')
+    @patch('inject_db.core.database.create_engine')
     def test_connect_to_database(self, mock_create_engine):
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
@@ -46,7 +61,7 @@ class TestCSVToDatabase(unittest.TestCase):
         mock_create_engine.assert_called_once_with(db_url)
         self.assertEqual(engine, mock_engine)
 
-    @patch('inject_db.modules.csv_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_tables(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -60,7 +75,7 @@ class TestCSVToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_table_names.assert_called_once()
 
-    @patch('inject_db.modules.csv_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_columns(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -77,8 +92,8 @@ class TestCSVToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_columns.assert_called_once_with('table1')
 
-    @patch('inject_db.modules.csv_process.uuid.uuid4')
-    @patch('inject_db.modules.csv_process.Table')
+    @patch('inject_db.core.database.uuid.uuid4')
+    @patch('inject_db.core.database.Table')
     def test_insert_data_with_uuid(self, mock_table, mock_uuid4):
         mock_uuid4.side_effect = ['uuid1', 'uuid2', 'uuid3']
         mock_table_instance = MagicMock()
@@ -93,10 +108,12 @@ class TestCSVToDatabase(unittest.TestCase):
         data_with_uuid = data.copy()
         data_with_uuid['id'] = ['uuid1', 'uuid2', 'uuid3']
         mock_table_instance.insert.assert_called_once()
-        mock_engine.connect().execute.assert_called_once_with(
+        mock_connection = mock_engine.connect.return_value.__enter__()
+        mock_connection.execute.assert_called_once_with(
             mock_table_instance.insert(),
             data_with_uuid.to_dict(orient='records'),
         )
+        mock_connection.commit.assert_called_once()
 
     @patch('inject_db.modules.csv_process.pd.read_csv')
     def test_load_csv(self, mock_read_csv):
@@ -113,5 +130,56 @@ class TestCSVToDatabase(unittest.TestCase):
         pd.testing.assert_frame_equal(result_df, mock_df)
 
 
+class TestParallelCSV(unittest.TestCase):
+    def setUp(self):
+        self.content = QUOTED.to_csv(index=False).encode()
+        file = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        file.write(self.content)
+        file.close()
+        self.path = file.name
+        self.addCleanup(os.unlink, self.path)
+
+    def test_ranges_never_split_quoted_records(self):
+        header_end, ranges = record_ranges(self.content, range_bytes=50)
+
+        # Verifica se as faixas cobrem o arquivo e terminam em registros
+        # inteiros, mesmo cortando no meio de campos entre aspas
+        self.assertGreater(len(ranges), 10)
+        self.assertEqual(ranges[0][0], header_end)
+        self.assertEqual(ranges[-1][1], len(self.content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+        header = self.content[:header_end]
+        parts = [
+            pd.read_csv(BytesIO(header + self.content[start:end]))
+            for start, end in ranges
+        ]
+        pd.testing.assert_frame_equal(
+            pd.concat(parts, ignore_index=True), QUOTED
+        )
+
+    @patch('inject_db.modules.csv_process.RANGE_BYTES', 200)
+    @patch('inject_db.modules.csv_process.PARALLEL_MIN_BYTES', 0)
+    def test_parallel_reader_matches_sequential(self):
+        reader = CSVReader(MappedFile.open(self.path), chunksize=7)
+        reader.workers = 2
+        self.assertTrue(reader.parallel())
+        self.assertFalse(CSVReader(BytesIO(self.content)).parallel())
+
+        ordered = list(reader.read_chunks(['texto']))
+        reader.ordered = False
+        unordered = pd.concat(reader.read_chunks(), ignore_index=True)
+
+        # Verifica se a ordem é mantida e se, fora de ordem, nenhuma linha
+        # se perde
+        self.assertLessEqual(max(len(chunk) for chunk in ordered), 7)
+        pd.testing.assert_frame_equal(
+            pd.concat(ordered, ignore_index=True), QUOTED[['texto']]
+        )
+        pd.testing.assert_frame_equal(
+            unordered.sort_values('id', ignore_index=True), QUOTED
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
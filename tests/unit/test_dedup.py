@@ -0,0 +1,173 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.dedup import BloomFilter, HashIndex, row_hashes
+from inject_db.core.pipeline import InsertWriter, Pipeline, build_loads
+from inject_db.modules.csv_process import CSVReader
+
+
+class TestRowHashes(unittest.TestCase):
+    def test_same_content_same_hash(self):
+        first = pd.DataFrame({'nome': ['a', 'b'], 'idade': [1, 2]})
+        second = pd.DataFrame({'nome': ['b', 'a'], 'idade': ['2', '1']})
+        self.assertEqual(
+            list(row_hashes(first, ['nome', 'idade'])),
+            list(row_hashes(second, ['nome', 'idade']))[::-1],
+        )
+
+    def test_key_columns_only(self):
+        data = pd.DataFrame({'nome': ['a', 'a'], 'idade': [1, 2]})
+        hashes = row_hashes(data, ['nome'])
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertEqual(hashes.dtype, np.int64)
+
+    def test_nulls_hash_the_same_for_every_reader(self):
+        frames = [
+            pd.DataFrame({'nome': ['a', value]}, dtype=dtype)
+            for value, dtype in [
+                (None, object),
+                (np.nan, object),
+                (None, 'string'),
+                (None, 'str'),
+            ]
+        ]
+        hashes = [list(row_hashes(frame, ['nome'])) for frame in frames]
+        for other in hashes[1:]:
+            self.assertEqual(other, hashes[0])
+        # Textos que o astype(str) do pandas 2 produzia para os nulos
+        for value in ['None', 'nan', '<NA>']:
+            text = pd.DataFrame({'nome': ['a', value]})
+            self.assertNotEqual(list(row_hashes(text, ['nome'])), hashes[0])
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        hashes = np.random.default_rng(0).integers(
+            -(2**63), 2**63 - 1, 1000, dtype=np.int64
+        )
+        bloom.add(hashes)
+        self.assertTrue(bloom.might_contain(hashes).all())
+
+    def test_false_positive_rate(self):
+        rng = np.random.default_rng(1)
+        bloom = BloomFilter(1000, error_rate=0.01)
+        bloom.add(rng.integers(-(2**63), 2**63 - 1, 1000, dtype=np.int64))
+        others = rng.integers(-(2**63), 2**63 - 1, 10000, dtype=np.int64)
+        self.assertLess(bloom.might_contain(others).mean(), 0.03)
+
+    def test_empty_input(self):
+        bloom = BloomFilter(10)
+        self.assertEqual(len(bloom.might_contain(np.array([], np.int64))), 0)
+
+
+class TestDeduplicate(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(text('CREATE TABLE pessoas (nome TEXT, idade INT)'))
+        self.mappings = [
+            {
+                'source_column': 'nome',
+                'db_table': 'pessoas',
+                'db_column': 'nome',
+            },
+            {
+                'source_column': 'idade',
+                'db_table': 'pessoas',
+                'db_column': 'idade',
+            },
+        ]
+
+    def load(self, data, keys=()):
+        file = BytesIO(data.to_csv(index=False).encode())
+        pipeline = Pipeline(
+            CSVReader(file, chunksize=2),
+            InsertWriter(self.engine),
+            build_loads(self.mappings, dedup_keys={'pessoas': list(keys)}),
+        )
+        result = pipeline.run()
+        return result, pipeline.messages()
+
+    def count(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text('SELECT COUNT(*) FROM pessoas')).scalar()
+
+    def test_reupload_is_skipped(self):
+        data = pd.DataFrame({'nome': ['a', 'b', 'c'], 'idade': [1, 2, 3]})
+        self.assertEqual(self.load(data)[0], {'pessoas': 3})
+        result, messages = self.load(data)
+        self.assertEqual(result, {'pessoas': 0})
+        self.assertEqual(
+            messages, ['pessoas: 3 linhas já carregadas foram ignoradas']
+        )
+        self.assertEqual(self.count(), 3)
+
+    def test_duplicates_inside_file_and_across_chunks(self):
+        data = pd.DataFrame(
+            {'nome': ['a', 'a', 'b', 'a', 'b'], 'idade': [1, 1, 2, 1, 2]}
+        )
+        self.assertEqual(self.load(data)[0], {'pessoas': 2})
+
+    def test_key_columns(self):
+        self.load(pd.DataFrame({'nome': ['a'], 'idade': [1]}), keys=['nome'])
+        result, _ = self.load(
+            pd.DataFrame({'nome': ['a', 'b'], 'idade': [9, 2]}), keys=['nome']
+        )
+        self.assertEqual(result, {'pessoas': 1})
+
+    def test_index_is_persisted(self):
+        self.load(pd.DataFrame({'nome': ['a', 'b'], 'idade': [1, 2]}))
+        self.assertEqual(HashIndex(self.engine).count('pessoas'), 2)
+
+    def test_add_ignores_hashes_already_indexed(self):
+        index = HashIndex(self.engine)
+        index.add('pessoas', np.array([1, 2], np.int64))
+        index.add('pessoas', np.array([2, 3], np.int64))
+        self.assertEqual(index.count('pessoas'), 3)
+
+    def test_unknown_key_column(self):
+        with self.assertRaises(ValueError):
+            self.load(pd.DataFrame({'nome': ['a'], 'idade': [1]}), ['cpf'])
+
+
+class TestFilterCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'destino.db')
+        self.engine = create_engine(f'sqlite:///{path}')
+        self.addCleanup(self.engine.dispose)
+        self.index = HashIndex(self.engine)
+        self.index.add('pessoas', np.array([1, 2], np.int64))
+
+    def test_filter_is_reused_between_jobs(self):
+        bloom = self.index.bloom_filter('pessoas')
+        bloom.add(np.array([3], np.int64))
+        self.index.add('pessoas', np.array([3], np.int64))
+        self.assertIs(HashIndex(self.engine).bloom_filter('pessoas'), bloom)
+
+    def test_filter_is_rebuilt_when_index_changes(self):
+        bloom = self.index.bloom_filter('pessoas')
+        # Hash gravado por outro processo, que este filtro não conhece
+        self.index.add('pessoas', np.array([4], np.int64))
+        rebuilt = self.index.bloom_filter('pessoas')
+        self.assertIsNot(rebuilt, bloom)
+        self.assertTrue(
+            rebuilt.might_contain(np.array([1, 2, 4], np.int64)).all()
+        )
+
+    def test_filter_grows_for_large_loads(self):
+        bloom = self.index.bloom_filter('pessoas')
+        larger = self.index.bloom_filter('pessoas', bloom.capacity)
+        self.assertGreater(larger.capacity, bloom.capacity)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -34,7 +34,7 @@ class TestJSONToDatabase(unittest.TestCase):
         sys.stderr.close()
         sys.stderr = cls.original_stderr
 
-    @patch('inject_db.modules.json_process.create_engine')
+    @patch('inject_db.core.database.create_engine')
     def test_connect_to_database(self, mock_create_engine):
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
@@ -46,7 +46,7 @@ class TestJSONToDatabase(unittest.TestCase):
         mock_create_engine.assert_called_once_with(db_url)
         self.assertEqual(engine, mock_engine)
 
-    @patch('inject_db.modules.json_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_tables(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -60,7 +60,7 @@ class TestJSONToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_table_names.assert_called_once()
 
-    @patch('inject_db.modules.json_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_columns(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -77,8 +77,8 @@ class TestJSONToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_columns.assert_called_once_with('table1')
 
-    @patch('inject_db.modules.json_process.uuid.uuid4')
-    @patch('inject_db.modules.json_process.Table')
+    @patch('inject_db.core.database.uuid.uuid4')
+    @patch('inject_db.core.database.Table')
     def test_insert_data_with_uuid(self, mock_table, mock_uuid4):
         mock_uuid4.side_effect = ['uuid1', 'uuid2', 'uuid3']
         mock_table_instance = MagicMock()
@@ -93,10 +93,12 @@ class TestJSONToDatabase(unittest.TestCase):
         data_with_uuid = data.copy()
         data_with_uuid['id'] = ['uuid1', 'uuid2', 'uuid3']
         mock_table_instance.insert.assert_called_once()
-        mock_engine.connect().execute.assert_called_once_with(
+        mock_connection = mock_engine.connect.return_value.__enter__()
+        mock_connection.execute.assert_called_once_with(
             mock_table_instance.insert(),
             data_with_uuid.to_dict(orient='records'),
         )
+        mock_connection.commit.assert_called_once()
 
     @patch('inject_db.modules.json_process.pd.read_json')
     def test_load_json(self, mock_read_json):
@@ -0,0 +1,122 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from inject_db.core.memory import (
+    MB,
+    MemoryBudget,
+    MemoryBudgetExceeded,
+    MemoryTracker,
+    current_rss,
+)
+from inject_db.core.metrics import JobMetrics
+
+
+class TestMemoryBudget(unittest.TestCase):
+    @patch('inject_db.core.memory.current_rss', return_value=100 * MB)
+    def test_check_start_refuses_job(self, mock_rss):
+        budget = MemoryBudget(200 * MB)
+
+        # Verifica se o job é recusado quando a estimativa não cabe
+        budget.check_start(50 * MB)
+        with self.assertRaises(MemoryBudgetExceeded):
+            budget.check_start(150 * MB)
+
+    @patch('inject_db.core.memory.current_rss', return_value=100 * MB)
+    def test_fit_batch_size_reduces_batch(self, mock_rss):
+        budget = MemoryBudget(101 * MB, min_batch_size=10)
+
+        # 1 MB livre, 100 bytes por linha e sobrecarga 4 -> 2621 linhas
+        self.assertEqual(budget.fit_batch_size(10000, 100), 2621)
+        self.assertEqual(budget.fit_batch_size(1000, 100), 1000)
+
+    @patch('inject_db.core.memory.current_rss', return_value=300 * MB)
+    def test_fit_batch_size_exhausted(self, mock_rss):
+        budget = MemoryBudget(200 * MB)
+
+        with self.assertRaises(MemoryBudgetExceeded):
+            budget.fit_batch_size(10000, 100)
+
+
+class TestMemoryTracker(unittest.TestCase):
+    def test_current_rss(self):
+        self.assertGreater(current_rss(), 0)
+
+    def test_stage_records_peaks(self):
+        tracker = MemoryTracker(sample_interval=0.001)
+
+        with tracker:
+            with tracker.stage('read'):
+                data = [bytearray(1024) for _ in range(2000)]
+            with tracker.stage('write'):
+                pass
+        del data
+
+        report = tracker.report()
+
+        # Verifica se as etapas e a responsável pelo pico foram registradas
+        self.assertEqual(list(report['stages']['stage']), ['read', 'write'])
+        read = tracker.stages['read']
+        self.assertGreaterEqual(read['peak_traced_bytes'], 2000 * 1024)
+        self.assertGreater(report['peak_rss_bytes'], 0)
+        self.assertIn(report['peak_stage'], ('read', 'write'))
+
+    def test_nested_stage_keeps_outer_peak(self):
+        tracker = MemoryTracker()
+
+        with tracker, tracker.stage('read'):
+            data = [bytearray(1024) for _ in range(2000)]
+            del data
+            # A etapa interna não pode zerar o pico da externa
+            with tracker.stage('transform'):
+                pass
+
+        self.assertGreaterEqual(
+            tracker.stages['read']['peak_traced_bytes'], 2000 * 1024
+        )
+
+    def test_concurrent_stages(self):
+        tracker = MemoryTracker(sample_interval=0.001)
+        started = threading.Barrier(2)
+
+        def work(name):
+            with tracker.stage(name):
+                started.wait()
+                tracker._observe(10**15)
+                started.wait()
+
+        with tracker:
+            threads = [
+                threading.Thread(target=work, args=(name,))
+                for name in ('faixa 1', 'faixa 2')
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Verifica se cada thread registrou a própria etapa e se o pico
+        # aponta as duas etapas abertas naquele momento
+        self.assertEqual(set(tracker.stages), {'faixa 1', 'faixa 2'})
+        for stage in tracker.stages.values():
+            self.assertEqual(stage['peak_rss_bytes'], 10**15)
+        self.assertEqual(
+            set(tracker.peak_stage.split(', ')), {'faixa 1', 'faixa 2'}
+        )
+
+    def test_metrics_stage_includes_memory(self):
+        tracker = MemoryTracker()
+        metrics = JobMetrics('teste', memory=tracker)
+
+        with tracker, metrics.stage('transform'):
+            data = [bytearray(1024) for _ in range(100)]
+        del data
+
+        # Verifica se o registro da etapa traz o pico de memória
+        record = metrics.records[0]
+        self.assertGreater(record.peak_rss_bytes, 0)
+        self.assertGreaterEqual(record.peak_traced_bytes, 100 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import io
+import json
+import logging
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from inject_db.core.batching import AdaptiveBatchSize
+from inject_db.core.metrics import JobMetrics, configure_logging, frame_bytes
+
+
+class TestJobMetrics(unittest.TestCase):
+    def test_stage_records_rows_and_bytes(self):
+        metrics = JobMetrics('teste')
+        data = pd.DataFrame({'col1': [1, 2, 3]})
+
+        with metrics.stage('write', batch=0) as record:
+            record.measure(data)
+
+        # Verifica se o registro contém linhas, bytes e tempo da etapa
+        record = metrics.records[0]
+        self.assertEqual(record.stage, 'write')
+        self.assertEqual(record.rows, 3)
+        self.assertEqual(record.bytes, frame_bytes(data))
+        self.assertGreaterEqual(record.seconds, 0)
+
+    def test_stage_marks_errors(self):
+        metrics = JobMetrics('teste')
+
+        with self.assertRaises(ValueError):
+            with metrics.stage('write'):
+                raise ValueError('falha')
+
+        # Verifica se a etapa com erro também é registrada
+        self.assertEqual(metrics.records[0].status, 'error')
+
+    def test_iter_stage_measures_each_batch(self):
+        metrics = JobMetrics('teste')
+        chunks = [pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': [3]})]
+
+        result = list(metrics.iter_stage('read', chunks))
+
+        # Verifica se cada bloco gerou um registro de leitura
+        self.assertEqual(len(result), 2)
+        self.assertEqual([r.rows for r in metrics.records], [2, 1])
+        self.assertEqual([r.batch for r in metrics.records], [0, 1])
+
+    def test_summary_groups_by_stage(self):
+        metrics = JobMetrics('teste')
+        for batch in range(2):
+            with metrics.stage('write', batch, rows=5):
+                pass
+
+        summary = metrics.summary()
+
+        # Verifica se o resumo soma as linhas de todos os lotes
+        row = summary[summary['stage'] == 'write'].iloc[0]
+        self.assertEqual(row['batches'], 2)
+        self.assertEqual(row['rows'], 10)
+
+    def test_records_are_bounded_and_summary_keeps_totals(self):
+        metrics = JobMetrics('teste', recent=3)
+        for batch in range(10):
+            with metrics.stage('write', batch, rows=5):
+                pass
+
+        summary = metrics.summary()
+
+        # Verifica se só os lotes recentes ficam guardados e o resumo
+        # continua somando todos
+        self.assertEqual([r.batch for r in metrics.records], [7, 8, 9])
+        self.assertEqual(len(metrics.batches()), 3)
+        row = summary[summary['stage'] == 'write'].iloc[0]
+        self.assertEqual(row['batches'], 10)
+        self.assertEqual(row['rows'], 50)
+
+    def test_records_are_logged_as_json(self):
+        metrics = JobMetrics('teste')
+
+        with patch('inject_db.core.metrics.logger') as mock_logger:
+            with metrics.stage('read', rows=1):
+                pass
+
+        # Verifica se a linha de log é um JSON com os campos esperados
+        line = json.loads(mock_logger.info.call_args[0][0])
+        self.assertEqual(line['job'], 'teste')
+        self.assertEqual(line['stage'], 'read')
+        self.assertEqual(line['rows'], 1)
+        self.assertIn('rows_per_sec', line)
+
+    def test_configure_logging_covers_batch_sizes(self):
+        package = logging.getLogger('inject_db')
+        stream = io.StringIO()
+        configure_logging(stream)
+        handler = package.handlers[-1]
+        self.addCleanup(package.setLevel, logging.NOTSET)
+        self.addCleanup(setattr, package, 'propagate', True)
+        self.addCleanup(package.removeHandler, handler)
+
+        AdaptiveBatchSize(1000, 100, 8000, name='pessoas').record(1000, 0.01)
+
+        # Verifica se os tamanhos de lote escolhidos chegam à saída
+        line = json.loads(stream.getvalue())
+        self.assertEqual(line['event'], 'batch_size')
+        self.assertEqual(line['rows'], 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
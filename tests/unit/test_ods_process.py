@@ -50,7 +50,7 @@ class TestODSProcess(unittest.TestCase):
         mock_read_excel.assert_called_once_with(file, engine='odf')
         pd.testing.assert_frame_equal(result_df, mock_df)
 
-    @patch('inject_db.modules.ods_process.create_engine')
+    @patch('inject_db.core.database.create_engine')
     def test_connect_to_database(self, mock_create_engine):
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
@@ -62,7 +62,7 @@ class TestODSProcess(unittest.TestCase):
         mock_create_engine.assert_called_once_with(connection_string)
         self.assertEqual(engine, mock_engine)
 
-    @patch('inject_db.modules.ods_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_tables(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -76,7 +76,7 @@ class TestODSProcess(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_table_names.assert_called_once()
 
-    @patch('inject_db.modules.ods_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_columns(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -93,8 +93,8 @@ class TestODSProcess(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_columns.assert_called_once_with('table1')
 
-    @patch('inject_db.modules.ods_process.Table')
-    @patch('inject_db.modules.ods_process.MetaData')
+    @patch('inject_db.core.database.Table')
+    @patch('inject_db.core.database.MetaData')
     def test_insert_data(self, mock_metadata, mock_table):
         mock_table_instance = MagicMock()
         mock_table.return_value = mock_table_instance
@@ -118,6 +118,7 @@ class TestODSProcess(unittest.TestCase):
             mock_table_instance.insert(),
             data.to_dict(orient='records'),
         )
+        mock_connection.commit.assert_called_once()
 
 
 if __name__ == '__main__':
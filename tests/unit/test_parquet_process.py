@@ -0,0 +1,94 @@
+import importlib.util
+import io
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.pipeline import InsertWriter, Pipeline, TableLoad
+from inject_db.modules.parquet_process import ParquetReader
+
+DATA = pd.DataFrame(
+    {
+        'nome': [f'p{i}' for i in range(25)],
+        'idade': range(25),
+        'cidade': ['Recife'] * 25,
+    }
+)
+
+
+def named(content, name):
+    file = io.BytesIO(content)
+    file.name = name
+    file.size = len(content)
+    return file
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec('pyarrow'), 'pyarrow não instalado'
+)
+class TestParquetReader(unittest.TestCase):
+    def parquet(self, row_group_size=10):
+        buffer = io.BytesIO()
+        DATA.to_parquet(buffer, index=False, row_group_size=row_group_size)
+        return named(buffer.getvalue(), 'dados.parquet')
+
+    def arrow(self):
+        import pyarrow as pa
+
+        buffer = io.BytesIO()
+        table = pa.Table.from_pandas(DATA, preserve_index=False)
+        with pa.ipc.new_file(buffer, table.schema) as writer:
+            writer.write_table(table, max_chunksize=10)
+        return named(buffer.getvalue(), 'dados.feather')
+
+    def test_metadata_without_reading_rows(self):
+        reader = ParquetReader(self.parquet())
+        with patch('pyarrow.parquet.ParquetFile.iter_batches') as batches:
+            self.assertEqual(reader.columns(), ['nome', 'idade', 'cidade'])
+            self.assertEqual(reader.estimated_rows(), 25)
+        batches.assert_not_called()
+
+    def test_streams_only_mapped_columns(self):
+        reader = ParquetReader(self.parquet(), chunksize=10)
+
+        chunks = list(reader.read_chunks(['idade']))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(list(chunks[0].columns), ['idade'])
+        self.assertEqual(
+            reader.preview(3)['nome'].tolist(), ['p0', 'p1', 'p2']
+        )
+
+    def test_arrow_ipc_batches_are_sliced(self):
+        reader = ParquetReader(self.arrow(), chunksize=4)
+
+        chunks = list(reader.read_chunks(['nome']))
+
+        self.assertEqual(reader.kind(), 'arrow')
+        self.assertEqual(reader.columns(), ['nome', 'idade', 'cidade'])
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 25)
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+
+    def test_kind_by_magic_without_extension(self):
+        file = self.parquet()
+        file.name = 'exportacao'
+        self.assertEqual(ParquetReader(file).kind(), 'parquet')
+
+    def test_pipeline_loads_parquet(self):
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE pessoas (nome TEXT, idade INT)'))
+
+        rows = Pipeline(
+            ParquetReader(self.parquet()),
+            InsertWriter(engine),
+            [TableLoad('pessoas', {'nome': 'nome', 'idade': 'idade'})],
+        ).run()
+
+        self.assertEqual(rows, {'pessoas': 25})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from inject_db.core.pipe import BoundedPipe, PipeClosed
+
+
+class TestBoundedPipe(unittest.TestCase):
+    def test_bytes_arrive_in_order(self):
+        pipe = BoundedPipe(chunk_bytes=8, slots=2)
+        parts = [bytes([i]) * 5 for i in range(50)]
+
+        def produce():
+            for part in parts:
+                pipe.write(part)
+            pipe.finish()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = bytearray()
+        while True:
+            data = pipe.read(3)
+            if not data:
+                break
+            # O leitor nunca recebe mais do que pediu
+            self.assertLessEqual(len(data), 3)
+            received += data
+        producer.join()
+
+        self.assertEqual(bytes(received), b''.join(parts))
+        self.assertEqual(pipe.bytes_written, 250)
+
+    def test_writer_waits_while_buffer_is_full(self):
+        pipe = BoundedPipe(chunk_bytes=1, slots=2)
+        pipe.write(b'a')
+        pipe.write(b'b')
+        blocked = threading.Thread(target=pipe.write, args=(b'c',))
+        blocked.start()
+        blocked.join(0.3)
+        self.assertTrue(blocked.is_alive())
+
+        self.assertEqual(pipe.read(), b'a')
+        blocked.join(1)
+        self.assertFalse(blocked.is_alive())
+
+    def test_writer_error_reaches_reader(self):
+        pipe = BoundedPipe()
+        pipe.fail(RuntimeError('origem caiu'))
+        with self.assertRaises(PipeClosed) as context:
+            pipe.read()
+        self.assertIsInstance(context.exception.__cause__, RuntimeError)
+
+    def test_reader_close_releases_writer(self):
+        pipe = BoundedPipe(chunk_bytes=1, slots=1)
+        pipe.write(b'a')
+        pipe.close()
+        with self.assertRaises(PipeClosed):
+            pipe.write(b'b')
+
+
+if __name__ == '__main__':
+    unittest.main()
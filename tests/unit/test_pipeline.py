@@ -0,0 +1,312 @@
+import unittest
+from io import BytesIO, StringIO
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+from inject_db.core.database import reflect_table
+from inject_db.core.metrics import JobMetrics
+from inject_db.core.pipeline import (
+    CopyWriter,
+    InsertWriter,
+    MySQLWriter,
+    Pipeline,
+    SQLiteWriter,
+    TableLoad,
+    UpsertWriter,
+    build_loads,
+    create_writer,
+    mysql_tsv,
+)
+from inject_db.modules.csv_process import CSVReader
+from inject_db.modules.json_process import JSONReader
+
+
+def csv_file(data):
+    return BytesIO(data.to_csv(index=False).encode())
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE pessoas (id TEXT, nome TEXT, idade INT)')
+            )
+            conn.execute(
+                text(
+                    'CREATE TABLE cidades (codigo INT PRIMARY KEY, nome TEXT)'
+                )
+            )
+
+    def rows(self, query):
+        with self.engine.connect() as conn:
+            return conn.execute(text(query)).fetchall()
+
+    def test_build_loads_groups_by_table(self):
+        mappings = [
+            {'source_column': 'a', 'db_table': 't1', 'db_column': 'x'},
+            {'source_column': 'b', 'db_table': 't1', 'db_column': 'y'},
+            {'source_column': 'a', 'db_table': 't2', 'db_column': 'z'},
+        ]
+        relationships = [
+            {
+                'table_origin': 't2',
+                'column_origin': 'z',
+                'table_dest': 't1',
+                'column_dest': 'x',
+            }
+        ]
+
+        loads = build_loads(mappings, relationships)
+
+        # Verifica se as colunas do mesmo destino são gravadas juntas
+        self.assertEqual([load.table_name for load in loads], ['t1', 't2'])
+        self.assertEqual(loads[0].column_map, {'x': 'a', 'y': 'b'})
+        self.assertEqual(loads[0].relationships, [])
+        self.assertEqual(loads[1].relationships, relationships)
+
+    def test_csv_pipeline_streams_chunks_and_adds_ids(self):
+        data = pd.DataFrame(
+            {'name': [f'p{i}' for i in range(25)], 'age': range(25)}
+        )
+        reader = CSVReader(csv_file(data), chunksize=10)
+        metrics = JobMetrics('teste')
+        loads = [TableLoad('pessoas', {'nome': 'name', 'idade': 'age'})]
+
+        result = Pipeline(
+            reader, InsertWriter(self.engine), loads, metrics=metrics
+        ).run()
+
+        # Verifica se as linhas foram gravadas, com UUID e em três blocos
+        self.assertEqual(result, {'pessoas': 25})
+        rows = self.rows('SELECT id, nome, idade FROM pessoas ORDER BY idade')
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[3][1:], ('p3', 3))
+        self.assertEqual(len({row[0] for row in rows}), 25)
+        reads = [r for r in metrics.records if r.stage == 'read']
+        self.assertEqual([r.rows for r in reads], [10, 10, 5])
+
+    def test_memory_budget_reduces_read_chunks(self):
+        data = pd.DataFrame({'name': [f'p{i}' for i in range(25)]})
+        reader = CSVReader(csv_file(data), chunksize=10)
+        metrics = JobMetrics('teste')
+        budget = MagicMock()
+        budget.fit_batch_size.side_effect = lambda size, row_bytes: min(
+            size, 4
+        )
+        loads = [TableLoad('pessoas', {'nome': 'name'})]
+
+        Pipeline(
+            reader,
+            InsertWriter(self.engine),
+            loads,
+            metrics=metrics,
+            budget=budget,
+        ).run()
+
+        # Verifica se a leitura já sai no tamanho que cabe no orçamento
+        reads = [r for r in metrics.records if r.stage == 'read']
+        self.assertEqual([r.rows for r in reads], [4] * 6 + [1])
+        self.assertEqual(len(self.rows('SELECT nome FROM pessoas')), 25)
+
+    def test_batches_grow_past_the_read_chunk(self):
+        data = pd.DataFrame({'name': [f'p{i}' for i in range(3000)]})
+        reader = CSVReader(csv_file(data), chunksize=100)
+        metrics = JobMetrics('teste')
+        loads = [TableLoad('pessoas', {'nome': 'name'})]
+
+        Pipeline(
+            reader,
+            InsertWriter(self.engine),
+            loads,
+            metrics=metrics,
+            batch_size=500,
+        ).run()
+
+        # Verifica se lotes rápidos crescem além dos blocos de 100 linhas
+        writes = [r.rows for r in metrics.records if r.stage == 'write']
+        self.assertEqual(writes[0], 500)
+        self.assertGreater(max(writes), 500)
+        self.assertEqual(sum(writes), 3000)
+
+    def test_same_source_column_in_two_db_columns(self):
+        reader = CSVReader(csv_file(pd.DataFrame({'v': ['a']})))
+        loads = build_loads(
+            [
+                {'source_column': 'v', 'db_table': 'pessoas', 'db_column': c}
+                for c in ('id', 'nome')
+            ]
+        )
+
+        Pipeline(reader, InsertWriter(self.engine), loads).run()
+
+        # Verifica se a mesma coluna de origem preenche as duas colunas
+        self.assertEqual(
+            self.rows('SELECT id, nome FROM pessoas'), [('a', 'a')]
+        )
+
+    def test_integer_id_is_not_generated(self):
+        reader = CSVReader(
+            csv_file(pd.DataFrame({'c': [1, 2], 'n': ['a', 'b']}))
+        )
+        loads = [TableLoad('cidades', {'codigo': 'c', 'nome': 'n'})]
+
+        Pipeline(reader, InsertWriter(self.engine), loads).run()
+
+        # Verifica se nenhuma coluna id foi adicionada à tabela sem id
+        self.assertEqual(
+            self.rows('SELECT codigo, nome FROM cidades ORDER BY codigo'),
+            [(1, 'a'), (2, 'b')],
+        )
+
+    def test_upsert_writer_updates_existing_rows(self):
+        loads = [TableLoad('cidades', {'codigo': 'c', 'nome': 'n'})]
+        first = pd.DataFrame({'c': [1, 2], 'n': ['a', 'b']})
+        second = pd.DataFrame({'c': [2, 3], 'n': ['B', 'c']})
+
+        for data in (first, second):
+            reader = CSVReader(csv_file(data))
+            Pipeline(reader, UpsertWriter(self.engine), loads).run()
+
+        # Verifica se a chave repetida foi atualizada em vez de duplicada
+        self.assertEqual(
+            self.rows('SELECT codigo, nome FROM cidades ORDER BY codigo'),
+            [(1, 'a'), (2, 'B'), (3, 'c')],
+        )
+
+    def test_copy_writer_requires_postgres(self):
+        with self.assertRaises(ValueError):
+            CopyWriter(self.engine).open()
+
+    def test_sqlite_writer_restores_pragmas(self):
+        writer = create_writer('insert', self.engine)
+        self.assertIsInstance(writer, SQLiteWriter)
+        records = create_writer('insert', self.engine, binding='records')
+        self.assertIsInstance(records, SQLiteWriter)
+        self.assertEqual(records.binding, 'records')
+        with self.engine.connect() as conn:
+            before = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+
+        writer.open()
+        table = reflect_table(self.engine, 'cidades')
+        writer.write(table, pd.DataFrame({'codigo': [1], 'nome': ['a']}))
+        writer.close()
+
+        # Verifica se a carga foi gravada e os pragmas voltaram ao original
+        self.assertEqual(self.rows('SELECT * FROM cidades'), [(1, 'a')])
+        with self.engine.connect() as conn:
+            after = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+        self.assertEqual(after, before)
+
+    def test_mysql_tsv_escapes_values(self):
+        data = pd.DataFrame(
+            {
+                'texto': ['a\tb', 'c\\d', None, 'NULL', 'e\nf'],
+                'valor': [1.5, None, 3.0, 4.0, 5.0],
+                'ativo': [True, False, True, False, True],
+                'misto': [1, 'x"y', None, 2.5, 'z'],
+            }
+        )
+        file = StringIO()
+
+        mysql_tsv(data, file)
+
+        # Verifica se separadores viram escapes e NULL vira \N
+        self.assertEqual(
+            file.getvalue().split('\n'),
+            [
+                'a\\tb\t1.5\t1\t1',
+                'c\\\\d\t\\N\t0\tx"y',
+                '\\N\t3.0\t1\t\\N',
+                'NULL\t4.0\t0\t2.5',
+                'e\\nf\t5.0\t1\tz',
+                '',
+            ],
+        )
+
+    def test_mysql_tsv_writes_object_booleans_as_numbers(self):
+        # Coluna booleana com vazios, como lida do CSV
+        data = pd.DataFrame(
+            {
+                'ativo': pd.Series([True, None, False], dtype=object),
+                'n': [1, 2, 3],
+            }
+        )
+        file = StringIO()
+
+        mysql_tsv(data, file)
+
+        self.assertEqual(file.getvalue(), '1\t1\n\\N\t2\n0\t3\n')
+
+    def test_mysql_tsv_escapes_categorical_values(self):
+        data = pd.DataFrame(
+            {'status': pd.Categorical(['a\tb', 'c\nd', 'e\\f', None, 'a\tb'])}
+        )
+        file = StringIO()
+
+        mysql_tsv(data, file)
+
+        # Verifica se as colunas categóricas também são escapadas
+        self.assertEqual(
+            file.getvalue().split('\n'),
+            ['a\\tb', 'c\\nd', 'e\\\\f', '\\N', 'a\\tb', ''],
+        )
+
+    def test_mysql_writer_falls_back_to_insert(self):
+        writer = MySQLWriter(self.engine)
+        refused = DBAPIError(
+            'LOAD DATA', {}, Exception(3948, 'Loading local data is disabled')
+        )
+        data = pd.DataFrame({'codigo': [1, 2], 'nome': ['a', 'b']})
+
+        table = reflect_table(self.engine, 'cidades')
+
+        writer.open()
+        with patch.object(MySQLWriter, '_load', side_effect=refused) as load:
+            writer.write(table, data)
+            writer.write(table, data.assign(codigo=[3, 4]))
+        writer.close()
+
+        # Verifica se a recusa foi lembrada e a carga seguiu com INSERT
+        load.assert_called_once()
+        self.assertEqual(len(self.rows('SELECT * FROM cidades')), 4)
+        self.assertIn('local_infile', writer.summary())
+
+    def test_mysql_writer_redoes_batch_with_warnings(self):
+        writer = MySQLWriter(self.engine)
+        writer.conn = MagicMock()
+        # SHOW COUNT(*) WARNINGS após o LOAD
+        writer.conn.exec_driver_sql.return_value.scalar.return_value = 1
+        data = pd.DataFrame({'codigo': [1, 1], 'nome': ['a', 'b']})
+        table = reflect_table(self.engine, 'cidades')
+
+        with patch.object(InsertWriter, 'write') as insert:
+            writer.write(table, data)
+
+        # Verifica se o LOAD foi desfeito e o lote refeito pelo INSERT
+        writer.conn.rollback.assert_called_once()
+        writer.conn.commit.assert_not_called()
+        insert.assert_called_once_with(table, data)
+        self.assertIn('1 lotes com avisos', writer.summary())
+
+    def test_json_reader_detects_ndjson(self):
+        ndjson = BytesIO(b'{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+        array = BytesIO(b'[{"a": 1}, {"a": 2}]')
+
+        lines_reader = JSONReader(ndjson, chunksize=2)
+        array_reader = JSONReader(array)
+
+        # Verifica se NDJSON é lido em blocos e arrays por inteiro
+        self.assertTrue(lines_reader.is_lines())
+        self.assertFalse(array_reader.is_lines())
+        self.assertEqual(
+            [len(chunk) for chunk in lines_reader.read_chunks()], [2, 1]
+        )
+        self.assertEqual(array_reader.columns(), ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,393 @@
+import os
+import sys
+import tempfile
+import unittest
+import warnings
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.jobs import JobCancelled
+from inject_db.modules.postgres_process import (
+    PartitionedTransfer,
+    build_select_query,
+    copy_pipe,
+    direct_copy_format,
+    get_json_columns,
+    partition_conditions,
+    read_chunks,
+    serialize_json_columns,
+    transfer_data,
+)
+
+
+class TestPostgresProcess(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Redireciona stderr para evitar mensagens indesejadas
+        cls.original_stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        # Ignora avisos específicos do Streamlit
+        warnings.filterwarnings(
+            'ignore', category=UserWarning, module='streamlit'
+        )
+        warnings.filterwarnings('ignore', category=Warning)
+
+    @classmethod
+    def tearDownClass(cls):
+        # Restaura stderr
+        sys.stderr.close()
+        sys.stderr = cls.original_stderr
+
+    def test_build_select_query(self):
+        query = build_select_query('origem', ['id', 'dados'], ['dados'])
+
+        # Verifica se a coluna JSON é lida como texto
+        self.assertEqual(query, 'SELECT id, dados::text AS dados FROM origem')
+
+    def test_read_chunks_variable_size(self):
+        engine = create_engine('sqlite:///:memory:')
+        pd.DataFrame({'n': range(10)}).to_sql('origem', engine, index=False)
+        sizes = iter([4, 2, 100, 100])
+
+        chunks = list(
+            read_chunks(engine, 'SELECT n FROM origem', lambda: next(sizes))
+        )
+
+        # Verifica se cada bloco respeita o tamanho pedido naquele momento
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2, 4])
+        self.assertEqual(list(chunks[1]['n']), [4, 5])
+
+    @patch('inject_db.modules.postgres_process.get_column_types')
+    def test_get_json_columns(self, mock_get_column_types):
+        mock_get_column_types.return_value = {
+            'id': 'uuid',
+            'dados': 'jsonb',
+            'extra': 'json',
+            'nome': 'text',
+        }
+
+        columns = get_json_columns(MagicMock(), 'origem', ['dados', 'nome'])
+
+        # Verifica se apenas as colunas selecionadas do tipo JSON retornam
+        self.assertEqual(columns, ['dados'])
+
+    def test_serialize_json_columns(self):
+        data = pd.DataFrame(
+            {'dados': [None, {'a': 1}, [1, 2], 'abc'], 'n': [1, 2, 3, 4]}
+        )
+
+        result = serialize_json_columns(data, ['dados'])
+
+        # Verifica se nulos são preservados e o restante, inclusive textos,
+        # serializado
+        self.assertTrue(pd.isna(result['dados'][0]))
+        self.assertEqual(result['dados'][1], '{"a": 1}')
+        self.assertEqual(result['dados'][2], '[1, 2]')
+        self.assertEqual(result['dados'][3], '"abc"')
+
+    def test_serialize_json_columns_empty(self):
+        data = pd.DataFrame({'dados': pd.Series([], dtype=object)})
+
+        result = serialize_json_columns(data, ['dados'])
+
+        # Verifica se um bloco vazio não gera erro
+        self.assertTrue(result.empty)
+
+    @patch('inject_db.modules.postgres_process.get_columns')
+    @patch('inject_db.modules.postgres_process.get_json_columns')
+    @patch('inject_db.modules.postgres_process.read_chunks')
+    def test_transfer_data_passthrough(
+        self, mock_read_chunks, mock_get_json_columns, mock_get_columns
+    ):
+        source_engine = MagicMock()
+        source_engine.dialect.name = 'postgresql'
+        dest_engine = MagicMock()
+        dest_engine.dialect.name = 'mysql'
+        mock_get_columns.return_value = ['id', 'dados']
+        mock_get_json_columns.return_value = ['dados']
+        chunk = MagicMock()
+        chunk.columns = ['id', 'dados']
+        chunk.__len__.return_value = 2
+        mock_read_chunks.return_value = iter([chunk])
+
+        total = transfer_data(
+            source_engine, dest_engine, 'origem', 'destino', ['id', 'dados']
+        )
+
+        # Verifica se o JSON de uma origem PostgreSQL é lido como texto e
+        # gravado sem serialização, mesmo num destino de outro banco
+        self.assertEqual(total, 2)
+        self.assertEqual(
+            mock_read_chunks.call_args[0][1],
+            'SELECT id, dados::text AS dados FROM origem',
+        )
+        chunk.to_sql.assert_called_once_with(
+            'destino', dest_engine, if_exists='append', index=False
+        )
+
+    @patch('inject_db.modules.postgres_process.get_columns')
+    @patch('inject_db.modules.postgres_process.get_json_columns')
+    @patch('inject_db.modules.postgres_process.read_chunks')
+    def test_transfer_data_chunks_follow_batch_size(
+        self, mock_read_chunks, mock_get_json_columns, mock_get_columns
+    ):
+        mock_get_columns.return_value = ['id']
+        mock_get_json_columns.return_value = []
+        sizes = []
+
+        def read_chunks(engine, query, chunksize, params=None):
+            for _ in range(4):
+                sizes.append(chunksize())
+                yield pd.DataFrame({'id': ['x'] * sizes[-1]})
+
+        mock_read_chunks.side_effect = read_chunks
+        source_engine = MagicMock()
+        source_engine.dialect.name = 'sqlite'
+        dest_engine = create_engine('sqlite:///:memory:')
+
+        total = transfer_data(
+            source_engine,
+            dest_engine,
+            'origem',
+            'destino',
+            ['id'],
+            chunksize=500,
+        )
+
+        # Verifica se a leitura acompanha os lotes rápidos e cresce além do
+        # bloco inicial
+        self.assertEqual(sizes, [500, 1000, 2000, 4000])
+        self.assertEqual(total, 7500)
+
+    @patch('inject_db.modules.postgres_process.get_column_udts')
+    def test_direct_copy_format(self, mock_get_column_udts):
+        source = {
+            'id': ('uuid', 'uuid'),
+            'notas': ('ARRAY', '_int4'),
+            'estado': ('USER-DEFINED', 'estado'),
+        }
+
+        def formats(dest, columns):
+            mock_get_column_udts.side_effect = [source, dest]
+            return direct_copy_format(
+                MagicMock(), MagicMock(), 'origem', 'destino', columns
+            )
+
+        # Verifica se arrays de elementos diferentes e tipos do usuário vão
+        # como texto
+        self.assertEqual(formats(source, ['id', 'notas']), 'binary')
+        other = {**source, 'notas': ('ARRAY', '_text')}
+        self.assertEqual(formats(other, ['id', 'notas']), 'text')
+        self.assertEqual(formats(source, ['id', 'estado']), 'text')
+        self.assertEqual(formats({}, ['id']), 'text')
+
+    @patch('inject_db.modules.postgres_process.get_column_udts')
+    def test_copy_pipe_streams_bytes(self, mock_get_column_udts):
+        mock_get_column_udts.return_value = {
+            'id': ('uuid', 'uuid'),
+            'dados': ('jsonb', 'jsonb'),
+        }
+        payload = [b'PGCOPY\n' + bytes(range(256)) * 10 for _ in range(40)]
+        received = bytearray()
+
+        def copy_out(sql, file):
+            for part in payload:
+                file.write(part)
+
+        def copy_in(sql, file, size):
+            while data := file.read(size):
+                received.extend(data)
+
+        source_engine, dest_engine = MagicMock(), MagicMock()
+        source_engine.dialect.name = dest_engine.dialect.name = 'postgresql'
+        source_cursor = source_engine.raw_connection().cursor()
+        source_cursor.copy_expert.side_effect = copy_out
+        dest_conn = dest_engine.raw_connection()
+        dest_cursor = dest_conn.cursor()
+        dest_cursor.copy_expert.side_effect = copy_in
+        dest_cursor.rowcount = 40
+        progress = []
+
+        rows = copy_pipe(
+            source_engine,
+            dest_engine,
+            'origem',
+            'destino',
+            ['id', 'dados'],
+            progress=progress.append,
+        )
+
+        # Tipos iguais: COPY binário dos dois lados, bytes sem alteração
+        self.assertEqual(rows, 40)
+        self.assertEqual(bytes(received), b''.join(payload))
+        self.assertEqual(
+            source_cursor.copy_expert.call_args[0][0],
+            'COPY (SELECT id, dados FROM origem) TO STDOUT (FORMAT binary)',
+        )
+        self.assertIn(
+            'FROM STDIN (FORMAT binary)',
+            dest_cursor.copy_expert.call_args[0][0],
+        )
+        dest_conn.commit.assert_called_once()
+        self.assertEqual(progress[-1], 40)
+
+    def test_copy_pipe_source_error_rolls_back(self):
+        source_engine, dest_engine = MagicMock(), MagicMock()
+        source_engine.dialect.name = dest_engine.dialect.name = 'postgresql'
+        source_engine.raw_connection().cursor().copy_expert.side_effect = (
+            RuntimeError('origem caiu')
+        )
+        dest_conn = dest_engine.raw_connection()
+        dest_conn.cursor().copy_expert.side_effect = (
+            lambda sql, file, size: file.read(size)
+        )
+
+        with self.assertRaisesRegex(RuntimeError, 'origem caiu'):
+            copy_pipe(
+                source_engine,
+                dest_engine,
+                'origem',
+                'destino',
+                ['id'],
+                copy_format='text',
+            )
+        dest_conn.rollback.assert_called_once()
+        dest_conn.commit.assert_not_called()
+
+    def copy_endless_source(self, copy_in, progress=None):
+        source_engine, dest_engine = MagicMock(), MagicMock()
+        source_engine.dialect.name = dest_engine.dialect.name = 'postgresql'
+
+        # A origem só para quando o canal for fechado pelo destino
+        def copy_out(sql, file):
+            while True:
+                file.write(b'x' * 1024)
+
+        source_engine.raw_connection().cursor().copy_expert.side_effect = (
+            copy_out
+        )
+        dest_conn = dest_engine.raw_connection()
+        dest_conn.cursor().copy_expert.side_effect = copy_in
+        try:
+            copy_pipe(
+                source_engine,
+                dest_engine,
+                'origem',
+                'destino',
+                ['id'],
+                progress=progress,
+                copy_format='text',
+            )
+        finally:
+            dest_conn.rollback.assert_called_once()
+            dest_conn.commit.assert_not_called()
+
+    def test_copy_pipe_destination_error_is_raised(self):
+        def copy_in(sql, file, size):
+            file.read(size)
+            raise RuntimeError('destino recusou')
+
+        # Verifica se o erro do destino não é trocado pelo canal fechado
+        with self.assertRaisesRegex(RuntimeError, 'destino recusou'):
+            self.copy_endless_source(copy_in)
+
+    def test_copy_pipe_cancelled_job(self):
+        def copy_in(sql, file, size):
+            while file.read(size):
+                pass
+
+        progress = MagicMock(side_effect=JobCancelled())
+
+        # Verifica se o job cancelado no meio da cópia sai como cancelado
+        with self.assertRaises(JobCancelled):
+            self.copy_endless_source(copy_in, progress)
+
+
+class TestPartitionedTransfer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = create_engine(f'sqlite:///{self.directory.name}/o.db')
+        self.dest = create_engine(f'sqlite:///{self.directory.name}/d.db')
+        # Chaves concentradas no início, mais algumas nulas
+        keys = [i for i in range(90)] + [1000 + i for i in range(7)]
+        self.data = pd.DataFrame(
+            {
+                'id': [str(i) for i in range(100)],
+                'chave': keys + [None, None, None],
+                'nome': [f'p{i}' for i in range(100)],
+            }
+        )
+        self.data.to_sql('origem', self.source, index=False)
+        with self.dest.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE destino (id TEXT, chave INT, nome TEXT)')
+            )
+
+    def tearDown(self):
+        self.source.dispose()
+        self.dest.dispose()
+        self.directory.cleanup()
+
+    def partition_rows(self, method):
+        counts = []
+        with self.source.connect() as conn:
+            for where, params in partition_conditions(
+                self.source, 'origem', 'chave', 4, method
+            ):
+                counts.append(
+                    conn.execute(
+                        text(f'SELECT COUNT(*) FROM origem WHERE {where}'),
+                        params,
+                    ).scalar()
+                )
+        return counts
+
+    def test_ranges_cover_each_row_once(self):
+        for method in ('minmax', 'quantiles'):
+            counts = self.partition_rows(method)
+            self.assertEqual(sum(counts), 100)
+            # A última condição é a das chaves nulas
+            self.assertEqual(counts[-1], 3)
+        # Quantis equilibram as faixas mesmo com as chaves desbalanceadas
+        self.assertEqual(self.partition_rows('quantiles'), [24, 24, 24, 25, 3])
+
+    def test_ctid_only_on_postgres(self):
+        with self.assertRaises(ValueError):
+            partition_conditions(self.source, 'origem', None, 4, 'ctid')
+
+    @patch('inject_db.modules.postgres_process.get_columns')
+    def test_partitions_transfer_in_parallel(self, mock_get_columns):
+        mock_get_columns.return_value = ['id', 'chave', 'nome']
+        progress = []
+        transfer = PartitionedTransfer(
+            self.source,
+            self.dest,
+            'origem',
+            'destino',
+            ['id', 'chave', 'nome'],
+            column='chave',
+            partitions=3,
+            method='quantiles',
+            chunksize=10,
+        )
+
+        with patch(
+            'inject_db.modules.postgres_process.get_json_columns',
+            return_value=[],
+        ):
+            rows = transfer.run(progress=progress.append)
+
+        self.assertEqual(rows, 100)
+        self.assertEqual(sum(progress), 100)
+        report = transfer.report()
+        self.assertEqual(list(report['status'].unique()), ['done'])
+        self.assertEqual(report['rows'].sum(), 100)
+        self.assertEqual(len(transfer.messages()), len(report))
+        copied = pd.read_sql('SELECT id FROM destino', self.dest)
+        self.assertEqual(sorted(copied['id']), sorted(self.data['id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
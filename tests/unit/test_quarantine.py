@@ -0,0 +1,110 @@
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.database import reflect_table
+from inject_db.core.pipeline import QuarantineWriter
+from inject_db.core.quarantine import QUARANTINE_TABLE, QuarantineFile
+
+
+class TestQuarantineWriter(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE pessoas (cpf TEXT PRIMARY KEY, nome TEXT)')
+            )
+            conn.execute(text("INSERT INTO pessoas VALUES ('3', 'antigo')"))
+        self.table = reflect_table(self.engine, 'pessoas')
+        self.data = pd.DataFrame(
+            {
+                'cpf': [str(i) for i in range(8)],
+                'nome': [f'p{i}' for i in range(8)],
+            }
+        )
+
+    def write(self, writer):
+        writer.open()
+        try:
+            return writer.write(self.table, self.data)
+        finally:
+            writer.close()
+
+    def cpfs(self):
+        with self.engine.connect() as conn:
+            return sorted(
+                row[0] for row in conn.execute(text('SELECT cpf FROM pessoas'))
+            )
+
+    def test_bad_row_goes_to_quarantine_table(self):
+        writer = QuarantineWriter(self.engine)
+
+        written = self.write(writer)
+
+        self.assertEqual(
+            list(written['cpf']), ['0', '1', '2', '4', '5', '6', '7']
+        )
+        self.assertEqual(self.cpfs(), [str(i) for i in range(8)])
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    f'SELECT table_name, row_data, error FROM {QUARANTINE_TABLE}'
+                )
+            ).fetchall()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][0], 'pessoas')
+        self.assertEqual(json.loads(rows[0][1]), {'cpf': '3', 'nome': 'p3'})
+        self.assertIn('UNIQUE', rows[0][2])
+        self.assertIn('1 linhas rejeitadas', writer.summary())
+
+    def test_quarantine_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = QuarantineWriter(
+                self.engine, quarantine=QuarantineFile('teste', directory)
+            )
+            self.write(writer)
+            rejected = pd.read_csv(Path(directory) / 'pessoas_teste.csv')
+
+        self.assertEqual(list(rejected['cpf']), [3])
+        self.assertIn('UNIQUE', rejected['_erro'][0])
+
+    def test_clean_batch_is_written_once(self):
+        self.data = self.data[self.data['cpf'] != '3']
+        writer = QuarantineWriter(self.engine)
+
+        self.write(writer)
+
+        self.assertEqual(writer.rejected, 0)
+        self.assertIsNone(writer.summary())
+
+    def test_too_many_rejects_stops_the_load(self):
+        writer = QuarantineWriter(self.engine, max_rejects=0)
+        with self.assertRaises(RuntimeError):
+            self.write(writer)
+
+    def test_dropped_connection_is_not_bisected(self):
+        writer = QuarantineWriter(self.engine)
+        # Erro cru do driver, como o do execute_batch do psycopg2
+        lost = sqlite3.ProgrammingError('Cannot operate on a closed database.')
+
+        with mock.patch(
+            'inject_db.core.pipeline.executemany', side_effect=lost
+        ) as executemany:
+            writer.open()
+            with self.assertRaises(sqlite3.ProgrammingError):
+                writer.write(self.table, self.data)
+
+        self.assertEqual(executemany.call_count, 1)
+        self.assertTrue(writer.conn.invalidated)
+        self.assertEqual(writer.rejected, 0)
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.pipeline import InsertWriter, Pipeline, build_loads
+from inject_db.core.relationships import KeyIndex
+from inject_db.modules.csv_process import CSVReader
+
+
+class TestRelationships(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    'CREATE TABLE cidades '
+                    '(id INTEGER PRIMARY KEY, nome TEXT, codigo INT)'
+                )
+            )
+            conn.execute(
+                text('CREATE TABLE pessoas (nome TEXT, cidade_id INT)')
+            )
+            conn.execute(
+                text(
+                    'INSERT INTO cidades (id, nome, codigo) VALUES '
+                    "(10, 'Recife', 261), (20, 'Natal', 240)"
+                )
+            )
+
+    def test_in_memory_lookup(self):
+        index = KeyIndex(self.engine, 'cidades', 'nome')
+        ids, missing = index.lookup(pd.Series(['Natal', 'Recife', 'Olinda']))
+        self.assertTrue(index.in_memory)
+        self.assertEqual(list(ids), [20, 10, None])
+        self.assertEqual(list(missing), [False, False, True])
+
+    def test_server_side_lookup(self):
+        index = KeyIndex(self.engine, 'cidades', 'nome', max_rows=0)
+        ids, missing = index.lookup(pd.Series(['Recife', None, 'Olinda']))
+        self.assertFalse(index.in_memory)
+        self.assertEqual(list(ids), [10, None, None])
+        # Chave nula não é contada como sem correspondência
+        self.assertEqual(list(missing), [False, False, True])
+
+    def test_categorical_keys_are_looked_up_once(self):
+        index = KeyIndex(self.engine, 'cidades', 'nome')
+        keys = pd.Series(
+            ['Natal', 'Recife', None, 'Olinda', 'Natal'] * 200,
+            dtype='category',
+        )
+
+        with patch.object(
+            KeyIndex,
+            'normalize',
+            side_effect=KeyIndex.normalize,
+            autospec=True,
+        ) as normalize:
+            ids, missing = index.lookup(keys)
+
+        # Verifica se a busca rodou sobre o dicionário, não sobre as linhas
+        self.assertEqual(len(normalize.call_args.args[1]), 3)
+        self.assertEqual(list(ids[:5]), [20, 10, None, None, 20])
+        self.assertEqual(list(missing[:5]), [False, False, False, True, False])
+        self.assertEqual(int(missing.sum()), 200)
+
+    def test_numeric_keys(self):
+        index = KeyIndex(self.engine, 'cidades', 'codigo')
+        ids, _ = index.lookup(pd.Series(['240', 261.0]))
+        self.assertEqual(list(ids), [20, 10])
+
+    def test_pipeline_resolves_ids_and_reports_unmatched(self):
+        data = pd.DataFrame(
+            {
+                'pessoa': ['Ana', 'Bia', 'Caio'],
+                'cidade': ['Recife', 'Olinda', 'Natal'],
+            }
+        )
+        mappings = [
+            {
+                'source_column': 'pessoa',
+                'db_table': 'pessoas',
+                'db_column': 'nome',
+            },
+            {
+                'source_column': 'cidade',
+                'db_table': 'pessoas',
+                'db_column': 'cidade_id',
+            },
+        ]
+        relationships = [
+            {
+                'table_origin': 'pessoas',
+                'column_origin': 'cidade_id',
+                'table_dest': 'cidades',
+                'column_dest': 'nome',
+            }
+        ]
+        pipeline = Pipeline(
+            CSVReader(BytesIO(data.to_csv(index=False).encode()), chunksize=2),
+            InsertWriter(self.engine),
+            build_loads(mappings, relationships),
+        )
+
+        pipeline.run()
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text('SELECT nome, cidade_id FROM pessoas ORDER BY nome')
+            ).fetchall()
+        self.assertEqual(rows, [('Ana', 10), ('Bia', None), ('Caio', 20)])
+        self.assertEqual(
+            pipeline.messages(),
+            [
+                'pessoas: 1 chaves sem correspondência em cidades.nome '
+                '(ex.: Olinda)'
+            ],
+        )
+
+    def test_text_keys_read_as_float(self):
+        with self.engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE cep (id INTEGER PRIMARY KEY, codigo TEXT)')
+            )
+            conn.execute(text("INSERT INTO cep VALUES (1, '12345')"))
+            conn.execute(text("INSERT INTO cep VALUES (2, '67890')"))
+            conn.execute(text('CREATE TABLE enderecos (cep_id INT, n TEXT)'))
+        mappings = [
+            {'source_column': c, 'db_table': 'enderecos', 'db_column': d}
+            for c, d in (('cep', 'cep_id'), ('n', 'n'))
+        ]
+        relationships = [
+            {
+                'table_origin': 'enderecos',
+                'column_origin': 'cep_id',
+                'table_dest': 'cep',
+                'column_dest': 'codigo',
+            }
+        ]
+        # A célula vazia faz o pandas ler a coluna como float
+        pipeline = Pipeline(
+            CSVReader(BytesIO(b'cep,n\n12345,a\n,b\n67890,c\n')),
+            InsertWriter(self.engine),
+            build_loads(mappings, relationships),
+        )
+
+        pipeline.run()
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text('SELECT n, cep_id FROM enderecos ORDER BY n')
+            ).fetchall()
+        self.assertEqual(rows, [('a', 1), ('b', None), ('c', 2)])
+        self.assertEqual(pipeline.messages(), [])
+
+    def test_unknown_key_column(self):
+        with self.assertRaises(ValueError):
+            KeyIndex(self.engine, 'cidades', 'sigla')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from io import BytesIO
+
+import pandas as pd
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    create_engine,
+    text,
+)
+
+from inject_db.core.pipeline import InsertWriter, Pipeline, TableLoad
+from inject_db.core.schema import SourceSchema, infer_schema
+from inject_db.modules.csv_process import CSVReader
+
+SAMPLE = pd.DataFrame(
+    {
+        'codigo': [123, 456, 789, 12],
+        'status': ['ativo', 'inativo', 'ativo', 'ativo'],
+        'nome': ['Ana', 'Bia', 'Caio', 'Davi'],
+        'quantidade': [1.0, None, 3.0, 4.0],
+        'cidade': ['Recife', 'Natal', 'Recife', 'Natal'],
+        'valor': [1, 2, 3, 4],
+    }
+)
+
+
+class TestSchema(unittest.TestCase):
+    def test_infer_combines_sample_and_targets(self):
+        schema = infer_schema(
+            SAMPLE,
+            {
+                'codigo': [String(5)],
+                'status': [String()],
+                'nome': [String(), String()],
+                'quantidade': [Integer()],
+                # Relacionamento: sem tipo útil, a amostra decide
+                'cidade': [None],
+                # Destinos de tipos diferentes: a amostra numérica fica livre
+                'valor': [Integer(), Float()],
+            },
+        )
+
+        # Verifica se texto é lido como texto e números são convertidos
+        self.assertEqual(
+            schema.parse,
+            {
+                'codigo': 'str',
+                'status': 'category',
+                'nome': 'str',
+                'cidade': 'category',
+            },
+        )
+        self.assertEqual(schema.convert, {'quantidade': 'Int64'})
+
+    def test_apply_keeps_blocks_that_do_not_convert(self):
+        schema = SourceSchema(convert={'n': 'Int64', 'x': 'float64'})
+
+        good = schema.apply(pd.DataFrame({'n': [1.0, None], 'x': [1, 2]}))
+        bad = schema.apply(pd.DataFrame({'n': ['3', 'abc'], 'x': ['4', '5']}))
+
+        # Verifica se o bloco inválido segue como lido para a validação
+        self.assertEqual(str(good['n'].dtype), 'Int64')
+        self.assertEqual(good['x'].dtype, 'float64')
+        self.assertEqual(bad['n'].tolist(), ['3', 'abc'])
+        self.assertEqual(bad['x'].tolist(), [4.0, 5.0])
+        self.assertIn('n: 1 blocos', schema.summary())
+
+    def test_pipeline_reads_with_explicit_types(self):
+        engine = create_engine('sqlite:///:memory:')
+        with engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE produtos (codigo TEXT, quantidade INTEGER)')
+            )
+        content = b'codigo,quantidade\n00123,1\n00456,2\n789,\n0012,4\n'
+        reader = CSVReader(BytesIO(content), chunksize=2)
+        loads = [
+            TableLoad(
+                'produtos', {'codigo': 'codigo', 'quantidade': 'quantidade'}
+            )
+        ]
+        chunks = []
+        pipeline = Pipeline(reader, InsertWriter(engine), loads)
+        original = reader.read_chunks
+
+        def recorded(*args):
+            for chunk in original(*args):
+                chunks.append(chunk.copy())
+                yield chunk
+
+        reader.read_chunks = recorded
+        pipeline.run()
+
+        # Verifica se os zeros à esquerda foram mantidos e se os dois
+        # blocos chegaram com os mesmos tipos
+        with engine.connect() as conn:
+            rows = conn.execute(text('SELECT * FROM produtos')).fetchall()
+        self.assertEqual(
+            rows, [('00123', 1), ('00456', 2), ('789', None), ('0012', 4)]
+        )
+        self.assertEqual(
+            [str(chunk['codigo'].dtype) for chunk in chunks], ['str', 'str']
+        )
+
+    def test_dates_and_booleans_follow_the_target(self):
+        schema = infer_schema(
+            pd.DataFrame({'d': ['2024-01-31'], 'b': ['sim']}),
+            {'d': [Date()], 'b': [Boolean()], 'h': [DateTime()]},
+        )
+
+        data = schema.apply(
+            pd.DataFrame(
+                {
+                    'd': ['2024-01-31', None],
+                    'b': ['Sim', 'não'],
+                    'h': ['2024-01-31 10:00', '2024-02-01 11:30'],
+                }
+            )
+        )
+        bad = schema.apply(pd.DataFrame({'b': ['talvez']}))
+
+        # Verifica se datas e booleanos são convertidos pelo tipo do destino
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data['d']))
+        self.assertTrue(pd.isna(data['d'][1]))
+        self.assertEqual(data['b'].tolist(), [True, False])
+        self.assertEqual(data['h'][1], pd.Timestamp('2024-02-01 11:30'))
+        self.assertEqual(bad['b'].tolist(), ['talvez'])
+
+    def test_pipeline_writes_dates_to_sqlite(self):
+        engine = create_engine('sqlite:///:memory:')
+        with engine.begin() as conn:
+            conn.execute(
+                text('CREATE TABLE eventos (dia DATE, ativo BOOLEAN)')
+            )
+        content = b'dia,ativo\n2024-01-31,True\n2024-02-29,\n,False\n'
+        loads = [TableLoad('eventos', {'dia': 'dia', 'ativo': 'ativo'})]
+
+        Pipeline(
+            CSVReader(BytesIO(content)), InsertWriter(engine), loads
+        ).run()
+
+        with engine.connect() as conn:
+            rows = conn.execute(text('SELECT * FROM eventos')).fetchall()
+        self.assertEqual(
+            rows, [('2024-01-31', 1), ('2024-02-29', None), (None, 0)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from inject_db.core.ui import get_reader, job_card, remove_mapping
+
+
+class TestImporterUI(unittest.TestCase):
+    @patch('inject_db.core.ui.st')
+    def test_remove_mapping_shifts_widget_state(self, mock_st):
+        mock_st.session_state = {
+            'csv_mappings': [{'n': 0}, {'n': 1}, {'n': 2}],
+            'csv_source_0': 'a',
+            'csv_source_1': 'b',
+            'csv_source_2': 'c',
+            'csv_table_2': 't',
+        }
+
+        remove_mapping('csv', 0)
+
+        # Verifica se as linhas seguintes herdam o estado dos widgets
+        state = mock_st.session_state
+        self.assertEqual(state['csv_mappings'], [{'n': 1}, {'n': 2}])
+        self.assertEqual(state['csv_source_0'], 'b')
+        self.assertEqual(state['csv_source_1'], 'c')
+        self.assertEqual(state['csv_table_1'], 't')
+        self.assertNotIn('csv_source_2', state)
+        self.assertNotIn('csv_table_2', state)
+
+    @patch('inject_db.core.ui.st')
+    def test_get_reader_reuses_reader_for_same_file(self, mock_st):
+        mock_st.session_state = {}
+        reader_class = MagicMock(side_effect=lambda file: object())
+        file = MagicMock(file_id='arquivo-1', size=10)
+        other = MagicMock(file_id='arquivo-2', size=10)
+
+        first = get_reader('csv', reader_class, file)
+        second = get_reader('csv', reader_class, file)
+        third = get_reader('csv', reader_class, other)
+
+        # Verifica se o arquivo só é lido de novo quando muda
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(reader_class.call_count, 2)
+
+    def running_job(self):
+        job = MagicMock(id='job-1', status='queued', active=True)
+        job.progress.return_value = {
+            'fraction': None,
+            'rows_done': 0,
+            'rows_per_sec': 0.0,
+            'elapsed_seconds': 0,
+            'eta_seconds': None,
+        }
+        job.metrics = None
+        job.messages = []
+        return job
+
+    @patch('inject_db.core.ui.st')
+    def test_job_card_cancels_own_jobs_directly(self, mock_st):
+        manager = MagicMock()
+        manager.queue_position.return_value = 1
+
+        job_card(manager, self.running_job(), own=True)
+
+        # Verifica se o cancelamento passa pelo gerenciador, que tira o job
+        # da fila
+        mock_st.button.assert_called_once()
+        kwargs = mock_st.button.call_args.kwargs
+        self.assertIs(kwargs['on_click'], manager.cancel)
+        self.assertEqual(kwargs['args'], ('job-1',))
+
+    @patch('inject_db.core.ui.st')
+    def test_job_card_confirms_cancel_of_other_jobs(self, mock_st):
+        mock_st.session_state = {}
+        manager = MagicMock()
+        manager.queue_position.return_value = 1
+        job = self.running_job()
+
+        # Sem a posse (página recarregada), o primeiro clique só pede a
+        # confirmação
+        job_card(manager, job, own=False)
+        kwargs = mock_st.button.call_args.kwargs
+        kwargs['on_click'](*kwargs['args'])
+        manager.cancel.assert_not_called()
+        mock_st.warning.assert_not_called()
+
+        mock_st.button.reset_mock()
+        job_card(manager, job, own=False)
+        mock_st.warning.assert_called_once()
+        confirm = mock_st.button.call_args_list[0].kwargs
+        confirm['on_click'](*confirm['args'])
+
+        # Verifica se a confirmação cancela o job e limpa o pedido
+        manager.cancel.assert_called_once_with('job-1')
+        self.assertEqual(mock_st.session_state, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import gc
+import io
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from inject_db.core.uploads import (
+    MappedFile,
+    ServerFileError,
+    open_server_file,
+    spool_upload,
+)
+from inject_db.modules.csv_process import CSVReader
+
+DATA = pd.DataFrame({'nome': [f'p{i}' for i in range(30)], 'idade': range(30)})
+
+
+def upload(content, name):
+    file = io.BytesIO(content)
+    file.name = name
+    file.size = len(content)
+    file.file_id = f'{name}-id'
+    return file
+
+
+class TestUploads(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.csv = DATA.to_csv(index=False).encode()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_mapped_file_cursors(self):
+        file = MappedFile.open(self.write('linhas.txt', b'a\nbb\nccc'))
+        other = file.reopen()
+
+        # Verifica se cada cursor anda sozinho sobre o mesmo mapeamento
+        self.assertEqual(file.readline(), b'a\n')
+        self.assertEqual(file.read(2), b'bb')
+        self.assertEqual(other.read(), b'a\nbb\nccc')
+        self.assertEqual(list(file), [b'\n', b'ccc'])
+        file.seek(-3, io.SEEK_END)
+        self.assertEqual(file.read(), b'ccc')
+        self.assertEqual((file.name, file.size), ('linhas.txt', 8))
+
+        empty = MappedFile.open(self.write('vazio.csv', b''))
+        self.assertEqual(empty.read(), b'')
+
+    def test_small_upload_stays_in_memory(self):
+        file = upload(self.csv, 'dados.csv')
+        self.assertIs(spool_upload(file, threshold=len(self.csv)), file)
+
+    def test_large_upload_is_spooled_and_removed(self):
+        file = upload(self.csv, 'dados.csv')
+
+        spooled = spool_upload(file, threshold=10, directory=self.dir.name)
+        path = spooled.path
+
+        # Verifica se o leitor lê do disco e se a cópia do job não duplica
+        # o conteúdo
+        self.assertEqual(
+            (spooled.name, spooled.file_id), ('dados.csv', 'dados.csv-id')
+        )
+        reader = CSVReader(spooled, chunksize=10)
+        clone = reader.detached()
+        self.assertIs(clone.file._mapping, spooled._mapping)
+        pd.testing.assert_frame_equal(
+            pd.concat(clone.read_chunks(), ignore_index=True), DATA
+        )
+        self.assertEqual(reader.estimated_rows(), 30)
+
+        del spooled, reader, clone
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_server_file_must_be_inside_root(self):
+        self.write('dados.csv', self.csv)
+        outside = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        outside.close()
+        self.addCleanup(os.unlink, outside.name)
+
+        file = open_server_file('dados.csv', root=self.dir.name)
+
+        self.assertEqual(file.read(), self.csv)
+        self.assertEqual(file.file_id[2], len(self.csv))
+        for path in (outside.name, '../dados.csv', 'faltando.csv'):
+            with self.assertRaises(ServerFileError):
+                open_server_file(path, root=self.dir.name)
+        with self.assertRaises(ServerFileError):
+            open_server_file('dados.csv', root=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from io import BytesIO
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from inject_db.core.database import reflect_table
+from inject_db.core.pipeline import InsertWriter, Pipeline, TableLoad
+from inject_db.core.validation import (
+    MISSING,
+    NOT_DATE,
+    NOT_INTEGER,
+    NULL,
+    TOO_LONG,
+    ValidationError,
+    find_violations,
+)
+from inject_db.modules.csv_process import CSVReader
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    'CREATE TABLE pessoas ('
+                    'id INTEGER PRIMARY KEY, '
+                    'nome VARCHAR(5) NOT NULL, '
+                    'idade INTEGER, '
+                    'nascimento DATE, '
+                    'ativo INTEGER NOT NULL DEFAULT 1)'
+                )
+            )
+        self.table = reflect_table(self.engine, 'pessoas')
+
+    def problems(self, data):
+        violations = find_violations(data, self.table)
+        return {
+            (row.coluna, row.problema): (row.linhas, row.exemplos)
+            for row in violations.itertuples()
+        }
+
+    def test_clean_chunk(self):
+        data = pd.DataFrame(
+            {
+                'nome': ['Ana', 'Bia'],
+                'idade': [30, None],
+                'nascimento': ['1990-01-02', '02/03/1991'],
+            }
+        )
+        self.assertEqual(self.problems(data), {})
+
+    def test_reports_each_column(self):
+        data = pd.DataFrame(
+            {
+                'nome': ['Ana', None, 'Fernanda', 'Fernanda'],
+                'idade': ['30', 'trinta', '1.5', None],
+                'nascimento': ['1990-01-02', 'ontem', None, None],
+            }
+        )
+
+        problems = self.problems(data)
+
+        self.assertEqual(problems[('nome', NULL)], (1, []))
+        self.assertEqual(problems[('nome', TOO_LONG)], (2, ['Fernanda']))
+        self.assertEqual(
+            problems[('idade', NOT_INTEGER)], (2, ['trinta', '1.5'])
+        )
+        self.assertEqual(problems[('nascimento', NOT_DATE)], (1, ['ontem']))
+
+    def test_required_column_not_mapped(self):
+        problems = self.problems(pd.DataFrame({'idade': [1, 2]}))
+        self.assertEqual(problems, {('nome', MISSING): (2, [])})
+
+    def test_pipeline_fails_before_writing(self):
+        data = pd.DataFrame({'nome': ['Ana', 'Fernanda']})
+        pipeline = Pipeline(
+            CSVReader(BytesIO(data.to_csv(index=False).encode())),
+            InsertWriter(self.engine),
+            [TableLoad('pessoas', {'nome': 'nome'})],
+        )
+
+        with self.assertRaises(ValidationError) as context:
+            pipeline.run()
+
+        self.assertIn('nome: 1 linhas', str(context.exception))
+        with self.engine.connect() as conn:
+            count = conn.execute(text('SELECT COUNT(*) FROM pessoas')).scalar()
+        self.assertEqual(count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,13 @@ from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import streamlit as st
+from sqlalchemy import create_engine, text
 
+from inject_db.core.pipeline import InsertWriter, MultiPipeline
+from inject_db.modules.ods_process import ODSReader
 from inject_db.modules.xlsx_process import (
+    ExcelReader,
+    WorkbookReader,
     connect_to_database,
     insert_data,
     list_columns,
@@ -54,7 +59,7 @@ class TestExcelToDatabase(unittest.TestCase):
             )
             pd.testing.assert_frame_equal(result_df, df)
 
-    @patch('inject_db.modules.xlsx_process.create_engine')
+    @patch('inject_db.core.database.create_engine')
     def test_connect_to_database(self, mock_create_engine):
         mock_engine = MagicMock()
         mock_create_engine.return_value = mock_engine
@@ -66,7 +71,7 @@ class TestExcelToDatabase(unittest.TestCase):
         mock_create_engine.assert_called_once_with(connection_string)
         self.assertEqual(engine, mock_engine)
 
-    @patch('inject_db.modules.xlsx_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_tables(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -80,7 +85,7 @@ class TestExcelToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_table_names.assert_called_once()
 
-    @patch('inject_db.modules.xlsx_process.inspect')
+    @patch('inject_db.core.database.inspect')
     def test_list_columns(self, mock_inspect):
         mock_inspector = MagicMock()
         mock_inspect.return_value = mock_inspector
@@ -97,8 +102,8 @@ class TestExcelToDatabase(unittest.TestCase):
         mock_inspect.assert_called_once_with(mock_engine)
         mock_inspector.get_columns.assert_called_once_with('table1')
 
-    @patch('inject_db.modules.xlsx_process.Table')
-    @patch('inject_db.modules.xlsx_process.MetaData')
+    @patch('inject_db.core.database.Table')
+    @patch('inject_db.core.database.MetaData')
     def test_insert_data(self, mock_metadata, mock_table):
         mock_table_instance = MagicMock()
         mock_table.return_value = mock_table_instance
@@ -121,6 +126,92 @@ class TestExcelToDatabase(unittest.TestCase):
             mock_table_instance.insert(),
             data.to_dict(orient='records'),
         )
+        mock_connection.commit.assert_called_once()
+
+
+def workbook(sheets, engine=None):
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine=engine) as writer:
+        for name, data in sheets.items():
+            data.to_excel(writer, sheet_name=name, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+class TestWorkbookSheets(unittest.TestCase):
+    def setUp(self):
+        self.pessoas = pd.DataFrame(
+            {'nome': ['Ana', 'Bia'], 'idade': [30, 40]}
+        )
+        self.cidades = pd.DataFrame({'cidade': ['Recife', 'Natal', 'Olinda']})
+        self.sheets = {'Pessoas': self.pessoas, 'Cidades': self.cidades}
+
+    def test_sheet_names_without_reading_cells(self):
+        reader = ExcelReader(workbook(self.sheets))
+        with patch('pandas.read_excel') as read_excel:
+            self.assertEqual(reader.sheet_names(), ['Pessoas', 'Cidades'])
+        read_excel.assert_not_called()
+
+        ods = ODSReader(workbook(self.sheets, engine='odf'))
+        self.assertEqual(ods.sheet_names(), ['Pessoas', 'Cidades'])
+
+    def test_single_sheet_reads_only_that_sheet(self):
+        reader = ExcelReader(workbook(self.sheets)).select_sheets(['Cidades'])
+        self.assertEqual(reader.columns(), ['cidade'])
+        pd.testing.assert_frame_equal(reader.read_frame(), self.cidades)
+
+    def test_several_sheets_qualify_columns(self):
+        reader = ExcelReader(workbook(self.sheets)).select_sheets(
+            ['Pessoas', 'Cidades']
+        )
+        self.assertIsInstance(reader, WorkbookReader)
+        self.assertEqual(
+            reader.columns(),
+            ['Pessoas!nome', 'Pessoas!idade', 'Cidades!cidade'],
+        )
+        with self.assertRaisesRegex(TypeError, 'split_mappings'):
+            reader.read_frame()
+
+        parts = reader.split_mappings(
+            [
+                {
+                    'source_column': 'Cidades!cidade',
+                    'db_table': 'cidades',
+                    'db_column': 'nome',
+                }
+            ]
+        )
+        self.assertEqual(len(parts), 1)
+        self.assertEqual(parts[0][0].sheet, 'Cidades')
+        self.assertEqual(parts[0][1][0]['source_column'], 'cidade')
+
+    def test_sheets_load_different_tables_in_one_job(self):
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE pessoas (nome TEXT, idade INT)'))
+            conn.execute(text('CREATE TABLE cidades (nome TEXT)'))
+        reader = ExcelReader(workbook(self.sheets)).select_sheets(
+            ['Pessoas', 'Cidades']
+        )
+        mappings = [
+            {'source_column': source, 'db_table': table, 'db_column': column}
+            for source, table, column in (
+                ('Pessoas!nome', 'pessoas', 'nome'),
+                ('Pessoas!idade', 'pessoas', 'idade'),
+                ('Cidades!cidade', 'cidades', 'nome'),
+            )
+        ]
+        pipeline = MultiPipeline.from_mappings(
+            reader.detached(), InsertWriter(engine), mappings
+        )
+
+        # As duas abas são lidas em processos separados antes da gravação
+        with patch('inject_db.modules.xlsx_process.SHEET_WORKERS', 2):
+            self.assertEqual(pipeline.run(), {'pessoas': 2, 'cidades': 3})
+        with engine.connect() as conn:
+            self.assertEqual(
+                conn.execute(text('SELECT COUNT(*) FROM cidades')).scalar(), 3
+            )
 
 
 if __name__ == '__main__':